@@ -1,12 +1,64 @@
+import hashlib
 import io
+import tempfile
+from pathlib import Path
+from typing import Optional
 import yaml
 import pandas as pd
 import streamlit as st
-from xenoscore.config import load_component_config, load_weights_config
+from xenoscore.data.io import SAMPLE_DTYPES
 from xenoscore.data.validation import validate_dataframe
 from xenoscore.scoring.weighted import WeightedScoreEngine
 from xenoscore.scoring.model import ModelScoreEngine
-from xenoscore.ml.featurize import featurize
+
+# Bounded caches: a few recent uploads / configurations are kept per server process.
+# Frames and engines come from st.cache_resource (shared, not copied per rerun), so
+# they are treated as read-only here.
+MAX_UPLOADS = 4
+MAX_RESULTS = 4
+PAGE_SIZES = [50, 200, 1000]
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+@st.cache_data
+def _example_bytes(path: str) -> bytes:
+    return Path(path).read_bytes()
+
+@st.cache_resource(max_entries=MAX_UPLOADS)
+def _parsed(digest: str, _data: bytes) -> pd.DataFrame:
+    """Upload parsed with the Sample dtypes (type inference if a cell does not fit)."""
+    try:
+        return pd.read_csv(io.BytesIO(_data), dtype=SAMPLE_DTYPES)
+    except (ValueError, TypeError):
+        return pd.read_csv(io.BytesIO(_data))
+
+@st.cache_resource(max_entries=MAX_UPLOADS)
+def _validated(digest: str, _data: bytes) -> tuple:
+    return validate_dataframe(_parsed(digest, _data))
+
+@st.cache_resource(max_entries=MAX_RESULTS)
+def _engine(config_key: str, _comp_bytes: bytes, _weights_bytes: Optional[bytes], _model_bytes: Optional[bytes]):
+    comp_cfg = yaml.safe_load(_comp_bytes)["components"]
+    if _model_bytes is not None:
+        # persist the upload so the model is loaded (and cached) once, not re-read per rerun
+        path = Path(tempfile.gettempdir()) / "xenoscore-models" / f"{_digest(_model_bytes)}.joblib"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(_model_bytes)
+        return ModelScoreEngine(comp_cfg, str(path))
+    weights = yaml.safe_load(_weights_bytes) or {}
+    return WeightedScoreEngine(comp_cfg, {str(k): float(v) for k, v in weights.get("weights", {}).items()})
+
+@st.cache_resource(max_entries=MAX_RESULTS)
+def _scored(digest: str, config_key: str, _df: pd.DataFrame, _eng) -> pd.DataFrame:
+    if isinstance(_eng, ModelScoreEngine):
+        return _eng.predict_proba(_df)
+    return _eng.score_dataframe(_df)
+
+@st.cache_data(max_entries=2)
+def _csv_bytes(digest: str, config_key: str, _df: pd.DataFrame, _preds: pd.DataFrame) -> bytes:
+    return pd.concat([_df, _preds], axis=1).to_csv(index=False).encode("utf-8")
 
 st.set_page_config(page_title="XenoScore", layout="wide")
 st.title("🧪 XenoScore — Xenotransplantation Outcome Scoring (Prototype)")
@@ -25,19 +77,24 @@ else:
 
 # Example files for download
 with st.expander("📥 Download example files"):
-    st.download_button("Download example dataset (CSV)", data=open("examples/example_dataset.csv","rb").read(),
+    st.download_button("Download example dataset (CSV)", data=_example_bytes("examples/example_dataset.csv"),
                        file_name="example_dataset.csv")
-    st.download_button("Download default component config (YAML)", data=open("configs/default_components.yaml","rb").read(),
+    st.download_button("Download default component config (YAML)", data=_example_bytes("configs/default_components.yaml"),
                        file_name="default_components.yaml")
-    st.download_button("Download example weights (YAML)", data=open("configs/weights.example.yaml","rb").read(),
+    st.download_button("Download example weights (YAML)", data=_example_bytes("configs/weights.example.yaml"),
                        file_name="weights.example.yaml")
 
 data_file = st.file_uploader("Upload your dataset (CSV)", type=["csv"])
 
 if data_file and comp_yaml_file and ((use_model and model_file) or (not use_model and weights_yaml_file)):
-    df = pd.read_csv(data_file)
-    comp_cfg = yaml.safe_load(comp_yaml_file.read())["components"]
-    df_valid, errors = validate_dataframe(df)
+    data = data_file.getvalue()
+    digest = _digest(data)
+    comp_bytes = comp_yaml_file.getvalue()
+    weights_bytes = weights_yaml_file.getvalue() if weights_yaml_file else None
+    model_bytes = model_file.getvalue() if model_file else None
+    config_key = "|".join(_digest(b) if b is not None else "-" for b in (comp_bytes, weights_bytes, model_bytes))
+
+    df_valid, errors = _validated(digest, data)
     if errors:
         st.warning(f"Validation warnings for {len(errors)} rows. Showing first 5.")
         for idx, err in errors[:5]:
@@ -45,17 +102,24 @@ if data_file and comp_yaml_file and ((use_model and model_file) or (not use_mode
 
     if use_model:
         st.info("Using ML model to predict probability of adverse outcome.")
-        eng = ModelScoreEngine(comp_cfg, model_file)
-        preds = eng.predict_proba(df_valid)
-    else:
-        weights = yaml.safe_load(weights_yaml_file.read())
-        eng = WeightedScoreEngine(comp_cfg, weights.get("weights", {}))
-        preds = eng.score_dataframe(df_valid)
-
-    out = pd.concat([df_valid, preds], axis=1)
-    st.dataframe(out.head(50))
-    csv = out.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download predictions CSV", data=csv, file_name="xenoscore_predictions.csv")
+    eng = _engine(config_key, comp_bytes, weights_bytes, model_bytes)
+    preds = _scored(digest, config_key, df_valid, eng)
+
+    # only the visible page is assembled; the full result is joined for download only
+    n = len(df_valid)
+    c1, c2 = st.columns(2)
+    page_size = c1.selectbox("Rows per page", PAGE_SIZES, index=0)
+    n_pages = max(1, -(-n // page_size))
+    page = c2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+    a = (int(page) - 1) * page_size
+    st.dataframe(pd.concat([df_valid.iloc[a:a + page_size], preds.iloc[a:a + page_size]], axis=1))
+    st.caption(f"{n} rows scored")
+
+    if st.button("Prepare predictions CSV"):
+        st.session_state["download_key"] = (digest, config_key)
+    if st.session_state.get("download_key") == (digest, config_key):
+        st.download_button("⬇️ Download predictions CSV", data=_csv_bytes(digest, config_key, df_valid, preds),
+                           file_name="xenoscore_predictions.csv")
 else:
     st.info("Upload dataset + configs in the sidebar to score.")
 
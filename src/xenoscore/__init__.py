@@ -2,3 +2,13 @@
 XenoScore package initialization.
 """
 __all__ = ["config", "schemas", "registry"]
+
+def __getattr__(name: str):
+    # resolved on first use so `import xenoscore` stays free of metadata lookups
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            return version("xenoscore")
+        except PackageNotFoundError:
+            return "0.1.0"  # running from a source checkout
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
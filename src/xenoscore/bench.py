@@ -0,0 +1,202 @@
+"""
+End-to-end benchmarks on synthetic cohorts: wall time and peak memory per stage.
+"""
+from __future__ import annotations
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+STAGES = ("read_any", "validate_dataframe", "featurize", "weighted_score", "train_logistic", "model_score", "write_csv",
+          "serve_request")
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+TRAIN_MAX_ROWS = 200_000  # train_logistic runs 5-fold CV; larger cohorts are subsampled for this stage
+SERVE_REQUESTS = 1_000    # sequential single-sample POST /score requests per serve_request run
+
+def _measure(fn: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    """Best-of-`repeat` wall time, plus one traced run for the peak of Python/NumPy allocations."""
+    result, times = None, []
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    out: Dict[str, Any] = {"seconds": min(times), "result": result}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            out["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return out
+
+def serve_latency(engine: Any, records: List[Dict[str, Any]], requests: int = SERVE_REQUESTS, warmup: int = 50) -> Dict[str, Any]:
+    """Per-request latency of single-sample POST /score calls to a local `serve` instance
+    over one keep-alive connection (client-side wall time, including JSON and HTTP)."""
+    import http.client
+    import threading
+    from .serve import ScoringService, make_server
+    service = ScoringService(engine)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=30)
+    bodies = [json.dumps(r).encode("utf-8") for r in records]
+    latencies = []
+    try:
+        for i in range(warmup + requests):
+            t0 = time.perf_counter()
+            conn.request("POST", "/score", bodies[i % len(bodies)], {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                raise RuntimeError(f"POST /score returned {resp.status}")
+            if i >= warmup:
+                latencies.append(time.perf_counter() - t0)
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+        service.close()
+    lat = np.array(latencies) * 1000.0
+    p50, p99 = np.percentile(lat, [50, 99])
+    return {"seconds": float(lat.sum() / 1000.0), "p50_ms": float(p50), "p99_ms": float(p99)}
+
+def environment() -> Dict[str, Any]:
+    import sklearn
+    try:
+        from importlib.metadata import version
+        xs_version = version("xenoscore")
+    except Exception:
+        xs_version = "unknown"
+    return {
+        "xenoscore": xs_version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    formats: Sequence[str] = ("csv",),
+    component_config: str = "configs/default_components.yaml",
+    weights: str = "configs/weights.example.yaml",
+    workdir: Optional[str] = None,
+    repeat: int = 1,
+    memory: bool = True,
+    stages: Sequence[str] = STAGES,
+    seed: int = 0,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Time each pipeline stage on synthetic cohorts of every size and input format.
+
+    Each stage reuses the previous stage's output (read -> validate -> featurize /
+    score / train -> write). Peak memory is the tracemalloc peak of a separate run,
+    so it covers Python and NumPy buffers but not Arrow-internal allocations.
+    `serve_request` reports request latency percentiles (`p50_ms`, `p99_ms`) of
+    `serve_latency` on the cohort's first rows instead of a memory peak.
+    """
+    from .config import load_component_config, load_raw_score_range, load_weights_config
+    from .data.io import read_any, write_csv
+    from .data.synthetic import write_cohort
+    from .data.validation import validate_dataframe
+    from .ml.featurize import featurize
+    from .ml.train import TrainConfig, train_logistic
+    from .scoring.linear import clear_model_cache
+    from .scoring.model import ModelScoreEngine
+    from .scoring.weighted import WeightedScoreEngine
+
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)} (expected some of {STAGES})")
+    comp_cfg = load_component_config(component_config)["components"]
+    w = load_weights_config(weights)
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for n in sizes:
+            for fmt in formats:
+                src = write_cohort(Path(tmp) / f"cohort_{n}.{fmt}", n, seed=seed)
+                state: Dict[str, Any] = {}
+                model_path = str(Path(tmp) / f"model_{n}.joblib")
+
+                def record(stage: str, fn: Callable[[], Any], rows: int = n) -> Any:
+                    m = _measure(fn, repeat, memory)
+                    row = {"stage": stage, "rows": rows, "format": fmt, "seconds": m["seconds"],
+                           "rows_per_sec": rows / m["seconds"] if m["seconds"] > 0 else None}
+                    if "peak_mb" in m:
+                        row["peak_mb"] = m["peak_mb"]
+                    results.append(row)
+                    if progress:
+                        progress(row)
+                    return m["result"]
+
+                df = record("read_any", lambda: read_any(src)) if "read_any" in stages else read_any(src)
+                if "validate_dataframe" in stages:
+                    df = record("validate_dataframe", lambda: validate_dataframe(df)[0])
+                X = df.drop(columns=["outcome"])
+                if "featurize" in stages:
+                    record("featurize", lambda: featurize(X, comp_cfg))
+                if "weighted_score" in stages:
+                    state["scored"] = record("weighted_score", lambda: WeightedScoreEngine(comp_cfg, w).score_dataframe(X))
+                if "train_logistic" in stages or "model_score" in stages:
+                    train_df = df.sample(TRAIN_MAX_ROWS, random_state=seed) if len(df) > TRAIN_MAX_ROWS else df
+                    fit = lambda: train_logistic(train_df, "outcome", comp_cfg, TrainConfig(), model_path)
+                    if "train_logistic" in stages:
+                        record("train_logistic", fit, rows=len(train_df))
+                    else:
+                        fit()
+                if "model_score" in stages:
+                    clear_model_cache()
+                    record("model_score", lambda: ModelScoreEngine(comp_cfg, model_path).predict_proba(X))
+                if "write_csv" in stages:
+                    out = state.get("scored")
+                    frame = df if out is None else pd.concat([df, out], axis=1)
+                    record("write_csv", lambda: write_csv(frame, Path(tmp) / f"out_{n}.csv"))
+                if "serve_request" in stages:
+                    # serve needs a fixed raw_score range; take the cohort's when the weights have none
+                    raw_range = load_raw_score_range(weights)
+                    if raw_range is None:
+                        raw = WeightedScoreEngine(comp_cfg, w).raw_scores(X)["raw_score"]
+                        raw_range = (float(raw.min()), float(raw.max()))
+                    head = X.head(SERVE_REQUESTS)
+                    records = head.astype(object).where(head.notna(), None).to_dict(orient="records")
+                    lat = serve_latency(WeightedScoreEngine(comp_cfg, w, raw_range=raw_range), records)
+                    row = {"stage": "serve_request", "rows": SERVE_REQUESTS, "format": fmt, **lat,
+                           "rows_per_sec": SERVE_REQUESTS / lat["seconds"]}
+                    results.append(row)
+                    if progress:
+                        progress(row)
+    return {"environment": environment(), "repeat": repeat, "results": results}
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """Stages (matched on stage, rows, format) that got slower or hungrier by more than `tolerance`."""
+    key = lambda r: (r["stage"], r["rows"], r["format"])
+    base = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current.get("results", []):
+        b = base.get(key(r))
+        if b is None:
+            continue
+        for metric in ("seconds", "peak_mb", "p99_ms"):
+            if b.get(metric) and r.get(metric) is not None and r[metric] > b[metric] * (1 + tolerance):
+                regressions.append({"stage": r["stage"], "rows": r["rows"], "format": r["format"], "metric": metric,
+                                    "baseline": b[metric], "current": r[metric], "ratio": r[metric] / b[metric]})
+    return regressions
+
+def save_report(report: Dict[str, Any], path: str | Path) -> None:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(report, indent=2))
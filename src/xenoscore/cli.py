@@ -1,50 +1,226 @@
 from __future__ import annotations
 import json
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional
 import typer
-from rich import print
-import pandas as pd
-from .config import load_component_config, load_weights_config
-from .data.io import read_any, write_csv
-from .data.validation import validate_dataframe
-from .scoring.weighted import WeightedScoreEngine
-from .scoring.model import ModelScoreEngine
-from .ml.train import train_logistic, TrainConfig
-from .ml.featurize import featurize
+from . import profiling
+from .profiling import span, timed_iter
+if TYPE_CHECKING:
+    import pandas as pd
+    from .data.io import TableWriter
+
+# Commands import pandas, the scoring engines and scikit-learn themselves, so `--help`,
+# `--version` and commands that do not need the ML stack start without loading it.
 
 app = typer.Typer(help="XenoScore CLI")
 
+def print(*objects, **kwargs) -> None:
+    from rich import print as rich_print
+    rich_print(*objects, **kwargs)
+
+def _version(value: bool) -> None:
+    if value:
+        from . import __version__
+        print(f"xenoscore {__version__}")
+        raise typer.Exit()
+
+@app.callback()
+def main(
+    version: bool = typer.Option(False, "--version", callback=_version, is_eager=True, help="Show the version and exit"),
+):
+    """XenoScore CLI"""
+
+def _check_validation(mode: str) -> None:
+    from .data.validation import VALIDATION_MODES
+    if mode not in VALIDATION_MODES:
+        raise typer.BadParameter(f"--validation must be one of {', '.join(VALIDATION_MODES)}")
+
+def _validate(df: pd.DataFrame, mode: str, compact: bool = False) -> tuple[pd.DataFrame, list]:
+    from .data.validation import validate_dataframe, SchemaValidationError
+    try:
+        return validate_dataframe(df, mode=mode, compact=compact)
+    except SchemaValidationError as e:
+        print(f"[red]Validation failed for {len(e.errors)} rows (strict mode):[/red]")
+        for idx, err in e.errors[:5]:
+            print(f"  Row {idx}: {err}")
+        raise typer.Exit(code=1)
+
+@contextmanager
+def _profiled(path: Optional[str], command: str) -> Iterator[None]:
+    """With `path`, time the command's stages and components and save the report there."""
+    if not path:
+        yield
+        return
+    prof = profiling.enable()
+    try:
+        with span(command):
+            yield
+    finally:
+        profiling.disable()
+        prof.save(path)
+        print(f"[green]Saved profile to[/green] {path}")
+
+def _component_columns(component_specs: list, *extra: str) -> Optional[List[str]]:
+    """Input columns of all components plus `extra` (None: some component reads undeclared columns)."""
+    from .scoring.plan import compile_plan
+    cols = compile_plan(component_specs).read_columns
+    return None if cols is None else [*cols, *extra]
+
+def _report_errors(errors: list, total: int | None = None) -> None:
+    total = len(errors) if total is None else total
+    if total:
+        print(f"[yellow]Validation warnings for {total} rows (continuing):[/yellow]")
+        for idx, err in errors[:5]:
+            print(f"  Row {idx}: {err}")
+        if total > 5:
+            print(f"  ... ({total-5} more)")
+
+def _output_parts(df: pd.DataFrame, preds: pd.DataFrame, keys: List[str]) -> tuple:
+    return (df[keys] if keys else df), preds
+
+def _predict(eng, df: pd.DataFrame, explain_k: Optional[int] = None) -> pd.DataFrame:
+    """Prediction columns, plus contributions and the top `explain_k` drivers when set."""
+    if explain_k is None:
+        from .scoring.engine import predict
+        return predict(eng, df)
+    from .scoring.explain import explain
+    return explain(eng, df, explain_k)
+
+def _score_streaming(eng, input: str, writer: TableWriter, chunksize: int, validation: str,
+                     columns: Optional[List[str]] = None, passthrough: List[str] = (), keys: List[str] = (),
+                     compact: bool = False, explain_k: Optional[int] = None) -> None:
+    """Score `input` chunk by chunk into `writer`; memory is bounded by the chunk size."""
+    from .data.io import iter_chunks, read_any
+    from .scoring.engine import input_columns
+    from .scoring.profiles import ProfileSet
+    from .scoring.weighted import WeightedScoreEngine
+    # other columns (IDs, pass-through) are read as text so their type cannot drift
+    # between chunks; with undeclared component inputs every column is inferred
+    infer = input_columns(eng)
+    if isinstance(eng, ProfileSet):
+        unranged = {n: e for n, e in eng.profiles.items() if isinstance(e, WeightedScoreEngine) and e.raw_range is None}
+    else:
+        unranged = {"raw_score": eng} if isinstance(eng, WeightedScoreEngine) and eng.raw_range is None else {}
+    if unranged:
+        # first pass: global raw_score ranges so chunked scaling matches a whole-file run
+        ranges = {n: (float("inf"), float("-inf")) for n in unranged}
+        for chunk in timed_iter(iter_chunks(input, chunksize, columns, passthrough, compact, infer), "read_input"):
+            with span("validate", len(chunk)):
+                chunk, _ = _validate(chunk, validation, compact)
+            raw = eng.raw_scores(chunk)
+            for n, (lo, hi) in ranges.items():
+                if len(raw):
+                    ranges[n] = min(lo, raw[n].min()), max(hi, raw[n].max())
+        for n, (lo, hi) in ranges.items():
+            if lo <= hi:
+                unranged[n].raw_range = (lo, hi)
+    shown, n_errors = [], 0
+    for i, chunk in enumerate(timed_iter(iter_chunks(input, chunksize, columns, passthrough, compact, infer), "read_input")):
+        with span("validate", len(chunk)):
+            chunk, errors = _validate(chunk, validation, compact)
+        n_errors += len(errors)
+        shown.extend(errors[:5 - len(shown)])
+        with span("predict", len(chunk)):
+            preds = _predict(eng, chunk, explain_k)
+        with span("write_output", len(chunk)):
+            writer.write(*_output_parts(chunk, preds, keys))
+    if not writer.rows:
+        # empty input: still emit the header
+        chunk = read_any(input, columns, passthrough, compact).head(0)
+        writer.write(*_output_parts(chunk, _predict(eng, chunk, explain_k), keys))
+    _report_errors(shown, n_errors)
+
 @app.command()
 def score(
     input: str = typer.Option(..., "--input", "-i", help="Path to CSV/Parquet with samples"),
-    config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
+    config: str = typer.Option(None, "--config", "-c", help="YAML of components"),
     weights: str = typer.Option(None, "--weights", "-w", help="YAML of feature weights"),
-    model: str = typer.Option(None, "--model", "-m", help="Path to trained model (joblib). If provided, uses ML engine."),
-    out: str = typer.Option("predictions.csv", "--out", "-o", help="Output CSV path"),
+    model: str = typer.Option(None, "--model", "-m", help="Path to trained model (joblib, or .npz/.json artifact). If provided, uses ML engine."),
+    manifest: str = typer.Option(None, "--manifest", help="YAML of named profiles (config + weights/model each); one score column per profile"),
+    out: str = typer.Option("predictions.csv", "--out", "-o", help="Output path: .csv, .csv.gz/.bz2/.xz/.zst, .parquet or .feather/.arrow"),
+    validation: str = typer.Option("lenient", "--validation", help="Schema validation: strict|lenient|off"),
+    chunksize: int = typer.Option(None, "--chunksize", help="Stream the input in chunks of N rows (bounded memory)"),
+    workers: int = typer.Option(None, "--workers", help="Featurization processes (0 = all cores; default $XENOSCORE_WORKERS or 1)"),
+    feature_cache: str = typer.Option(None, "--feature-cache", help="Directory of a persistent feature store (reuses unchanged rows)"),
+    profile: str = typer.Option(None, "--profile", help="Write per-stage/per-component timings to this JSON (plus .folded stacks)"),
+    project: bool = typer.Option(False, "--project", help="Read only the columns the components use (plus --passthrough)"),
+    passthrough: List[str] = typer.Option([], "--passthrough", help="Input column copied to the output, e.g. a patient ID (repeatable; implies --project)"),
+    id_columns: List[str] = typer.Option([], "--id-column", help="Write only this key column plus the predictions (repeatable; implies --project)"),
+    compact: bool = typer.Option(False, "--compact", help="float32 inputs and feature matrices; reports peak memory"),
+    explain: bool = typer.Option(False, "--explain", help="Add per-feature contributions (w*x, or log-odds for linear models) and top drivers"),
+    top_k: int = typer.Option(3, "--top-k", help="Drivers reported per row with --explain"),
+    intervals: str = typer.Option(None, "--intervals", help="Bootstrap ensemble from `train --bootstrap`; adds probability interval columns"),
+    ci_level: float = typer.Option(0.95, "--ci-level", help="Coverage of --intervals"),
 ):
-    df = read_any(input)
-    df, errors = validate_dataframe(df)
-    if errors:
-        print(f"[yellow]Validation warnings for {len(errors)} rows (continuing):[/yellow]")
-        for idx, err in errors[:5]:
-            print(f"  Row {idx}: {err}")
-        if len(errors) > 5:
-            print(f"  ... ({len(errors)-5} more)")
+    from .data.io import TableWriter, available_columns, output_format, read_any
+    from .scoring.engine import build_engine, build_profiles, input_columns
+    _check_validation(validation)
+    if chunksize is not None and chunksize < 1:
+        raise typer.BadParameter("--chunksize must be a positive integer")
 
-    comp_cfg = load_component_config(config)["components"]
-    if model:
-        eng = ModelScoreEngine(comp_cfg, model)
-        preds = eng.predict_proba(df)
-    else:
-        if not weights:
-            raise typer.BadParameter("Weights YAML is required when no model is provided.")
-        w = load_weights_config(weights)
-        eng = WeightedScoreEngine(comp_cfg, w)
-        preds = eng.score_dataframe(df)
-
-    out_df = pd.concat([df, preds], axis=1)
-    write_csv(out_df, out)
+    if top_k < 0:
+        raise typer.BadParameter("--top-k must be >= 0")
+    if intervals and (manifest or not model):
+        raise typer.BadParameter("--intervals needs --model.")
+    if not 0.0 < ci_level < 1.0:
+        raise typer.BadParameter("--ci-level must be between 0 and 1")
+    if manifest:
+        if config or weights or model:
+            raise typer.BadParameter("--manifest replaces --config/--weights/--model.")
+        if explain:
+            raise typer.BadParameter("--explain needs a single --config profile, not --manifest.")
+    elif not config:
+        raise typer.BadParameter("--config (or --manifest) is required.")
+    elif not model and not weights:
+        raise typer.BadParameter("Weights YAML is required when no model is provided.")
+    try:
+        output_format(out)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    passthrough = list(dict.fromkeys([*id_columns, *passthrough]))
+    with _profiled(profile, "score"):
+        with span("build_engine"):
+            if manifest:
+                eng = build_profiles(manifest, workers=workers, feature_cache=feature_cache, compact=compact)
+            else:
+                eng = build_engine(config, weights, model, workers=workers, feature_cache=feature_cache, compact=compact,
+                                   intervals=intervals, ci_level=ci_level)
+        if model:
+            from .scoring.explain import as_linear
+            from .scoring.linear import load_model
+            try:
+                eng.plan_for(load_model(model))
+                if intervals:
+                    eng.interval_model(load_model(model))
+                if explain:
+                    as_linear(load_model(model), [])
+            except ValueError as e:
+                raise typer.BadParameter(str(e))
+        explain_k = top_k if explain else None
+        columns = input_columns(eng) if project or passthrough else None
+        if passthrough:
+            missing = [c for c in passthrough if c not in available_columns(input)]
+            if missing:
+                raise typer.BadParameter(f"--passthrough columns not found in {input}: {missing}")
+
+        if chunksize:
+            with TableWriter(out) as writer:
+                _score_streaming(eng, input, writer, chunksize, validation, columns, passthrough, id_columns, compact, explain_k)
+        else:
+            with span("read_input") as s:
+                df = read_any(input, columns, passthrough, compact)
+                s.rows = len(df)
+            with span("validate", len(df)):
+                df, errors = _validate(df, validation, compact)
+            _report_errors(errors)
+            with span("predict", len(df)):
+                preds = _predict(eng, df, explain_k)
+            with span("write_output", len(df)), TableWriter(out) as writer:
+                writer.write(*_output_parts(df, preds, id_columns))
     print(f"[green]Saved predictions to[/green] {out}")
+    if compact and profiling.peak_rss_mb() is not None:
+        print(f"Peak memory: {profiling.peak_rss_mb():.0f} MB")
 
 @app.command()
 def train(
@@ -52,13 +228,373 @@ def train(
     target: str = typer.Option("outcome", "--target", "-t", help="Target column"),
     config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
     model_out: str = typer.Option("model.joblib", "--model-out", "-m", help="Output model path"),
+    artifact_out: str = typer.Option(None, "--artifact-out", help="NumPy-only model export (.npz/.json); default: <model-out>.npz"),
     cv_folds: int = typer.Option(5, "--cv-folds", help="Cross-validation folds"),
     C: float = typer.Option(1.0, "--C", help="Inverse regularization strength"),
+    C_grid: str = typer.Option(None, "--C-grid", help="Comma-separated C values to search (e.g. 0.01,0.1,1,10)"),
+    penalty: str = typer.Option("l2", "--penalty", help="l1, l2 or a comma-separated list to search"),
+    class_weight: str = typer.Option("none", "--class-weight", help="none, balanced or a comma-separated list to search"),
+    n_jobs: int = typer.Option(None, "--n-jobs", help="Parallel search jobs (default: --workers)"),
+    leaderboard_out: str = typer.Option(None, "--leaderboard-out", help="Search leaderboard JSON; default: <model-out>.leaderboard.json"),
+    workers: int = typer.Option(None, "--workers", help="Featurization/CV processes (0 = all cores; default $XENOSCORE_WORKERS or 1)"),
+    feature_cache: str = typer.Option(None, "--feature-cache", help="Directory of a persistent feature store (reuses unchanged rows)"),
+    profile: str = typer.Option(None, "--profile", help="Write per-stage/per-component timings to this JSON (plus .folded stacks)"),
+    bootstrap: int = typer.Option(0, "--bootstrap", help="Refit on B bootstrap resamples for AUC and per-row probability intervals"),
+    bootstrap_out: str = typer.Option(None, "--bootstrap-out", help="Bootstrap ensemble (.npz); default: <model-out>.bootstrap.npz"),
+    ci_level: float = typer.Option(0.95, "--ci-level", help="Coverage of the bootstrap AUC interval"),
+):
+    """Fit a logistic model on component features; a C grid or several penalties/class weights run a CV search."""
+    from .config import load_component_config
+    from .data.io import read_any
+    from .ml.train import train_logistic, search_logistic, SearchSpace, TrainConfig
+    penalties = [p.strip() for p in penalty.split(",") if p.strip()]
+    class_weights = [None if w.strip().lower() == "none" else w.strip() for w in class_weight.split(",") if w.strip()]
+    if any(p not in ("l1", "l2") for p in penalties) or not penalties:
+        raise typer.BadParameter("--penalty must be l1, l2 or a comma-separated list of them")
+    if any(w not in (None, "balanced") for w in class_weights) or not class_weights:
+        raise typer.BadParameter("--class-weight must be none, balanced or a comma-separated list of them")
+    try:
+        Cs = [float(c) for c in C_grid.split(",") if c.strip()] if C_grid else [C]
+    except ValueError:
+        raise typer.BadParameter("--C-grid must be comma-separated numbers")
+    if not Cs or any(c <= 0 for c in Cs):
+        raise typer.BadParameter("C values must be positive")
+    if bootstrap < 0 or not 0.0 < ci_level < 1.0:
+        raise typer.BadParameter("--bootstrap must be >= 0 and --ci-level between 0 and 1")
+    with _profiled(profile, "train"):
+        comp_cfg = load_component_config(config)["components"]
+        with span("read_input") as s:
+            df = read_any(input, _component_columns(comp_cfg, target))
+            s.rows = len(df)
+        artifact_out = artifact_out or str(Path(model_out).with_suffix(".npz"))
+        bootstrap_out = bootstrap_out or (str(Path(model_out).with_suffix(".bootstrap.npz")) if bootstrap else None)
+        cfg = TrainConfig(C=C, penalty=penalties[0], class_weight=class_weights[0], cv_folds=cv_folds, workers=workers,
+                          feature_cache=feature_cache, bootstrap=bootstrap, ci_level=ci_level)
+        if C_grid or len(penalties) > 1 or len(class_weights) > 1:
+            leaderboard_out = leaderboard_out or str(Path(model_out).with_suffix(".leaderboard.json"))
+            space = SearchSpace(C=Cs, penalties=penalties, class_weights=class_weights)
+            res = search_logistic(df, target, comp_cfg, space, cfg, model_out, artifact_out, leaderboard_out, n_jobs, bootstrap_out)
+        else:
+            res = train_logistic(df, target, comp_cfg, cfg, model_out, artifact_out, bootstrap_out)
+    print(json.dumps(res, indent=2))
+
+@app.command("train-incremental")
+def train_incremental_cmd(
+    input: List[str] = typer.Option(..., "--input", "-i", help="CSV/Parquet with labeled data (repeatable; streamed in chunks)"),
+    target: str = typer.Option("outcome", "--target", "-t", help="Target column"),
+    config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
+    state: str = typer.Option("model.state.joblib", "--state", help="Resumable training state (created if missing)"),
+    model_out: str = typer.Option("model.joblib", "--model-out", "-m", help="Output model path"),
+    artifact_out: str = typer.Option(None, "--artifact-out", help="NumPy-only model export (.npz/.json); default: <model-out>.npz"),
+    chunksize: int = typer.Option(50_000, "--chunksize", help="Rows per partial_fit step"),
+    alpha: float = typer.Option(1e-4, "--alpha", help="L2 regularization strength of the SGD logistic model"),
+    workers: int = typer.Option(None, "--workers", help="Featurization processes (0 = all cores; default $XENOSCORE_WORKERS or 1)"),
 ):
-    df = read_any(input)
+    """Fold new labeled files into a linear model with partial_fit, reporting progressive validation per chunk."""
+    from .config import load_component_config
+    from .ml.incremental import IncrementalConfig, train_incremental
+    if chunksize < 1:
+        raise typer.BadParameter("--chunksize must be a positive integer")
     comp_cfg = load_component_config(config)["components"]
-    res = train_logistic(df, target, comp_cfg, TrainConfig(C=C, cv_folds=cv_folds), model_out)
+    artifact_out = artifact_out or str(Path(model_out).with_suffix(".npz"))
+    cfg = IncrementalConfig(alpha=alpha, chunksize=chunksize, workers=workers)
+    try:
+        res = train_incremental(input, target, comp_cfg, state, cfg, model_out, artifact_out)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
     print(json.dumps(res, indent=2))
 
+def _parse_grid(specs: List[str]) -> dict:
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        try:
+            grid[name.strip()] = [float(v) for v in values.split(",") if v.strip()]
+        except ValueError:
+            sep = ""
+        if not sep or not name.strip() or not grid.get(name.strip()):
+            raise typer.BadParameter(f"--grid expects feature=v1,v2,... (got {spec!r})")
+    return grid
+
+@app.command()
+def sweep(
+    input: str = typer.Option(..., "--input", "-i", help="Path to CSV/Parquet with samples"),
+    config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
+    weights: str = typer.Option(..., "--weights", "-w", help="Baseline weights YAML"),
+    grid: List[str] = typer.Option([], "--grid", help="feature=v1,v2,... (repeatable; cartesian product)"),
+    perturb: int = typer.Option(0, "--perturb", help="Number of random perturbations of the baseline weights"),
+    scale: float = typer.Option(0.2, "--scale", help="Relative perturbation size: weights x U(1-scale, 1+scale)"),
+    seed: int = typer.Option(0, "--seed", help="Random seed for --perturb"),
+    candidates: List[str] = typer.Option([], "--candidate", help="Weights YAML to compare (repeatable)"),
+    target: str = typer.Option("outcome", "--target", "-t", help="Outcome column for AUC (skipped when absent)"),
+    top_k: int = typer.Option(None, "--top-k", help="Size of the high-risk group for overlap (default 10% of rows)"),
+    delta: float = typer.Option(0.1, "--delta", help="Relative weight change for the sensitivity table"),
+    out: str = typer.Option("sweep.json", "--out", "-o", help="Output JSON report"),
+    validation: str = typer.Option("lenient", "--validation", help="Schema validation: strict|lenient|off"),
+    workers: int = typer.Option(None, "--workers", help="Featurization processes (0 = all cores; default $XENOSCORE_WORKERS or 1)"),
+    feature_cache: str = typer.Option(None, "--feature-cache", help="Directory of a persistent feature store (reuses unchanged rows)"),
+):
+    """Score many weight vectors on one feature matrix; report rank stability, AUC and sensitivity."""
+    import pandas as pd
+    from .config import load_component_config, load_weights_config
+    from .data.io import read_any
+    from .ml.feature_cache import FeatureCache
+    from .scoring.sweep import feature_matrix, grid_vectors, perturbed_vectors, yaml_vectors, run_sweep
+    _check_validation(validation)
+    base = load_weights_config(weights)
+    vectors = (grid_vectors(base, _parse_grid(grid)) if grid else []) + perturbed_vectors(base, perturb, scale, seed) + yaml_vectors(candidates)
+    if not vectors:
+        raise typer.BadParameter("Nothing to sweep: give --grid, --perturb and/or --candidate.")
+    comp_cfg = load_component_config(config)["components"]
+    df, errors = _validate(read_any(input, _component_columns(comp_cfg, target)), validation)
+    _report_errors(errors)
+    y = pd.to_numeric(df[target], errors="coerce").to_numpy() if target in df.columns else None
+    fm = feature_matrix(df, comp_cfg, workers, FeatureCache(feature_cache) if feature_cache else None)
+    report = run_sweep(fm, base, vectors, y, top_k, delta)
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    Path(out).write_text(json.dumps(report, indent=2))
+    worst = min(report["vectors"], key=lambda v: v["spearman"] if v["spearman"] is not None else 1.0)
+    print(f"[green]Evaluated {len(vectors)} weight vectors on {report['n_samples']} rows[/green]; "
+          f"lowest rank correlation {worst['spearman']} ({worst['label']})")
+    if "baseline_auc" in report:
+        best = max(report["vectors"], key=lambda v: v["auc"] if v["auc"] is not None else -1.0)
+        print(f"Baseline AUC {report['baseline_auc']:.3f}; best {best['auc']} ({best['label']})")
+    print(f"Most sensitive features: {', '.join(r['feature'] for r in report['sensitivity'][:3])}")
+    print(f"[green]Saved sweep report to[/green] {out}")
+
+@app.command()
+def labs(
+    labs: List[str] = typer.Option(..., "--labs", "-l", help="Long-format lab CSV/Parquet (ID, analyte, pod, value); repeatable"),
+    patients: str = typer.Option(None, "--patients", "-p", help="Wide patient table to fill the lab fields of (default: write the aggregates)"),
+    id_column: str = typer.Option("patient_id", "--id-column", help="Patient key in the lab and patient tables"),
+    out: str = typer.Option("labs.csv", "--out", "-o", help="Output path: .csv, .csv.gz/.bz2/.xz/.zst, .parquet or .feather/.arrow"),
+):
+    """Per-patient lab window aggregates (baseline, POD 1-3 peak/nadir, rise), or a patient table with its lab fields filled in."""
+    from .data.io import TableWriter, output_format, read_any
+    from .data.longitudinal import LongFormat, merge_labs, read_labs, window_aggregates
+    try:
+        output_format(out)
+        draws = read_labs(labs, LongFormat(id=id_column))
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    with span("aggregate_labs", len(draws)):
+        aggs = window_aggregates(draws, LongFormat(id=id_column))
+    if patients:
+        df = read_any(patients)
+        if id_column not in df.columns:
+            raise typer.BadParameter(f"--id-column {id_column!r} not found in {patients}")
+        result = merge_labs(df, aggs, id_column)
+    else:
+        result = aggs.reset_index()
+    with TableWriter(out) as writer:
+        writer.write(result)
+    print(f"[green]Saved {len(result)} rows ({len(draws)} draws) to[/green] {out}")
+
+@app.command()
+def rescore(
+    patients: str = typer.Option(..., "--patients", "-p", help="Wide patient table (the census), one row per patient"),
+    labs: List[str] = typer.Option([], "--labs", "-l", help="Long-format lab draws received since the last run; repeatable"),
+    state: str = typer.Option(..., "--state", help="State directory (draws, row hashes and scores of earlier runs)"),
+    config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
+    weights: str = typer.Option(None, "--weights", "-w", help="YAML of feature weights"),
+    model: str = typer.Option(None, "--model", "-m", help="Trained model (joblib or .npz/.json artifact)"),
+    id_column: str = typer.Option("patient_id", "--id-column", help="Patient key in the lab and patient tables"),
+    out: str = typer.Option("predictions.csv", "--out", "-o", help="Output path: .csv, .csv.gz/.bz2/.xz/.zst, .parquet or .feather/.arrow"),
+    validation: str = typer.Option("lenient", "--validation", help="Schema validation: strict|lenient|off"),
+    workers: int = typer.Option(None, "--workers", help="Featurization processes (0 = all cores; default $XENOSCORE_WORKERS or 1)"),
+):
+    """Score a census incrementally: only patients with new draws or changed rows are recomputed."""
+    from .data.io import TableWriter, output_format, read_any
+    from .data.longitudinal import LongFormat, read_labs
+    from .scoring.census import CensusState
+    from .scoring.engine import build_engine
+    _check_validation(validation)
+    if not model and not weights:
+        raise typer.BadParameter("Weights YAML is required when no model is provided.")
+    fmt = LongFormat(id=id_column)
+    try:
+        output_format(out)
+        draws = read_labs(labs, fmt)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    eng = build_engine(config, weights, model, workers=workers)
+    df = read_any(patients)
+    try:
+        result = CensusState(state, fmt).update(eng, df, draws, id_column, validate=lambda d: _validate(d, validation))
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    _report_errors(result.errors)
+    with TableWriter(out) as writer:
+        writer.write(result.predictions)
+    print(f"{result.new_draws} new draws; rescored {len(result.rescored)} of {len(df)} patients")
+    print(f"[green]Saved predictions to[/green] {out}")
+
+@app.command()
+def synth(
+    rows: int = typer.Option(1000, "--rows", "-n", help="Number of synthetic samples"),
+    out: str = typer.Option("synthetic.csv", "--out", "-o", help="Output CSV/Parquet path"),
+    seed: int = typer.Option(0, "--seed", help="Random seed"),
+    missing_scale: float = typer.Option(1.0, "--missing-scale", help="Multiplier on per-field missingness rates"),
+    chunksize: int = typer.Option(1_000_000, "--chunksize", help="Rows generated per chunk (bounded memory)"),
+):
+    """Write a synthetic cohort following the Sample schema (for tests and benchmarks)."""
+    from .data.synthetic import write_cohort
+    if rows < 0 or chunksize < 1:
+        raise typer.BadParameter("--rows must be >= 0 and --chunksize positive")
+    try:
+        write_cohort(out, rows, seed=seed, chunksize=chunksize, missing_scale=missing_scale)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    print(f"[green]Saved {rows} synthetic samples to[/green] {out}")
+
+@app.command()
+def bench(
+    sizes: str = typer.Option("1000,10000,100000", "--sizes", help="Comma-separated cohort sizes"),
+    formats: str = typer.Option("csv", "--formats", help="Input formats: csv, parquet or csv,parquet"),
+    config: str = typer.Option("configs/default_components.yaml", "--config", "-c", help="YAML of components"),
+    weights: str = typer.Option("configs/weights.example.yaml", "--weights", "-w", help="YAML of feature weights"),
+    stages: str = typer.Option(None, "--stages", help="Comma-separated subset of stages (default: all)"),
+    repeat: int = typer.Option(1, "--repeat", help="Runs per stage; the fastest is reported"),
+    memory: bool = typer.Option(True, "--memory/--no-memory", help="Measure peak memory (one extra traced run per stage)"),
+    out: str = typer.Option("bench.json", "--out", "-o", help="Output JSON report"),
+    baseline: str = typer.Option(None, "--compare", help="Earlier report; exit 1 on regressions beyond --tolerance"),
+    tolerance: float = typer.Option(0.25, "--tolerance", help="Allowed relative slowdown/memory growth"),
+    workdir: str = typer.Option(None, "--workdir", help="Directory for temporary cohort files"),
+    max_p99_ms: float = typer.Option(None, "--max-p99-ms", help="Exit 1 if the serve_request p99 latency exceeds this (ms)"),
+):
+    """Benchmark read, validation, featurization, scoring, training, CSV output and serve latency on synthetic cohorts."""
+    from .bench import STAGES, compare, run_benchmarks, save_report
+    try:
+        size_list = [int(float(s)) for s in sizes.split(",") if s.strip()]
+    except ValueError:
+        raise typer.BadParameter("--sizes must be comma-separated integers")
+    stage_list = [s.strip() for s in stages.split(",")] if stages else list(STAGES)
+    fmt_list = [f.strip().lower() for f in formats.split(",") if f.strip()]
+    if any(f not in ("csv", "parquet") for f in fmt_list):
+        raise typer.BadParameter("--formats must be csv and/or parquet")
+    show = lambda r: print(f"{r['stage']:>20} {r['rows']:>10} {r['format']:>8} {r['seconds']:9.3f}s"
+                           + (f" {r['peak_mb']:9.1f} MB" if "peak_mb" in r else "")
+                           + (f"  p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms" if "p99_ms" in r else ""))
+    try:
+        report = run_benchmarks(size_list, fmt_list, config, weights, workdir, repeat, memory, stage_list, progress=show)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    save_report(report, out)
+    print(f"[green]Saved benchmark report to[/green] {out}")
+    if max_p99_ms is not None:
+        slow = [r for r in report["results"] if r.get("p99_ms") is not None and r["p99_ms"] > max_p99_ms]
+        for r in slow:
+            print(f"[red]Latency[/red] {r['stage']} ({r['format']}): p99 {r['p99_ms']:.2f} ms > {max_p99_ms:g} ms")
+        if slow:
+            raise typer.Exit(code=1)
+    if baseline:
+        regressions = compare(json.loads(Path(baseline).read_text()), report, tolerance)
+        for r in regressions:
+            print(f"[red]Regression[/red] {r['stage']} ({r['rows']} rows, {r['format']}): "
+                  f"{r['metric']} {r['baseline']:.3f} -> {r['current']:.3f} (x{r['ratio']:.2f})")
+        if regressions:
+            raise typer.Exit(code=1)
+        print("[green]No regressions beyond tolerance.[/green]")
+
+@app.command()
+def serve(
+    config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
+    weights: str = typer.Option(None, "--weights", "-w", help="YAML of feature weights"),
+    model: str = typer.Option(None, "--model", "-m", help="Trained model (joblib or .npz/.json artifact)"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Bind address"),
+    port: int = typer.Option(8765, "--port", help="Bind port"),
+    validation: str = typer.Option("lenient", "--validation", help="Schema validation: strict|lenient|off"),
+    max_batch: int = typer.Option(256, "--max-batch", help="Largest micro-batch of single-sample requests"),
+    max_wait_ms: float = typer.Option(0.0, "--max-wait-ms", help="Extra time to wait for batch mates (0 = only what is queued)"),
+):
+    """Local HTTP/JSON scoring service: POST /score, GET /metrics, GET /health."""
+    from .scoring.engine import build_engine
+    from .serve import ScoringService, make_server
+    _check_validation(validation)
+    if not model and not weights:
+        raise typer.BadParameter("Weights YAML is required when no model is provided.")
+    try:
+        service = ScoringService(build_engine(config, weights, model), validation, max_batch, max_wait_ms)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    server = make_server(service, host, port)
+    print(f"[green]Serving XenoScore on[/green] http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+@app.command()
+def watch(
+    inbox: str = typer.Option(..., "--inbox", help="Directory partner sites drop CSV/Parquet files into"),
+    config: str = typer.Option(..., "--config", "-c", help="YAML of components"),
+    weights: str = typer.Option(None, "--weights", "-w", help="YAML of feature weights"),
+    model: str = typer.Option(None, "--model", "-m", help="Trained model (joblib or .npz/.json artifact)"),
+    done: str = typer.Option(None, "--done", help="Where scored inputs and their JSON sidecars go (default <inbox>/done)"),
+    failed: str = typer.Option(None, "--failed", help="Where inputs that could not be scored go (default <inbox>/failed)"),
+    out_dir: str = typer.Option(None, "--out-dir", help="Directory for <name>.predictions files (default <inbox>/scored)"),
+    out_format: str = typer.Option(None, "--out-format", help="Output extension, e.g. .parquet or .csv.gz (default: the input's)"),
+    id_columns: List[str] = typer.Option([], "--id-column", help="Write only this key column plus the predictions (repeatable)"),
+    validation: str = typer.Option("lenient", "--validation", help="Schema validation: strict|lenient|off"),
+    workers: int = typer.Option(1, "--workers", help="Scoring processes, each with a warm engine (1 = score in this process)"),
+    max_in_flight: int = typer.Option(4, "--max-in-flight", help="Files being read, scored or written at once"),
+    poll: float = typer.Option(1.0, "--poll", help="Seconds between inbox scans"),
+    settle: float = typer.Option(2.0, "--settle", help="Pick up a file once it has not been modified for this many seconds"),
+    once: bool = typer.Option(False, "--once", help="Score the files present now and exit"),
+):
+    """Score files as they arrive in an inbox directory, keeping engines warm between files."""
+    import asyncio
+    import signal
+    from .data.io import output_format
+    from .watch import WatchDirs, Watcher
+    _check_validation(validation)
+    if not model and not weights:
+        raise typer.BadParameter("Weights YAML is required when no model is provided.")
+    if workers < 1 or max_in_flight < 1:
+        raise typer.BadParameter("--workers and --max-in-flight must be positive")
+    if out_format:
+        out_format = out_format if out_format.startswith(".") else "." + out_format
+        try:
+            output_format("x" + out_format)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+
+    def report(r: dict) -> None:
+        if r["status"] == "failed":
+            print(f"[red]failed[/red] {r['file']}: {r['error']}")
+        elif r["status"] == "duplicate":
+            print(f"[yellow]duplicate[/yellow] {r['file']} (already scored as {r['duplicate_of']})")
+        else:
+            print(f"[green]scored[/green] {r['file']}: {r['rows']} rows, {r['validation_errors']} validation errors, "
+                  f"{r['timing']['total_s']:.2f}s")
+
+    watcher = Watcher(WatchDirs.under(inbox, done, failed, out_dir), (config, weights, model), validation, workers,
+                      max_in_flight, poll=poll, settle=settle, out_format=out_format, id_columns=id_columns,
+                      on_result=report)
+
+    async def run() -> dict:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)  # finish in-flight files, then exit
+            except (NotImplementedError, RuntimeError):
+                pass
+        return await watcher.run(once=once, stop=stop)
+
+    try:
+        watcher.start()
+        if not once:
+            print(f"[green]Watching[/green] {inbox} (Ctrl+C to stop)")
+        counts = asyncio.run(run())
+    except KeyboardInterrupt:
+        counts = dict(watcher.counts)
+    finally:
+        watcher.close()
+    print(f"{counts['done']} scored, {counts['failed']} failed, {counts['duplicate']} duplicates ({counts['rows']} rows)")
+
 if __name__ == "__main__":
     app()
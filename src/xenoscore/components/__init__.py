@@ -0,0 +1,4 @@
+"""
+Built-in feature components; importing this package registers them.
+"""
+from . import patient, immunology, donor  # noqa: F401
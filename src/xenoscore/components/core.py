@@ -1,29 +1,126 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import ClassVar, Dict, Any, List, Sequence, Tuple
 import math
+import numpy as np
+import pandas as pd
+from .. import profiling
 
 @dataclass
 class FeatureComponent:
     """Base class for all components.
     Implement `compute(row)` to return a {feature_name: numeric_value} mapping.
+    Optionally implement `compute_batch(df)` (or the array-level `compute_columns(df)`)
+    for a vectorized, column-wise version.
+    Declare `columns` (inputs read) and `features` (outputs) so scoring plans can
+    prune and project; an empty declaration means "unknown" and is never pruned.
     """
     params: Dict[str, Any] = field(default_factory=dict)
+    columns: ClassVar[Tuple[str, ...]] = ()
+    features: ClassVar[Tuple[str, ...]] = ()
 
     @property
     def required_columns(self) -> List[str]:
         """Optional: list of columns this component expects."""
-        return []
+        return list(self.columns)
+
+    @property
+    def output_features(self) -> List[str]:
+        """Optional: feature names `compute` returns, in order."""
+        return list(self.features)
 
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         raise NotImplementedError
 
+    def compute_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute features for every row of `df` (one column per feature, same index).
+        Default wraps `compute_columns` when a subclass implements it, else falls back
+        to row-wise `compute`.
+        """
+        if type(self).compute_columns is not FeatureComponent.compute_columns:
+            return pd.DataFrame(self.compute_columns(df), index=df.index)
+        rows = [self.compute(row) for row in df.to_dict(orient="records")]
+        return pd.DataFrame(rows, index=df.index)
+
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Array-level `compute_batch`: {feature_name: array aligned with df rows}.
+        Built-ins implement this to skip per-component DataFrame construction.
+        """
+        batch = self.compute_batch(df)
+        return {name: batch[name].to_numpy() for name in batch.columns}
+
+def _component_columns(comp: FeatureComponent, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    if not profiling.enabled():
+        return comp.compute_columns(df)
+    with profiling.span(profiling.component_span_name(comp), len(df)):
+        return comp.compute_columns(df)
+
+def compute_feature_matrix(
+    df: pd.DataFrame,
+    components: Sequence[FeatureComponent],
+    dtype: Any = np.float32,
+) -> Tuple[np.ndarray, List[str]]:
+    """Features as one column-major (rows x features) array of `dtype` plus its column names.
+    Declared features are written into the preallocated array as each component finishes,
+    so only one component's float64 outputs exist at a time; undeclared ones are appended.
+    """
+    slots: Dict[str, int] = {}
+    for comp in components:
+        for f in comp.output_features:
+            slots.setdefault(f, len(slots))
+    X = np.full((len(df), len(slots)), np.nan, dtype=dtype, order="F")
+    extra: Dict[str, np.ndarray] = {}
+    for comp in components:
+        for name, values in _component_columns(comp, df).items():
+            if name in slots:
+                X[:, slots[name]] = values
+            else:
+                extra[name] = np.asarray(values, dtype=dtype)
+    if extra:
+        full = np.empty((len(df), len(slots) + len(extra)), dtype=dtype, order="F")
+        full[:, :len(slots)] = X
+        for j, values in enumerate(extra.values(), start=len(slots)):
+            full[:, j] = values
+        X = full
+    return X, [*slots, *extra]
+
+def compute_features(df: pd.DataFrame, components: Sequence[FeatureComponent], dtype: Any = None) -> pd.DataFrame:
+    """Run each component's batch computation and merge outputs in component order.
+    A feature produced by several components keeps its first position and last value,
+    like successive `dict.update` calls in the row-wise engines. With `dtype` (e.g.
+    np.float32) the frame wraps a `compute_feature_matrix` array without copying it.
+    """
+    if dtype is not None:
+        X, names = compute_feature_matrix(df, components, dtype)
+        return pd.DataFrame(X, index=df.index, columns=names, copy=False)
+    cols: Dict[str, np.ndarray] = {}
+    for comp in components:
+        cols.update(_component_columns(comp, df))
+    return pd.DataFrame(cols, index=df.index)
+
 # Helper transforms
-def piecewise_linear(x: float, points: List[tuple[float, float]]) -> float:
-    """Map x via piecewise-linear (x_i -> y_i). points sorted by x_i."""
+@lru_cache(maxsize=256)
+def _sorted_points(points: Tuple[Tuple[float, float], ...]) -> Tuple[Tuple[Tuple[float, float], ...], np.ndarray, np.ndarray]:
+    pts = tuple(sorted(points, key=lambda p: p[0]))
+    xs = np.array([p[0] for p in pts], dtype=float)
+    ys = np.array([p[1] for p in pts], dtype=float)
+    return pts, xs, ys
+
+def _as_key(points) -> Tuple[Tuple[float, float], ...]:
+    if isinstance(points, tuple):
+        try:
+            hash(points)
+            return points
+        except TypeError:
+            pass
+    return tuple(tuple(p) for p in points)
+
+def piecewise_linear(x: float, points: Sequence[tuple[float, float]]) -> float:
+    """Map x via piecewise-linear (x_i -> y_i). Breakpoints are sorted once and cached."""
     if x is None or math.isnan(x):
         return 0.0
-    pts = sorted(points, key=lambda p: p[0])
+    pts = _sorted_points(_as_key(points))[0]
     # clamp
     if x <= pts[0][0]:
         return pts[0][1]
@@ -37,3 +134,56 @@ def piecewise_linear(x: float, points: List[tuple[float, float]]) -> float:
             t = (x - x0) / (x1 - x0)
             return y0 + t*(y1 - y0)
     return 0.0
+
+def piecewise_linear_array(x: np.ndarray, points: Sequence[tuple[float, float]]) -> np.ndarray:
+    """Vectorized `piecewise_linear`: same clamping, NaN -> 0.0 and identical float results."""
+    _, xs, ys = _sorted_points(_as_key(points))
+    x = np.asarray(x, dtype=float)
+    # index of the segment (x_j, x_j+1] containing x, as the scalar loop picks it
+    j = np.clip(np.searchsorted(xs, x, side="left") - 1, 0, len(xs) - 2) if len(xs) > 1 else np.zeros(x.shape, dtype=int)
+    x0, x1 = xs[j], xs[np.minimum(j + 1, len(xs) - 1)]
+    y0, y1 = ys[j], ys[np.minimum(j + 1, len(ys) - 1)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (x - x0) / (x1 - x0)
+        y = np.where(x1 == x0, y0, y0 + t*(y1 - y0))
+    y = np.where(x <= xs[0], ys[0], y)
+    y = np.where(x >= xs[-1], ys[-1], y)
+    return np.where(np.isnan(x), 0.0, y)
+
+# Column accessors reproducing the row-wise `row.get(...)` semantics
+def numeric_column(df: pd.DataFrame, name: str, default: float = np.nan) -> np.ndarray:
+    """Float array for `name`; absent columns and None cells become `default`, NaN stays NaN."""
+    if name not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    s = df[name]
+    if s.dtype == object or isinstance(s.dtype, pd.StringDtype):
+        values = s.to_numpy(dtype=object, copy=True)
+        values[np.equal(values, None)] = default
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    return s.to_numpy(dtype=float, na_value=np.nan)
+
+def truthy_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Boolean array equal to `bool(row.get(name))`. Missing values in a present column
+    count as True, as `bool(nan)` did for blank CSV cells: an unknown risk flag scores
+    as present. Absent columns are all False.
+    """
+    if name not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    s = df[name]
+    if isinstance(s.dtype, pd.BooleanDtype):
+        return s.to_numpy(dtype=bool, na_value=True)
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+        return s.to_numpy(dtype=object, na_value=np.nan).astype(bool)
+    # numpy applies Python truthiness to object arrays (None -> False, NaN -> True)
+    return s.to_numpy().astype(bool)
+
+def is_true_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Boolean array equal to `row.get(name) is True`."""
+    if name not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    s = df[name]
+    if s.dtype == bool:
+        return s.to_numpy()
+    if isinstance(s.dtype, pd.BooleanDtype):
+        return s.fillna(False).to_numpy(dtype=bool)
+    return np.fromiter((v is True or v is np.True_ for v in s.to_numpy(dtype=object)), dtype=bool, count=len(s))
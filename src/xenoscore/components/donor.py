@@ -1,11 +1,15 @@
 from __future__ import annotations
 from typing import Dict, Any
-from .core import FeatureComponent, piecewise_linear
+import numpy as np
+import pandas as pd
+from .core import FeatureComponent, piecewise_linear, piecewise_linear_array, numeric_column, truthy_column
 from ..registry import register_component
 
 @register_component("DonorGenetics")
 class DonorGeneticsComponent(FeatureComponent):
     """Protective gene edits/transgenes lower risk (negative contribution)."""
+    columns = ("ggta1_ko", "cmah_ko", "b4galnt2_ko", "hCD46", "hTHBD")
+    features = ("genetic_protection",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         # Count protective edits/transgenes present
         edits = int(bool(row.get("ggta1_ko"))) + int(bool(row.get("cmah_ko"))) + int(bool(row.get("b4galnt2_ko")))
@@ -15,19 +19,40 @@ class DonorGeneticsComponent(FeatureComponent):
         # Return as negative "risk" (engine can add weights accordingly)
         return {"genetic_protection": float(protection)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        edits = sum(truthy_column(df, c).astype(int) for c in ("ggta1_ko", "cmah_ko", "b4galnt2_ko"))
+        transgenes = sum(truthy_column(df, c).astype(int) for c in ("hCD46", "hTHBD"))
+        protection = np.minimum(1.0, 0.15*edits + 0.2*transgenes)
+        return {"genetic_protection": protection}
+
+DONOR_AGE_POINTS = ((2,0.2),(6,0.0),(12,0.1),(24,0.4),(36,0.7))
+DONOR_WEIGHT_POINTS = ((30,0.2),(50,0.0),(80,0.2),(120,0.6))
+
 @register_component("DonorAgeSize")
 class DonorAgeSizeComponent(FeatureComponent):
     """Age/size away from target windows increases risk."""
+    columns = ("donor_age_months", "donor_weight_kg")
+    features = ("donor_age_size_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         age = row.get("donor_age_months")
         wt = row.get("donor_weight_kg")
         # Example desired windows (edit as evidence evolves)
-        age_r = piecewise_linear(age if age is not None else 8.0, [(2,0.2),(6,0.0),(12,0.1),(24,0.4),(36,0.7)])
-        wt_r = piecewise_linear(wt if wt is not None else 60.0, [(30,0.2),(50,0.0),(80,0.2),(120,0.6)])
+        age_r = piecewise_linear(age if age is not None else 8.0, DONOR_AGE_POINTS)
+        wt_r = piecewise_linear(wt if wt is not None else 60.0, DONOR_WEIGHT_POINTS)
         return {"donor_age_size_risk": float(0.5*age_r + 0.5*wt_r)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        age_r = piecewise_linear_array(numeric_column(df, "donor_age_months", 8.0), DONOR_AGE_POINTS)
+        wt_r = piecewise_linear_array(numeric_column(df, "donor_weight_kg", 60.0), DONOR_WEIGHT_POINTS)
+        return {"donor_age_size_risk": 0.5*age_r + 0.5*wt_r}
+
 @register_component("DonorPCMV")
 class DonorPCMVComponent(FeatureComponent):
     """pCMV positivity -> high risk."""
+    columns = ("donor_pcmv",)
+    features = ("donor_pcmv_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         return {"donor_pcmv_risk": 1.0 if row.get("donor_pcmv") else 0.0}
+
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        return {"donor_pcmv_risk": truthy_column(df, "donor_pcmv").astype(float)}
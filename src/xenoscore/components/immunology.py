@@ -1,32 +1,64 @@
 from __future__ import annotations
 from typing import Dict, Any
-from .core import FeatureComponent, piecewise_linear
+import numpy as np
+import pandas as pd
+from .core import FeatureComponent, piecewise_linear, piecewise_linear_array, numeric_column, truthy_column, is_true_column
 from ..registry import register_component
 
+TITER_POINTS = ((0,0.0),(32,0.3),(64,0.6),(128,1.0))
+
 @register_component("BaselineAntibody")
 class BaselineAntibodyComponent(FeatureComponent):
     """Score baseline anti-pig IgG/IgM titers (higher -> higher risk)."""
+    columns = ("baseline_anti_pig_IgG", "baseline_anti_pig_IgM")
+    features = ("baseline_humoral_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         igg = row.get("baseline_anti_pig_IgG")
         igm = row.get("baseline_anti_pig_IgM")
-        igg_r = piecewise_linear(igg if igg is not None else 0.0, [(0,0.0),(32,0.3),(64,0.6),(128,1.0)])
-        igm_r = piecewise_linear(igm if igm is not None else 0.0, [(0,0.0),(32,0.3),(64,0.6),(128,1.0)])
+        igg_r = piecewise_linear(igg if igg is not None else 0.0, TITER_POINTS)
+        igm_r = piecewise_linear(igm if igm is not None else 0.0, TITER_POINTS)
         return {"baseline_humoral_risk": float(0.5*igg_r + 0.5*igm_r)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        igg_r = piecewise_linear_array(numeric_column(df, "baseline_anti_pig_IgG", 0.0), TITER_POINTS)
+        igm_r = piecewise_linear_array(numeric_column(df, "baseline_anti_pig_IgM", 0.0), TITER_POINTS)
+        return {"baseline_humoral_risk": 0.5*igg_r + 0.5*igm_r}
+
+CXM_MFI_POINTS = ((0,0.0),(500,0.2),(1000,0.5),(2000,0.9),(5000,1.0))
+
 @register_component("FlowCrossmatch")
 class FlowCrossmatchComponent(FeatureComponent):
     """Use MFI or boolean positivity to estimate risk."""
+    columns = ("flow_cxm_positive", "flow_cxm_mfi")
+    features = ("cxm_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         if row.get("flow_cxm_positive") is True:
             return {"cxm_risk": 1.0}
         mfi = row.get("flow_cxm_mfi")
-        mfi_r = piecewise_linear(mfi if mfi is not None else 0.0,
-                                 [(0,0.0),(500,0.2),(1000,0.5),(2000,0.9),(5000,1.0)])
+        mfi_r = piecewise_linear(mfi if mfi is not None else 0.0, CXM_MFI_POINTS)
         return {"cxm_risk": float(mfi_r)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        mfi_r = piecewise_linear_array(numeric_column(df, "flow_cxm_mfi", 0.0), CXM_MFI_POINTS)
+        risk = np.where(is_true_column(df, "flow_cxm_positive"), 1.0, mfi_r)
+        return {"cxm_risk": risk}
+
+RISE_POINTS = ((0,0.0),(16,0.3),(32,0.6),(64,1.0))
+
+def _rise(df: pd.DataFrame, baseline: str, day1: str, day3: str) -> np.ndarray:
+    """Vectorized `max(0.0, max(d1 or 0.0, d3 or 0.0) - (b or 0.0))`, NaN ordering included."""
+    b = numeric_column(df, baseline, 0.0)
+    d1 = numeric_column(df, day1, 0.0)
+    d3 = numeric_column(df, day3, 0.0)
+    peak = np.where(d3 > d1, d3, d1)
+    delta = peak - b
+    return np.where(delta > 0.0, delta, 0.0)
+
 @register_component("EarlyHumoralResponse")
 class EarlyHumoralResponseComponent(FeatureComponent):
     """Capture IgG/IgM rise from baseline to POD1-3."""
+    columns = ("baseline_anti_pig_IgG", "baseline_anti_pig_IgM", "pod1_IgG", "pod3_IgG", "pod1_IgM", "pod3_IgM")
+    features = ("early_humoral_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         b_igg, b_igm = row.get("baseline_anti_pig_IgG"), row.get("baseline_anti_pig_IgM")
         d1_igg, d3_igg = row.get("pod1_IgG"), row.get("pod3_IgG")
@@ -34,30 +66,64 @@ class EarlyHumoralResponseComponent(FeatureComponent):
         rise_igg = max(0.0, (max(d1_igg or 0.0, d3_igg or 0.0) - (b_igg or 0.0)))
         rise_igm = max(0.0, (max(d1_igm or 0.0, d3_igm or 0.0) - (b_igm or 0.0)))
         # Normalize via piecewise for fold-equivalent rise
-        igg_r = piecewise_linear(rise_igg, [(0,0.0),(16,0.3),(32,0.6),(64,1.0)])
-        igm_r = piecewise_linear(rise_igm, [(0,0.0),(16,0.3),(32,0.6),(64,1.0)])
+        igg_r = piecewise_linear(rise_igg, RISE_POINTS)
+        igm_r = piecewise_linear(rise_igm, RISE_POINTS)
         return {"early_humoral_risk": float(0.5*igg_r + 0.5*igm_r)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        igg_r = piecewise_linear_array(_rise(df, "baseline_anti_pig_IgG", "pod1_IgG", "pod3_IgG"), RISE_POINTS)
+        igm_r = piecewise_linear_array(_rise(df, "baseline_anti_pig_IgM", "pod1_IgM", "pod3_IgM"), RISE_POINTS)
+        return {"early_humoral_risk": 0.5*igg_r + 0.5*igm_r}
+
+C3_DROP_POINTS = ((0,0.0),(10,0.3),(30,0.7),(50,1.0))
+C4_DROP_POINTS = ((0,0.0),(5,0.3),(15,0.7),(30,1.0))
+
+def _drop(df: pd.DataFrame, baseline: str, pod3: str) -> np.ndarray:
+    """Vectorized `(b or 0.0) - (p or b or 0.0)`."""
+    b = numeric_column(df, baseline, 0.0)
+    p = numeric_column(df, pod3, 0.0)
+    return b - np.where(p == 0.0, b, p)
+
 @register_component("ComplementConsumption")
 class ComplementConsumptionComponent(FeatureComponent):
     """Decrease in C3/C4 indicates consumption -> higher risk."""
+    columns = ("baseline_C3", "pod3_C3", "baseline_C4", "pod3_C4")
+    features = ("complement_consumption_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         c3_drop = (row.get("baseline_C3") or 0.0) - (row.get("pod3_C3") or row.get("baseline_C3") or 0.0)
         c4_drop = (row.get("baseline_C4") or 0.0) - (row.get("pod3_C4") or row.get("baseline_C4") or 0.0)
-        c3_r = piecewise_linear(c3_drop, [(0,0.0),(10,0.3),(30,0.7),(50,1.0)])
-        c4_r = piecewise_linear(c4_drop, [(0,0.0),(5,0.3),(15,0.7),(30,1.0)])
+        c3_r = piecewise_linear(c3_drop, C3_DROP_POINTS)
+        c4_r = piecewise_linear(c4_drop, C4_DROP_POINTS)
         return {"complement_consumption_risk": float(0.5*c3_r + 0.5*c4_r)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        c3_r = piecewise_linear_array(_drop(df, "baseline_C3", "pod3_C3"), C3_DROP_POINTS)
+        c4_r = piecewise_linear_array(_drop(df, "baseline_C4", "pod3_C4"), C4_DROP_POINTS)
+        return {"complement_consumption_risk": 0.5*c3_r + 0.5*c4_r}
+
+SC5B9_POINTS = ((0,0.0),(100,0.4),(250,0.7),(500,1.0))
+
 @register_component("ComplementActivation")
 class ComplementActivationComponent(FeatureComponent):
     """Soluble C5b-9 (MAC) as activation marker (higher -> higher risk)."""
+    columns = ("sC5b9",)
+    features = ("complement_activation_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         sc5b9 = row.get("sC5b9")
-        r = piecewise_linear(sc5b9 if sc5b9 is not None else 0.0, [(0,0.0),(100,0.4),(250,0.7),(500,1.0)])
+        r = piecewise_linear(sc5b9 if sc5b9 is not None else 0.0, SC5B9_POINTS)
         return {"complement_activation_risk": float(r)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        r = piecewise_linear_array(numeric_column(df, "sC5b9", 0.0), SC5B9_POINTS)
+        return {"complement_activation_risk": r}
+
 @register_component("DSA")
 class DSAComponent(FeatureComponent):
     """Donor-specific antibodies presence (boolean)."""
+    columns = ("dsa_present",)
+    features = ("dsa_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         return {"dsa_risk": 1.0 if row.get("dsa_present") else 0.0}
+
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        return {"dsa_risk": truthy_column(df, "dsa_present").astype(float)}
@@ -1,43 +1,85 @@
 from __future__ import annotations
 from typing import Dict, Any
-from .core import FeatureComponent, piecewise_linear
+import numpy as np
+import pandas as pd
+from .core import FeatureComponent, piecewise_linear, piecewise_linear_array, numeric_column, truthy_column
 from ..registry import register_component
 
 @register_component("InfectionStatus")
 class InfectionStatusComponent(FeatureComponent):
     """Map infection status to risk (active > recent > none)."""
+    columns = ("infection_status",)
+    features = ("infection_risk",)
     mapping = {"active": 1.0, "recent": 0.5, "none": 0.0}
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         status = str(row.get("infection_status") or "none").lower()
         return {"infection_risk": float(self.mapping.get(status, 0.0))}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        if "infection_status" in df.columns:
+            # look up each distinct status once; missing/None/unknown all map to 0.0, as in `compute`
+            codes, uniques = pd.factorize(df["infection_status"].to_numpy(dtype=object))
+            lookup = np.array([self.mapping.get(str(u or "none").lower(), 0.0) for u in uniques] + [0.0])
+            risk = lookup[codes]
+        else:
+            risk = np.zeros(len(df))
+        return {"infection_risk": risk}
+
+RENAL_EGFR_POINTS = ((15,1.0),(30,0.7),(60,0.3),(90,0.0))
+
 @register_component("RenalFunction")
 class RenalFunctionComponent(FeatureComponent):
     """Use eGFR to score renal risk (lower eGFR = higher risk)."""
+    columns = ("egfr",)
+    features = ("renal_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         egfr = row.get("egfr")
         # Example piecewise map: 15->1.0, 30->0.7, 60->0.3, 90->0.0
-        y = piecewise_linear(egfr if egfr is not None else 90.0,
-                             [(15,1.0),(30,0.7),(60,0.3),(90,0.0)])
+        y = piecewise_linear(egfr if egfr is not None else 90.0, RENAL_EGFR_POINTS)
         return {"renal_risk": float(y)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        y = piecewise_linear_array(numeric_column(df, "egfr", 90.0), RENAL_EGFR_POINTS)
+        return {"renal_risk": y}
+
+CARDIO_LVEF_POINTS = ((20,1.0),(35,0.7),(50,0.3),(60,0.1),(70,0.0))
+CARDIO_MAP_POINTS = ((50,1.0),(60,0.6),(70,0.3),(80,0.1),(90,0.0))
+
 @register_component("CardiovascularFunction")
 class CardiovascularFunctionComponent(FeatureComponent):
     """Combine LVEF and MAP into a simple risk proxy."""
+    columns = ("lvef", "map_mmHg")
+    features = ("cardio_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         lvef = row.get("lvef", 60.0)  # percent
         mapx = row.get("map_mmHg", 75.0)
         # Lower EF -> higher risk; very low MAP -> higher risk
-        ef_risk = piecewise_linear(lvef, [(20,1.0),(35,0.7),(50,0.3),(60,0.1),(70,0.0)])
-        map_risk = piecewise_linear(mapx, [(50,1.0),(60,0.6),(70,0.3),(80,0.1),(90,0.0)])
+        ef_risk = piecewise_linear(lvef, CARDIO_LVEF_POINTS)
+        map_risk = piecewise_linear(mapx, CARDIO_MAP_POINTS)
         return {"cardio_risk": float(0.6*ef_risk + 0.4*map_risk)}
 
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        # defaults only apply to absent columns; None cells score 0.0 like NaN
+        lvef = numeric_column(df, "lvef") if "lvef" in df.columns else np.full(len(df), 60.0)
+        mapx = numeric_column(df, "map_mmHg") if "map_mmHg" in df.columns else np.full(len(df), 75.0)
+        ef_risk = piecewise_linear_array(lvef, CARDIO_LVEF_POINTS)
+        map_risk = piecewise_linear_array(mapx, CARDIO_MAP_POINTS)
+        return {"cardio_risk": 0.6*ef_risk + 0.4*map_risk}
+
 @register_component("PreXenoClinicalContext")
 class PreXenoClinicalContextComponent(FeatureComponent):
     """Binary flags -> additive risk proxy."""
+    columns = ("dialysis", "mechanical_support", "vasopressors")
+    features = ("context_risk",)
     def compute(self, row: Dict[str, Any]) -> Dict[str, float]:
         dialysis = 1.0 if row.get("dialysis") else 0.0
         mech = 1.0 if row.get("mechanical_support") else 0.0
         vaso = 1.0 if row.get("vasopressors") else 0.0
         # Normalize to [0,1]
         return {"context_risk": float(min(1.0, (dialysis + mech + vaso)/3.0))}
+
+    def compute_columns(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        dialysis = truthy_column(df, "dialysis").astype(float)
+        mech = truthy_column(df, "mechanical_support").astype(float)
+        vaso = truthy_column(df, "vasopressors").astype(float)
+        return {"context_risk": np.minimum(1.0, (dialysis + mech + vaso)/3.0)}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import yaml
 
 class ConfigError(Exception):
@@ -33,3 +33,38 @@ def load_weights_config(path: str | Path) -> Dict[str, float]:
         raise ConfigError("Invalid weights mapping in YAML.")
     # Ensure all weights are floats
     return {str(k): float(v) for k, v in weights.items()}
+
+def load_raw_score_range(path: str | Path) -> Optional[Tuple[float, float]]:
+    """Optional fixed `raw_score_range: [lo, hi]` from a weights YAML (batch-independent scaling)."""
+    rng = load_yaml(path).get("raw_score_range")
+    if rng is None:
+        return None
+    if not isinstance(rng, (list, tuple)) or len(rng) != 2:
+        raise ConfigError("raw_score_range must be a [lo, hi] pair.")
+    lo, hi = float(rng[0]), float(rng[1])
+    if hi < lo:
+        raise ConfigError("raw_score_range must satisfy lo <= hi.")
+    return lo, hi
+
+def load_profile_manifest(path: str | Path) -> Dict[str, Dict[str, Optional[str]]]:
+    """Scoring profiles from a manifest YAML, paths resolved against the manifest's folder:
+
+        profiles:
+          kidney: {config: kidney_components.yaml, weights: weights.kidney.yaml}
+          heart: {config: heart_components.yaml, model: heart.npz}
+    """
+    profiles = load_yaml(path).get("profiles")
+    if not isinstance(profiles, dict) or not profiles:
+        raise ConfigError("Manifest needs a non-empty `profiles` mapping of name -> {config, weights|model}.")
+    base = Path(path).parent
+    out: Dict[str, Dict[str, Optional[str]]] = {}
+    for name, spec in profiles.items():
+        if not isinstance(spec, dict) or not spec.get("config"):
+            raise ConfigError(f"Profile {name!r} needs a `config` path.")
+        if bool(spec.get("weights")) == bool(spec.get("model")):
+            raise ConfigError(f"Profile {name!r} needs exactly one of `weights` or `model`.")
+        unknown = set(spec) - {"config", "weights", "model"}
+        if unknown:
+            raise ConfigError(f"Profile {name!r} has unknown keys: {sorted(unknown)}")
+        out[str(name)] = {k: str(base / spec[k]) if spec.get(k) else None for k in ("config", "weights", "model")}
+    return out
@@ -1,17 +1,268 @@
 from __future__ import annotations
+import bz2
+import gzip
+import lzma
+import os
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence
 import pandas as pd
+from .validation import FIELD_KINDS, typed_column
 
-def read_any(path: str | Path) -> pd.DataFrame:
+# CSV dtypes for Sample fields. Literal columns stay unrestricted categoricals so values
+# outside the allowed set survive parsing and are reported by validation.
+_KIND_DTYPES = {"float": "float64", "int": "Int64", "bool": "boolean", "literal": "category"}
+SAMPLE_DTYPES: Dict[str, Any] = {name: _KIND_DTYPES[kind] for name, (kind, _) in FIELD_KINDS.items() if kind in _KIND_DTYPES}
+# compact plan: float32 for labs, vitals and donor measurements
+COMPACT_DTYPES: Dict[str, Any] = {name: "float32" if dt == "float64" else dt for name, dt in SAMPLE_DTYPES.items()}
+
+def available_columns(path: str | Path) -> List[str]:
+    """Column names of a CSV/Parquet file, read from the header / schema only."""
+    p = Path(path)
+    if p.suffix.lower() in {".csv"}:
+        return list(pd.read_csv(p, nrows=0).columns)
+    elif p.suffix.lower() in {".parquet"}:
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(p).names)
+    else:
+        raise ValueError(f"Unsupported format: {p.suffix}")
+
+def _projection(path: Path, columns: Optional[Sequence[str]], passthrough: Sequence[str]) -> Optional[List[str]]:
+    """File columns to load (in file order): `columns` that exist plus every `passthrough`."""
+    if columns is None:
+        return None
+    available = available_columns(path)
+    missing = [c for c in passthrough if c not in available]
+    if missing:
+        raise ValueError(f"Pass-through columns not found in {path.name}: {missing}")
+    wanted = set(columns) | set(passthrough)
+    return [c for c in available if c in wanted]
+
+def _compact_table(table: Any) -> pd.DataFrame:
+    """Arrow table -> frame with numeric Sample fields narrowed to float32 before conversion."""
+    import pyarrow as pa
+    for i, f in enumerate(table.schema):
+        if FIELD_KINDS.get(f.name, ("other",))[0] == "float" and (pa.types.is_floating(f.type) or pa.types.is_integer(f.type)):
+            table = table.set_column(i, f.name, table.column(i).cast(pa.float32(), safe=False))
+    # free each Arrow column as soon as it is converted instead of holding both copies
+    df = table.to_pandas(types_mapper={pa.bool_(): pd.BooleanDtype()}.get, split_blocks=True, self_destruct=True)
+    pa.default_memory_pool().release_unused()
+    return df
+
+def read_any(
+    path: str | Path,
+    columns: Optional[Sequence[str]] = None,
+    passthrough: Sequence[str] = (),
+    compact: bool = False,
+) -> pd.DataFrame:
+    """Read a CSV/Parquet file. With `columns` (e.g. the inputs of the scoring plan), only
+    those present in the file plus `passthrough` are loaded (pushed down to the Parquet
+    reader). CSV Sample fields are parsed with `SAMPLE_DTYPES`; if a cell does not fit,
+    the file is re-read with type inference and validation reports the bad values.
+    `compact` reads numeric Sample fields as float32 (`COMPACT_DTYPES`).
+    """
+    p = Path(path)
+    if p.suffix.lower() in {".csv"}:
+        usecols = _projection(p, columns, passthrough)
+        try:
+            return pd.read_csv(p, usecols=usecols, dtype=COMPACT_DTYPES if compact else SAMPLE_DTYPES)
+        except (ValueError, TypeError):
+            return pd.read_csv(p, usecols=usecols)
+    elif p.suffix.lower() in {".parquet"}:
+        if compact:
+            import pyarrow.parquet as pq
+            return _compact_table(pq.read_table(p, columns=_projection(p, columns, passthrough)))
+        return pd.read_parquet(p, columns=_projection(p, columns, passthrough))
+    else:
+        raise ValueError(f"Unsupported format: {p.suffix}")
+
+def _csv_chunks(p: Path, chunksize: int, usecols: Optional[List[str]], dtype: Dict[str, Any],
+                infer: Optional[Sequence[str]]) -> Iterator[pd.DataFrame]:
+    # each chunk infers types on its own, so columns outside the schema are read as text
+    # unless listed in `infer`: an ID that is numeric in one chunk and "A4" in the next
+    # must not change type mid-file
+    text: Dict[str, Any] = {}
+    if infer is not None:
+        text = {c: str for c in (usecols or available_columns(p)) if c not in dtype and c not in set(infer)}
+    # one reader for the whole file: chunks are parsed with inference and cast to the Sample
+    # dtypes afterwards, so a cell that does not fit needs no re-read; from that chunk on
+    # the inferred types are kept, as `read_any` does for the whole file
+    cast = None
+    with pd.read_csv(p, chunksize=chunksize, usecols=usecols, dtype=text) as reader:
+        for chunk in reader:
+            if cast is None:
+                cast = {c: dt for c, dt in dtype.items() if c in chunk.columns}
+            if cast:
+                try:
+                    chunk = chunk.astype(cast)
+                except (ValueError, TypeError):
+                    cast = {}
+            yield chunk
+
+def iter_chunks(
+    path: str | Path,
+    chunksize: int,
+    columns: Optional[Sequence[str]] = None,
+    passthrough: Sequence[str] = (),
+    compact: bool = False,
+    infer: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield `path` in frames of at most `chunksize` rows (CSV chunks / Parquet record batches).
+    Chunks carry a running RangeIndex, so row labels match a whole-file `read_any`;
+    `columns`/`passthrough`/`compact` project and type columns as in `read_any`.
+    With `infer` (e.g. the component inputs), CSV columns outside the Sample schema and
+    not in `infer` are read as strings, so their type is the same in every chunk.
+    """
     p = Path(path)
     if p.suffix.lower() in {".csv"}:
-        return pd.read_csv(p)
+        yield from _csv_chunks(p, chunksize, _projection(p, columns, passthrough),
+                               COMPACT_DTYPES if compact else SAMPLE_DTYPES, infer)
     elif p.suffix.lower() in {".parquet"}:
-        return pd.read_parquet(p)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        start = 0
+        for batch in pq.ParquetFile(p).iter_batches(batch_size=chunksize, columns=_projection(p, columns, passthrough)):
+            chunk = _compact_table(pa.Table.from_batches([batch])) if compact else batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
     else:
         raise ValueError(f"Unsupported format: {p.suffix}")
 
-def write_csv(df: pd.DataFrame, path: str | Path) -> None:
+def write_csv(df: pd.DataFrame, path: str | Path, append: bool = False) -> None:
+    """Write df as CSV; with `append`, add rows to an existing file without a header."""
     Path(path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False)
+    if append:
+        df.to_csv(path, index=False, mode="a", header=False)
+    else:
+        df.to_csv(path, index=False)
+
+def _open_zstd(path: Path, mode: str) -> IO:
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Writing .zst output needs the `zstandard` package (pip install zstandard)")
+    return zstandard.open(path, mode, encoding="utf-8")
+
+_CSV_OPENERS: Dict[str, Callable[[Path, str], IO]] = {
+    ".gz": lambda p, m: gzip.open(p, m, compresslevel=6, encoding="utf-8"),
+    ".bz2": lambda p, m: bz2.open(p, m, encoding="utf-8"),
+    ".xz": lambda p, m: lzma.open(p, m, encoding="utf-8"),
+    ".zst": _open_zstd,
+}
+ARROW_SUFFIXES = {".feather", ".arrow", ".ipc"}
+
+def output_format(path: str | Path) -> str:
+    """"csv", "csv<compression suffix>", "parquet" or "arrow", chosen by the extension of `path`."""
+    suffixes = [x.lower() for x in Path(path).suffixes[-2:]]
+    last = suffixes[-1] if suffixes else ""
+    if last == ".csv":
+        return "csv"
+    if last in _CSV_OPENERS and len(suffixes) == 2 and suffixes[0] == ".csv":
+        return "csv" + last
+    if last == ".parquet":
+        return "parquet"
+    if last in ARROW_SUFFIXES:
+        return "arrow"
+    raise ValueError(f"Unsupported output format: {Path(path).name} "
+                     f"(expected .csv, .csv{{{','.join(_CSV_OPENERS)}}}, .parquet or {', '.join(sorted(ARROW_SUFFIXES))})")
+
+def _arrow_column(s: pd.Series) -> Any:
+    import pyarrow as pa
+    try:
+        return pa.array(s, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    # mixed-type object column, e.g. raw values lenient validation kept for invalid cells
+    if FIELD_KINDS.get(s.name, ("other",))[0] != "other":
+        return pa.array(pd.Series(typed_column(s)), from_pandas=True)
+    return pa.array([None if pd.isna(v) else str(v) for v in s.to_numpy(dtype=object)], pa.string())
+
+class TableWriter:
+    """Write frames to one CSV, compressed CSV (.csv.gz/.bz2/.xz/.zst), Parquet or Arrow IPC
+    (.feather/.arrow) file, picked by the extension of `path`, one `write` per chunk.
+
+    `write(*parts)` takes frames sharing an index (e.g. inputs and predictions) and emits
+    their columns side by side without first building a combined frame. Output goes to
+    `<path>.part` and is moved into place by `close`, so readers never see a partial file.
+    In columnar formats the first chunk fixes the schema and cells that lenient
+    validation left invalid are written as nulls.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.format = output_format(self.path)
+        self.tmp = self.path.with_name(self.path.name + ".part")
+        self.rows = 0
+        self._handle: Optional[IO] = None
+        self._writer: Any = None
+        self._schema: Any = None
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc: Any) -> None:
+        self.close(commit=exc_type is None)
+
+    def _frame(self, parts: Sequence[pd.DataFrame]) -> pd.DataFrame:
+        if len(parts) == 1:
+            return parts[0]
+        names = [c for p in parts for c in p.columns]
+        if len(set(names)) < len(names):
+            return pd.concat(parts, axis=1)  # keep duplicated names side by side
+        # a shallow copy shares the input's blocks; new columns are added as references
+        out = parts[0].copy(deep=False)
+        for p in parts[1:]:
+            for c in p.columns:
+                out[c] = p[c]
+        return out
+
+    def _table(self, parts: Sequence[pd.DataFrame]) -> Any:
+        import pyarrow as pa
+        names = [str(c) for p in parts for c in p.columns]
+        table = pa.Table.from_arrays([_arrow_column(p[c]) for p in parts for c in p.columns], names=names)
+        if self.format == "arrow":
+            # the IPC file format cannot change dictionaries between batches
+            table = pa.Table.from_arrays(
+                [col.cast(col.type.value_type) if pa.types.is_dictionary(col.type) else col for col in table.columns],
+                names=names)
+        if self._schema is None:
+            self._schema = table.schema
+        elif not table.schema.equals(self._schema):
+            try:
+                table = table.cast(self._schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError) as e:
+                raise ValueError(f"Chunk does not match the output schema of {self.path.name}: {e}")
+        return table
+
+    def write(self, *parts: pd.DataFrame) -> None:
+        self.tmp.parent.mkdir(parents=True, exist_ok=True)
+        if self.format.startswith("csv"):
+            if self._handle is None:
+                opener = _CSV_OPENERS.get(self.format[3:])
+                self._handle = opener(self.tmp, "wt") if opener else open(self.tmp, "w", encoding="utf-8")
+                header = True
+            else:
+                header = False
+            self._frame(parts).to_csv(self._handle, index=False, header=header, lineterminator="\n")
+        else:
+            table = self._table(parts)
+            if self._writer is None:
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.tmp, table.schema)
+                else:
+                    import pyarrow as pa
+                    self._writer = pa.ipc.new_file(self.tmp, table.schema,
+                                                   options=pa.ipc.IpcWriteOptions(compression="lz4"))
+            self._writer.write_table(table)
+        self.rows += len(parts[0])
+
+    def close(self, commit: bool = True) -> None:
+        for h in (self._handle, self._writer):
+            if h is not None:
+                h.close()
+        self._handle = self._writer = None
+        if commit and self.tmp.exists():
+            os.replace(self.tmp, self.path)
+        else:
+            self.tmp.unlink(missing_ok=True)
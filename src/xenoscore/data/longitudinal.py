@@ -0,0 +1,118 @@
+"""
+Long-format lab time series -> per-patient window aggregates -> Sample lab fields.
+
+Lab systems export one row per patient, analyte and draw. Instead of pivoting draws
+onto fixed timepoints, every (patient, analyte) series is reduced with grouped
+operations to:
+
+    baseline  last draw on or before the transplant (POD <= 0)
+    first     earliest draw in the post-operative window
+    peak      maximum over the window (POD 1-3: after transplant up to the end of day 3)
+    nadir     minimum over the window
+    rise      peak - baseline, floored at 0
+
+`lab_fields` maps these onto the Sample fields the immunology components read:
+IgG/IgM baseline, first and peak feed EarlyHumoralResponse (its rise is the window peak
+minus the baseline), the C3/C4 baseline and nadir feed ComplementConsumption, and the
+sC5b9 peak feeds ComplementActivation.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .io import read_any
+
+@dataclass(frozen=True)
+class LongFormat:
+    """Column names of a long-format lab table."""
+    id: str = "patient_id"
+    analyte: str = "analyte"
+    time: str = "pod"      # post-operative day of the draw; <= 0 is pre-transplant
+    value: str = "value"
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.id, self.analyte, self.time, self.value]
+
+WINDOW: Tuple[float, float] = (0.0, 3.0)  # (exclusive start, inclusive end) in post-operative days
+AGGREGATES = ("baseline", "first", "peak", "nadir", "rise")
+
+# analyte -> {aggregate: Sample field it feeds}
+LAB_FIELDS: Dict[str, Dict[str, str]] = {
+    "IgG": {"baseline": "baseline_anti_pig_IgG", "first": "pod1_IgG", "peak": "pod3_IgG"},
+    "IgM": {"baseline": "baseline_anti_pig_IgM", "first": "pod1_IgM", "peak": "pod3_IgM"},
+    "C3": {"baseline": "baseline_C3", "nadir": "pod3_C3"},
+    "C4": {"baseline": "baseline_C4", "nadir": "pod3_C4"},
+    "sC5b9": {"peak": "sC5b9"},
+}
+
+def normalize_labs(labs: pd.DataFrame, fmt: LongFormat = LongFormat()) -> pd.DataFrame:
+    """The four long-format columns: string IDs and analytes, numeric time and value;
+    draws missing either number are dropped."""
+    missing = [c for c in fmt.columns if c not in labs.columns]
+    if missing:
+        raise ValueError(f"Lab table is missing columns: {missing}")
+    out = labs[fmt.columns].copy()
+    out[fmt.id] = out[fmt.id].astype(str)
+    out[fmt.analyte] = out[fmt.analyte].astype(str)
+    out[fmt.time] = pd.to_numeric(out[fmt.time], errors="coerce").astype(float)
+    out[fmt.value] = pd.to_numeric(out[fmt.value], errors="coerce").astype(float)
+    return out.dropna(subset=[fmt.time, fmt.value]).reset_index(drop=True)
+
+def read_labs(paths: Sequence[str | Path], fmt: LongFormat = LongFormat()) -> pd.DataFrame:
+    """Long-format lab files (CSV/Parquet), normalized and concatenated in order."""
+    frames = [normalize_labs(read_any(p, columns=fmt.columns, passthrough=fmt.columns), fmt) for p in paths]
+    return pd.concat(frames, ignore_index=True) if frames else normalize_labs(pd.DataFrame(columns=fmt.columns), fmt)
+
+def window_aggregates(
+    labs: pd.DataFrame,
+    fmt: LongFormat = LongFormat(),
+    window: Tuple[float, float] = WINDOW,
+    analytes: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """One row per patient (indexed by `fmt.id`) with `<analyte>_<aggregate>` columns.
+    Draws at the same time keep file order, so the later row is the baseline on ties.
+    """
+    analytes = list(LAB_FIELDS) if analytes is None else list(analytes)
+    d = labs.loc[labs[fmt.analyte].isin(analytes), fmt.columns]
+    d = d.sort_values([fmt.id, fmt.analyte, fmt.time], kind="stable")
+    keys = [fmt.id, fmt.analyte]
+    t = d[fmt.time]
+    pre = d[t <= window[0]].groupby(keys, sort=False)[fmt.value]
+    post = d[(t > window[0]) & (t <= window[1])].groupby(keys, sort=False)[fmt.value]
+    agg = pd.concat({"baseline": pre.last(), "first": post.first(), "peak": post.max(), "nadir": post.min()}, axis=1)
+    agg["rise"] = (agg["peak"] - agg["baseline"]).clip(lower=0.0)
+    wide = agg.unstack(fmt.analyte)
+    cols = [f"{a}_{g}" for a in analytes for g in AGGREGATES]
+    wide.columns = [f"{a}_{g}" for g, a in wide.columns]
+    wide = wide.reindex(columns=cols)
+    wide.index.name = fmt.id
+    return wide.astype(float)
+
+def lab_fields(aggregates: pd.DataFrame) -> pd.DataFrame:
+    """Sample lab fields from `window_aggregates` output (same index)."""
+    cols = {}
+    for analyte, mapping in LAB_FIELDS.items():
+        for agg, field in mapping.items():
+            name = f"{analyte}_{agg}"
+            if name in aggregates.columns:
+                cols[field] = aggregates[name].to_numpy()
+    return pd.DataFrame(cols, index=aggregates.index)
+
+def merge_labs(patients: pd.DataFrame, aggregates: pd.DataFrame, id_column: str) -> pd.DataFrame:
+    """`patients` with lab fields taken from the aggregates where a patient has draws;
+    wide values already in `patients` are kept for patients (or fields) without any.
+    """
+    fields = lab_fields(aggregates)
+    fields.index = fields.index.astype(str)
+    ids = patients[id_column].astype(str)
+    out = patients.copy()
+    for field in fields.columns:
+        values = ids.map(fields[field]).to_numpy(dtype=float, na_value=np.nan)
+        if field in out.columns:
+            old = pd.to_numeric(out[field], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            values = np.where(np.isnan(values), old, values)
+        out[field] = values
+    return out
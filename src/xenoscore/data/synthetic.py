@@ -0,0 +1,152 @@
+"""
+Synthetic cohorts following the Sample schema, for tests and benchmarks.
+
+Values are drawn around two latent patient factors, immunological risk and clinical
+frailty, so antibody titers, crossmatch, complement and DSA move together and the
+outcome depends on both. The numbers are plausible, not clinically calibrated.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+import numpy as np
+import pandas as pd
+from .validation import FIELD_KINDS
+
+# Share of missing cells per field (MCAR); fields not listed use DEFAULT_MISSING.
+DEFAULT_MISSING = 0.05
+MISSING_RATES: Dict[str, float] = {
+    "infection_status": 0.02,
+    "creatinine": 0.08,
+    "map_mmHg": 0.10,
+    "donor_weight_kg": 0.10,
+    "baseline_anti_pig_IgM": 0.10,
+    "flow_cxm_mfi": 0.15,
+    "flow_cxm_positive": 0.15,
+    "pod1_IgG": 0.20, "pod1_IgM": 0.20,
+    "pod3_IgG": 0.25, "pod3_IgM": 0.25,
+    "baseline_C4": 0.15, "pod3_C4": 0.30,
+    "pod3_C3": 0.25,
+    "sC5b9": 0.25,
+    "outcome": 0.0,
+}
+
+Draw = Callable[[np.random.Generator, Dict[str, np.ndarray], int], np.ndarray]
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _titer(rng: np.random.Generator, log2: np.ndarray) -> np.ndarray:
+    """Doubling-dilution titers 2..2048 around a log2 level."""
+    return 2.0 ** np.clip(np.round(log2 + rng.normal(0, 0.7, len(log2))), 1, 11)
+
+def _bernoulli(rng: np.random.Generator, p: np.ndarray | float, n: int) -> np.ndarray:
+    return rng.random(n) < p
+
+# Field generators; each may read latent factors and previously drawn fields from `ctx`.
+_DRAWS: Dict[str, Draw] = {
+    "infection_status": lambda rng, c, n: rng.choice(np.array(["none", "recent", "active"], dtype=object), n, p=[0.8, 0.15, 0.05]),
+    "egfr": lambda rng, c, n: np.clip(rng.normal(60 - 15 * c["frailty"], 15), 5, 130).round(1),
+    "creatinine": lambda rng, c, n: np.clip(75 / c["egfr"] * rng.lognormal(0, 0.15, n), 0.4, 12).round(2),
+    "lvef": lambda rng, c, n: np.clip(rng.normal(55 - 8 * c["frailty"], 8), 10, 75).round(0),
+    "map_mmHg": lambda rng, c, n: np.clip(rng.normal(80 - 6 * c["frailty"], 10), 40, 120).round(0),
+    "dialysis": lambda rng, c, n: (c["egfr"] < 15) | _bernoulli(rng, 0.03, n),
+    "mechanical_support": lambda rng, c, n: _bernoulli(rng, _sigmoid(-3 + 1.2 * c["frailty"]), n),
+    "vasopressors": lambda rng, c, n: _bernoulli(rng, _sigmoid(-2.5 + 1.2 * c["frailty"]), n),
+    "donor_age_months": lambda rng, c, n: rng.uniform(4, 30, n).round(0),
+    "donor_weight_kg": lambda rng, c, n: np.clip(4.5 * c["donor_age_months"] + rng.normal(0, 12, n), 15, 200).round(0),
+    "donor_pcmv": lambda rng, c, n: _bernoulli(rng, 0.08, n),
+    "ggta1_ko": lambda rng, c, n: _bernoulli(rng, 0.95, n),
+    "cmah_ko": lambda rng, c, n: _bernoulli(rng, 0.75, n),
+    "b4galnt2_ko": lambda rng, c, n: _bernoulli(rng, 0.7, n),
+    "hCD46": lambda rng, c, n: _bernoulli(rng, 0.6, n),
+    "hTHBD": lambda rng, c, n: _bernoulli(rng, 0.5, n),
+    "baseline_anti_pig_IgG": lambda rng, c, n: _titer(rng, 4 + 1.2 * c["immune"]),
+    "baseline_anti_pig_IgM": lambda rng, c, n: _titer(rng, 4.5 + 1.0 * c["immune"]),
+    "flow_cxm_mfi": lambda rng, c, n: np.exp(6 + 0.9 * c["immune"] + rng.normal(0, 0.5, n)).round(0),
+    "flow_cxm_positive": lambda rng, c, n: (c["flow_cxm_mfi"] > 1000) ^ _bernoulli(rng, 0.05, n),
+    "pod1_IgG": lambda rng, c, n: c["baseline_anti_pig_IgG"] * 2.0 ** np.clip(np.round(0.3 + 0.6 * c["immune"] + rng.normal(0, 0.5, n)), 0, 4),
+    "pod3_IgG": lambda rng, c, n: c["pod1_IgG"] * 2.0 ** np.clip(np.round(0.3 + 0.6 * c["immune"] + rng.normal(0, 0.5, n)), 0, 4),
+    "pod1_IgM": lambda rng, c, n: c["baseline_anti_pig_IgM"] * 2.0 ** np.clip(np.round(0.4 + 0.6 * c["immune"] + rng.normal(0, 0.5, n)), 0, 4),
+    "pod3_IgM": lambda rng, c, n: c["pod1_IgM"] * 2.0 ** np.clip(np.round(0.2 + 0.5 * c["immune"] + rng.normal(0, 0.5, n)), 0, 4),
+    "baseline_C3": lambda rng, c, n: np.clip(rng.normal(100, 15, n), 40, 180).round(0),
+    "pod3_C3": lambda rng, c, n: (c["baseline_C3"] * (1 - np.clip(0.1 + 0.1 * c["immune"] + rng.normal(0, 0.05, n), 0, 0.8))).round(0),
+    "baseline_C4": lambda rng, c, n: np.clip(rng.normal(30, 7, n), 8, 60).round(0),
+    "pod3_C4": lambda rng, c, n: (c["baseline_C4"] * (1 - np.clip(0.12 + 0.1 * c["immune"] + rng.normal(0, 0.06, n), 0, 0.8))).round(0),
+    "sC5b9": lambda rng, c, n: np.exp(5.3 + 0.5 * c["immune"] + rng.normal(0, 0.3, n)).round(0),
+    "dsa_present": lambda rng, c, n: _bernoulli(rng, _sigmoid(-2 + 0.8 * c["immune"]), n),
+    "outcome": lambda rng, c, n: _bernoulli(rng, _sigmoid(
+        -1.8 + 0.9 * c["immune"] + 0.6 * c["frailty"] + 1.2 * (c["infection_status"] == "active")
+        + 0.8 * c["donor_pcmv"] - 0.5 * c["cmah_ko"] + rng.normal(0, 0.5, n)), n).astype("int64"),
+}
+
+def _fallback(kind: str, allowed: tuple) -> Draw:
+    """Generic draw for schema fields without a dedicated generator."""
+    if kind == "literal":
+        return lambda rng, c, n: rng.choice(np.array(allowed, dtype=object), n)
+    if kind == "bool":
+        return lambda rng, c, n: _bernoulli(rng, 0.5, n)
+    if kind == "int":
+        return lambda rng, c, n: rng.integers(0, 2, n)
+    return lambda rng, c, n: rng.lognormal(3, 1, n).round(2)
+
+def generate_cohort(
+    n: int,
+    seed: int = 0,
+    missing_scale: float = 1.0,
+    outcome: bool = True,
+    start: int = 0,
+) -> pd.DataFrame:
+    """`n` synthetic rows with one column per Sample field (nullable dtypes).
+    `missing_scale` multiplies every field's missingness rate; `start` offsets the index.
+    """
+    rng = np.random.default_rng(seed)
+    ctx: Dict[str, np.ndarray] = {"immune": rng.normal(0, 1, n), "frailty": rng.normal(0, 1, n)}
+    cols: Dict[str, object] = {}
+    for name, (kind, allowed) in FIELD_KINDS.items():
+        if name == "outcome" and not outcome:
+            continue
+        values = _DRAWS.get(name, _fallback(kind, allowed))(rng, ctx, n)
+        ctx[name] = values
+        missing = rng.random(n) < min(1.0, MISSING_RATES.get(name, DEFAULT_MISSING) * missing_scale)
+        if kind == "bool":
+            cols[name] = pd.arrays.BooleanArray(np.asarray(values, dtype=bool), missing)
+        elif kind == "int":
+            cols[name] = pd.arrays.IntegerArray(np.asarray(values, dtype="int64"), missing)
+        elif kind == "literal":
+            cols[name] = pd.Categorical(np.where(missing, None, values), categories=list(allowed))
+        else:
+            cols[name] = np.where(missing, np.nan, values.astype(float))
+    return pd.DataFrame(cols, index=pd.RangeIndex(start, start + n))
+
+def iter_cohort(n: int, seed: int = 0, chunksize: int = 1_000_000, **kwargs) -> Iterator[pd.DataFrame]:
+    """`generate_cohort` in chunks with independent per-chunk seeds (bounded memory)."""
+    n_chunks = max(1, -(-n // chunksize))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    for i, ss in enumerate(seeds):
+        size = min(chunksize, n - i * chunksize)
+        if size > 0 or n == 0:
+            yield generate_cohort(size, seed=ss.generate_state(1)[0], start=i * chunksize, **kwargs)
+
+def write_cohort(path: str | Path, n: int, seed: int = 0, chunksize: int = 1_000_000, **kwargs) -> Path:
+    """Stream a synthetic cohort to CSV or Parquet."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    suffix = p.suffix.lower()
+    if suffix not in {".csv", ".parquet"}:
+        raise ValueError(f"Unsupported format: {p.suffix}")
+    writer = None
+    try:
+        for i, chunk in enumerate(iter_cohort(n, seed, chunksize, **kwargs)):
+            if suffix == ".csv":
+                chunk.to_csv(p, index=False, mode="a" if i else "w", header=i == 0)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(p, table.schema)
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return p
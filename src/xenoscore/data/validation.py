@@ -1,17 +1,236 @@
 from __future__ import annotations
-from typing import Tuple
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union, get_args, get_origin
+import numpy as np
 import pandas as pd
 from ..schemas import Sample
 
-def validate_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, list]:
-    """Validate each row against Sample schema. Returns cleaned df and a list of errors (row indices)."""
-    errors = []
-    cleaned = []
-    for idx, row in df.iterrows():
-        try:
-            s = Sample(**row.to_dict())
-            cleaned.append(s.model_dump())
-        except Exception as e:
-            errors.append((idx, str(e)))
-            cleaned.append(row.to_dict())
-    return pd.DataFrame(cleaned), errors
+VALIDATION_MODES = ("strict", "lenient", "off")
+
+# String spellings pydantic accepts for booleans in lax mode
+_BOOL_STRINGS = {
+    "true": True, "t": True, "yes": True, "y": True, "on": True, "1": True, "1.0": True,
+    "false": False, "f": False, "no": False, "n": False, "off": False, "0": False, "0.0": False,
+}
+
+class SchemaValidationError(ValueError):
+    """Raised in strict mode; `errors` holds the per-row (index, message) list."""
+    def __init__(self, errors: list):
+        self.errors = errors
+        super().__init__(f"Validation failed for {len(errors)} rows")
+
+def _field_kind(annotation: Any) -> Tuple[str, tuple]:
+    """Reduce a Sample annotation (Optional[...] stripped) to a column kind."""
+    if get_origin(annotation) is Union:
+        annotation = next(a for a in get_args(annotation) if a is not type(None))
+    if get_origin(annotation) is Literal:
+        return "literal", get_args(annotation)
+    if annotation is bool:
+        return "bool", ()
+    if annotation is int:
+        return "int", ()
+    if annotation is float:
+        return "float", ()
+    return "other", ()
+
+FIELD_KINDS: Dict[str, Tuple[str, tuple]] = {name: _field_kind(f.annotation) for name, f in Sample.model_fields.items()}
+
+# Each coercer maps a column to (typed values, invalid mask, error type, message).
+Coerced = Tuple[Any, np.ndarray, str, str]
+_NO_ERRORS = ("", "")
+
+def _missing(s: pd.Series) -> np.ndarray:
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+        return s.isna().to_numpy()
+    return pd.isna(s.to_numpy())
+
+def _is_numpy_numeric(s: pd.Series) -> bool:
+    return not isinstance(s.dtype, pd.api.extensions.ExtensionDtype) and s.dtype.kind in "fiub"
+
+def _to_float(s: pd.Series) -> np.ndarray:
+    if _is_numpy_numeric(s):
+        return s.to_numpy().astype("float64", copy=False)
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype) and s.dtype.kind in "fiub":
+        return s.to_numpy(dtype="float64", na_value=np.nan)
+    return np.asarray(pd.to_numeric(s.to_numpy(dtype=object), errors="coerce"), dtype="float64")
+
+def _coerce_float(s: pd.Series, missing: np.ndarray, allowed: tuple) -> Coerced:
+    vals = _to_float(s)
+    if _is_numpy_numeric(s):
+        return vals, np.zeros(len(s), dtype=bool), *_NO_ERRORS
+    invalid = ~missing & np.isnan(vals)
+    if invalid.any():
+        # a literal "nan" string parses fine for pydantic, so it is not an error
+        raw = pd.Series(s.to_numpy(dtype=object)[invalid]).astype(str).str.strip().str.lower()
+        invalid[invalid] = ~raw.isin(["nan", "-nan"]).to_numpy()
+    return vals, invalid, "float_parsing", "Input should be a valid number, unable to parse string as a number"
+
+def _coerce_int(s: pd.Series, missing: np.ndarray, allowed: tuple) -> Coerced:
+    vals = _to_float(s)
+    with np.errstate(invalid="ignore"):
+        invalid = ~missing & ~(np.isfinite(vals) & (vals % 1 == 0))
+    mask = missing | invalid
+    ints = pd.arrays.IntegerArray(np.where(mask, 0, vals).astype("int64"), mask)
+    return ints, invalid, "int_parsing", "Input should be a valid integer"
+
+def _parse_bool(value: Any) -> Optional[bool]:
+    return _BOOL_STRINGS.get(str(value).strip().lower())
+
+def _coerce_bool(s: pd.Series, missing: np.ndarray, allowed: tuple) -> Coerced:
+    if isinstance(s.dtype, pd.BooleanDtype):
+        return s.array, np.zeros(len(s), dtype=bool), *_NO_ERRORS
+    if s.dtype == bool:
+        return pd.arrays.BooleanArray(s.to_numpy(), np.zeros(len(s), dtype=bool)), np.zeros(len(s), dtype=bool), *_NO_ERRORS
+    if _is_numpy_numeric(s):
+        arr = s.to_numpy()
+        values, valid = arr == 1, (arr == 0) | (arr == 1)
+    else:
+        # parse each distinct value once
+        codes, uniques = pd.factorize(s.to_numpy(dtype=object))
+        parsed = [_parse_bool(u) for u in uniques]
+        lookup_valid = np.array([p is not None for p in parsed] + [False])
+        lookup_value = np.array([bool(p) for p in parsed] + [False])
+        values, valid = lookup_value[codes], lookup_valid[codes]
+    invalid = ~missing & ~valid
+    return pd.arrays.BooleanArray(values, missing | invalid), invalid, "bool_parsing", "Input should be a valid boolean, unable to interpret input"
+
+def _coerce_literal(s: pd.Series, missing: np.ndarray, allowed: tuple) -> Coerced:
+    codes, uniques = pd.factorize(s.to_numpy(dtype=object))
+    positions = {a: i for i, a in enumerate(allowed)}
+    lookup = np.array([positions.get(u, -1) if isinstance(u, str) else -1 for u in uniques] + [-1], dtype="int64")
+    cat_codes = lookup[codes]
+    invalid = ~missing & (cat_codes < 0)
+    expected = ", ".join(repr(a) for a in allowed[:-1]) + f" or {allowed[-1]!r}" if len(allowed) > 1 else repr(allowed[0])
+    return pd.Categorical.from_codes(cat_codes, categories=list(allowed)), invalid, "literal_error", f"Input should be {expected}"
+
+_COERCERS: Dict[str, Callable[[pd.Series, np.ndarray, tuple], Coerced]] = {
+    "float": _coerce_float,
+    "int": _coerce_int,
+    "bool": _coerce_bool,
+    "literal": _coerce_literal,
+}
+
+def typed_column(s: pd.Series) -> Any:
+    """`s` as its Sample type (float, Int64, boolean or categorical), invalid cells missing.
+    Used where a column must hold a single type, e.g. columnar output of lenient results.
+    """
+    kind, allowed = FIELD_KINDS.get(s.name, ("other", ()))
+    if kind not in _COERCERS:
+        raise ValueError(f"{s.name!r} is not a typed Sample field")
+    vals, invalid, _, _ = _COERCERS[kind](s, _missing(s), allowed)
+    return vals
+
+def _format_errors(field_errors: List[Tuple[str, Tuple[str, str], Any]]) -> str:
+    n = len(field_errors)
+    lines = [f"{n} validation error{'s' if n > 1 else ''} for Sample"]
+    for field, (err_type, msg), value in field_errors:
+        lines.append(field)
+        lines.append(f"  {msg} [type={err_type}, input_value={value!r}, input_type={type(value).__name__}]")
+    return "\n".join(lines)
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the compact dtype plan to Sample columns without validating them: float32 for
+    numeric fields, nullable booleans for flags, categoricals for Literal fields. Columns
+    that do not convert cleanly (e.g. strings in a lab column) are left as they are.
+    """
+    cols: Dict[str, Any] = {}
+    for name in df.columns:
+        s = df[name]
+        kind, allowed = FIELD_KINDS.get(name, ("other", ()))
+        if kind in _COERCERS:
+            vals, invalid, _, _ = _COERCERS[kind](s, _missing(s), allowed)
+            if not invalid.any():
+                cols[name] = vals.astype(np.float32) if kind == "float" else vals
+                continue
+        cols[name] = s.array
+    return pd.DataFrame(cols, index=df.index, copy=False)
+
+# `validate_record` values of missing/invalid cells and Python types of valid ones, per kind
+_MISSING_ROW_VALUE: Dict[str, Any] = {"float": np.nan, "bool": np.nan, "int": None, "literal": None}
+_ROW_TYPES: Dict[str, Callable[[Any], Any]] = {"float": float, "bool": bool, "int": int, "literal": str}
+
+def _missing_value(value: Any) -> bool:
+    return value is None or value is pd.NA or (isinstance(value, float) and value != value)
+
+def validate_record(record: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Lenient validation of one sample dict, without building a frame (e.g. one request).
+
+    Sample fields get the values `validate_dataframe` would give the row: floats (NaN if
+    missing or invalid), bools (NaN if missing, so a missing flag is truthy like a NA
+    cell), Literal strings (None if missing), ints (None if missing or invalid); invalid
+    bool and Literal cells keep their raw value. Returns the row and an error message
+    ("" if valid).
+    """
+    row: Dict[str, Any] = {}
+    field_errors: List[Tuple[str, Tuple[str, str], Any]] = []
+    for name, value in record.items():
+        kind, allowed = FIELD_KINDS.get(name, ("other", ()))
+        if kind == "other":
+            row[name] = value
+        elif _missing_value(value):
+            row[name] = _MISSING_ROW_VALUE[kind]
+        elif kind == "bool" and (value is True or value is False):
+            row[name] = value
+        elif kind == "float" and type(value) in (float, int):
+            row[name] = float(value)
+        elif kind == "int" and type(value) is int:
+            row[name] = value
+        elif kind == "literal" and isinstance(value, str) and value in allowed:
+            row[name] = value
+        else:
+            # anything else (strings, numpy scalars, ...) takes the vectorized coercer
+            vals, invalid, err_type, msg = _COERCERS[kind](pd.Series([value], dtype=object), np.zeros(1, dtype=bool), allowed)
+            if invalid[0]:
+                field_errors.append((name, (err_type, msg), value))
+                row[name] = value if kind in ("bool", "literal") else _MISSING_ROW_VALUE[kind]
+            else:
+                row[name] = _ROW_TYPES[kind](vals[0])
+    if not field_errors:
+        return row, ""
+    order = list(FIELD_KINDS)
+    return row, _format_errors(sorted(field_errors, key=lambda e: order.index(e[0])))
+
+def validate_dataframe(df: pd.DataFrame, mode: str = "lenient", compact: bool = False) -> Tuple[pd.DataFrame, list]:
+    """Validate columns against the Sample schema. Returns cleaned df and a list of (row index, message) errors.
+
+    Each Sample column is coerced in one vectorized pass (numbers, bool spellings,
+    Literal sets as categoricals); missing cells stay missing and other columns pass
+    through untouched. Modes: "lenient" keeps the raw value of invalid cells and
+    reports them, "strict" raises SchemaValidationError, "off" returns df unchanged.
+    `compact` stores valid numeric fields as float32 (see `compact_frame`).
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"Unknown validation mode: {mode}. Expected one of {VALIDATION_MODES}")
+    if mode == "off":
+        return (compact_frame(df) if compact else df), []
+    cols: Dict[str, Any] = {}
+    row_errors: Dict[int, List[Tuple[str, Tuple[str, str], Any]]] = {}
+    for name in df.columns:
+        s = df[name]
+        kind, allowed = FIELD_KINDS.get(name, ("other", ()))
+        if kind == "other":
+            cols[name] = s.array
+            continue
+        # field errors are listed in schema order, like pydantic
+        if compact and kind == "float" and s.dtype == np.float32:
+            cols[name] = s.array  # already in the compact plan; numeric columns cannot be invalid
+            continue
+        vals, invalid, err_type, msg = _COERCERS[kind](s, _missing(s), allowed)
+        if invalid.any():
+            raw = s.to_numpy(dtype=object)
+            for pos in np.flatnonzero(invalid):
+                row_errors.setdefault(pos, []).append((name, (err_type, msg), raw[pos]))
+            # keep the unvalidated value so scoring sees what the row actually held
+            vals = np.asarray(vals.astype(object), dtype=object)
+            vals[invalid] = raw[invalid]
+        elif compact and kind == "float":
+            vals = vals.astype(np.float32)
+        cols[name] = vals
+    out = pd.DataFrame(cols, index=df.index, copy=False)
+    order = list(FIELD_KINDS)
+    errors = [
+        (df.index[pos], _format_errors(sorted(row_errors[pos], key=lambda e: order.index(e[0]))))
+        for pos in sorted(row_errors)
+    ]
+    if errors and mode == "strict":
+        raise SchemaValidationError(errors)
+    return out, errors
@@ -0,0 +1,238 @@
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from ..components import core
+from ..components.core import FeatureComponent
+
+MAX_MB_ENV = "XENOSCORE_FEATURE_CACHE_MAX_MB"
+DEFAULT_MAX_MB = 1024
+MAX_SEGMENTS = 16  # per component; more are compacted into one file
+_H1, _H2 = "_xs_h1", "_xs_h2"
+# two independently keyed 64-bit hashes per row: lookups use the first, the second
+# is verified, so a wrong hit needs a 128-bit collision (hash keys must be 16 bytes)
+_HASH_KEYS = ("xenoscore-rows-1", "xenoscore-rows-2")
+_MIX = np.uint64(0x100000001B3)
+
+ComputeFn = Callable[[pd.DataFrame, Dict[str, Any], FeatureComponent], pd.DataFrame]
+ColumnHashes = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+_SOURCE_HASHES: Dict[str, str] = {}
+
+def _module_source_hash(module_name: str) -> str:
+    """Hash of a module's source, so editing a component invalidates its cached features."""
+    if module_name not in _SOURCE_HASHES:
+        try:
+            src = inspect.getsource(sys.modules[module_name])
+        except (KeyError, OSError, TypeError):
+            src = module_name
+        _SOURCE_HASHES[module_name] = hashlib.sha256(src.encode("utf-8")).hexdigest()
+    return _SOURCE_HASHES[module_name]
+
+def _column_hash(s: pd.Series, key: str) -> np.ndarray:
+    h = pd.util.hash_pandas_object(s, index=False, hash_key=key).to_numpy()
+    if s.dtype == object:
+        # values hash by content alone (None ~ NaN, False ~ "False"), but components
+        # treat those differently, so mix in each cell's type
+        types = pd.Series([type(v).__name__ for v in s.to_numpy()], dtype=object)
+        h = h ^ (pd.util.hash_pandas_object(types, index=False, hash_key=key).to_numpy() * _MIX)
+    return h
+
+def row_hashes(df: pd.DataFrame, columns: Sequence[str], column_hashes: Optional[ColumnHashes] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Two 64-bit content hashes of each row over `columns` (values only, not the index).
+    Per-column hashes are memoized in `column_hashes` so components sharing inputs hash them once.
+    """
+    column_hashes = {} if column_hashes is None else column_hashes
+    h1 = np.full(len(df), len(columns), dtype="uint64")
+    h2 = h1.copy()
+    for c in columns:
+        if c not in column_hashes:
+            column_hashes[c] = tuple(_column_hash(df[c], k) for k in _HASH_KEYS)
+        c1, c2 = column_hashes[c]
+        h1 = (h1 * _MIX) ^ c1
+        h2 = (h2 * _MIX) ^ c2
+    return h1, h2
+
+class FeatureCache:
+    """On-disk store of component features as Parquet segments.
+
+    Each component gets a directory keyed by its name, params, code and the input
+    columns it reads; rows inside are keyed by a hash of those columns' values. Only
+    rows (or components) not found are computed, then appended as a new segment.
+    Segments are evicted least-recently-used once the store exceeds `max_bytes`.
+    Components must be row-wise: a row's features may depend only on that row.
+    """
+    def __init__(self, directory: str | Path, max_bytes: Optional[int] = None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("The feature cache stores Parquet files and needs pyarrow (pip install pyarrow)") from e
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # component dir -> (segment names, table with unique _xs_h1, index on _xs_h1)
+        self._tables: Dict[Path, Tuple[frozenset, pd.DataFrame, pd.Index]] = {}
+
+    def _input_columns(self, comp: FeatureComponent, df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+        """(present, absent) columns the component reads; undeclared components read everything."""
+        wanted = comp.required_columns or list(df.columns)
+        cols = sorted(dict.fromkeys(str(c) for c in wanted))
+        return [c for c in cols if c in df.columns], [c for c in cols if c not in df.columns]
+
+    def component_key(self, spec: Dict[str, Any], comp: FeatureComponent, df: pd.DataFrame, present: List[str], absent: List[str]) -> str:
+        cls = type(comp)
+        payload = json.dumps({
+            "name": spec["name"],
+            "params": spec.get("params", {}),
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "code": [_module_source_hash(cls.__module__), _module_source_hash(core.__name__)],
+            # dtypes too: True and "True" hash alike in object columns but score differently
+            "present": {c: str(df[c].dtype) for c in present},
+            "absent": absent,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _indexed(table: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Index]:
+        index = pd.Index(table[_H1].to_numpy())
+        dup = index.duplicated(keep="last")
+        if dup.any():
+            table, index = table[~dup].reset_index(drop=True), index[~dup]
+        return table, index
+
+    def _load(self, comp_dir: Path) -> Optional[Tuple[pd.DataFrame, pd.Index]]:
+        segments = sorted(comp_dir.glob("*.parquet"))
+        names = frozenset(p.name for p in segments)
+        memo = self._tables.get(comp_dir)
+        if memo is not None and memo[0] == names:
+            for seg in segments:
+                _touch(seg)
+            return memo[1], memo[2]
+        parts = []
+        for seg in segments:
+            try:
+                parts.append(pd.read_parquet(seg))
+                _touch(seg)
+            except (FileNotFoundError, OSError):
+                continue  # evicted or compacted concurrently: treat as a miss
+        if not parts:
+            return None
+        table, index = self._indexed(pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0])
+        if len(parts) > MAX_SEGMENTS:
+            names = frozenset([self._write(comp_dir, table)])
+            for seg in segments:
+                seg.unlink(missing_ok=True)
+        self._tables[comp_dir] = (names, table, index)
+        return table, index
+
+    def _write(self, comp_dir: Path, table: pd.DataFrame) -> str:
+        comp_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{uuid.uuid4().hex}.parquet"
+        tmp = comp_dir / f".{name}.tmp"
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, comp_dir / name)
+        return name
+
+    @staticmethod
+    def _lookup(loaded: Optional[Tuple[pd.DataFrame, pd.Index]], h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        """Row positions in the stored table, -1 where absent (or the second hash disagrees)."""
+        if loaded is None:
+            return np.full(len(h1), -1, dtype="int64")
+        table, index = loaded
+        pos = index.get_indexer(h1)
+        found = pos >= 0
+        found[found] = table[_H2].to_numpy()[pos[found]] == h2[found]
+        return np.where(found, pos, -1)
+
+    def component_features(
+        self,
+        df: pd.DataFrame,
+        spec: Dict[str, Any],
+        comp: FeatureComponent,
+        compute: ComputeFn,
+        column_hashes: Optional[ColumnHashes] = None,
+    ) -> pd.DataFrame:
+        """Features of one component for df, reading hits from and writing misses to the store."""
+        present, absent = self._input_columns(comp, df)
+        comp_dir = self.directory / self.component_key(spec, comp, df, present, absent)
+        h1, h2 = row_hashes(df, present, column_hashes)
+        loaded = self._load(comp_dir)
+        pos = self._lookup(loaded, h1, h2)
+        missed = np.flatnonzero(pos < 0)
+        self.hits += len(df) - len(missed)
+        if len(missed):
+            # rows with identical inputs are computed once
+            todo = missed[~pd.Index(h1[missed]).duplicated()]
+            self.misses += len(todo)
+            fresh = compute(df.iloc[todo], spec, comp).reset_index(drop=True)
+            fresh.insert(0, _H2, h2[todo])
+            fresh.insert(0, _H1, h1[todo])
+            name = self._write(comp_dir, fresh)
+            if loaded is None:
+                names, table = frozenset([name]), fresh
+            else:
+                names = self._tables[comp_dir][0] | {name}
+                table = pd.concat([loaded[0], fresh], ignore_index=True)
+            table, index = self._indexed(table)
+            self._tables[comp_dir] = (names, table, index)
+            loaded = (table, index)
+            pos = self._lookup(loaded, h1, h2)
+            if (pos < 0).any():  # 64-bit collision between distinct rows: skip the store
+                return compute(df, spec, comp)
+        table = loaded[0]
+        return table.iloc[pos, 2:].set_axis(df.index)
+
+    def features(
+        self,
+        df: pd.DataFrame,
+        component_specs: Sequence[Dict[str, Any]],
+        components: Sequence[FeatureComponent],
+        compute: ComputeFn,
+    ) -> pd.DataFrame:
+        """Cached equivalent of `compute_features`: outputs merged in component order."""
+        cols: Dict[str, Any] = {}
+        column_hashes: ColumnHashes = {}
+        misses = self.misses
+        for spec, comp in zip(component_specs, components):
+            part = self.component_features(df, spec, comp, compute, column_hashes)
+            cols.update({k: part[k].to_numpy() for k in part.columns})
+        if self.misses > misses:
+            self.evict()
+        return pd.DataFrame(cols, index=df.index)
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*/*.parquet"))
+
+    def evict(self) -> None:
+        """Delete least-recently-used segments until the store fits in `max_bytes`."""
+        segments = []
+        for p in self.directory.glob("*/*.parquet"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            segments.append((st.st_mtime_ns, st.st_size, p))
+        total = sum(s for _, s, _ in segments)
+        for _, size, p in sorted(segments, key=lambda s: s[0]):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+def _touch(path: Path) -> None:
+    """Mark a segment as recently used (its mtime orders LRU eviction)."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
@@ -1,15 +1,110 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+import atexit
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Sequence
+import numpy as np
 import pandas as pd
+from ..profiling import span
 from ..registry import get_component
-from ..components.core import FeatureComponent
-
-def featurize(df: pd.DataFrame, component_specs: List[Dict[str, Any]]) -> pd.DataFrame:
-    comps: List[FeatureComponent] = [get_component(s["name"])(params=s.get("params", {})) for s in component_specs]
-    rows = []
-    for _, row in df.iterrows():
-        feats = {}
-        for comp in comps:
-            feats.update(comp.compute(row.to_dict()))
-        rows.append(feats)
-    return pd.DataFrame(rows, index=df.index).fillna(0.0)
+from ..components.core import FeatureComponent, compute_features
+if TYPE_CHECKING:
+    from .feature_cache import FeatureCache
+
+WORKERS_ENV = "XENOSCORE_WORKERS"
+MIN_SHARD_ROWS = 2_000  # below this, process start-up and pickling cost more than they save
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """Worker count from the argument, else $XENOSCORE_WORKERS, else 1; 0 means all cores."""
+    if workers is None:
+        raw = os.environ.get(WORKERS_ENV, "").strip() or "1"
+        try:
+            workers = int(raw)
+        except ValueError:
+            raise ValueError(f"${WORKERS_ENV} must be an integer (0 = all cores), got {raw!r}") from None
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+def instantiate_components(component_specs: List[Dict[str, Any]]) -> List[FeatureComponent]:
+    return [get_component(s["name"])(params=s.get("params", {})) for s in component_specs]
+
+# Process pools are kept per (workers, component specs) so each worker builds its
+# components once and streaming callers do not pay pool start-up per chunk.
+_POOLS: Dict[tuple, ProcessPoolExecutor] = {}
+_WORKER_COMPONENTS: List[FeatureComponent] = []
+
+def _component_modules(component_specs: List[Dict[str, Any]]) -> List[str]:
+    """Modules defining the specs' components outside xenoscore, i.e. user code that
+    registers them with @register_component. `__main__` is left out: spawned workers
+    re-run it as `__mp_main__` themselves."""
+    modules = {get_component(s["name"]).__module__ for s in component_specs}
+    return sorted(m for m in modules if m.split(".")[0] not in ("xenoscore", "__main__", "__mp_main__"))
+
+def _init_worker(component_specs: List[Dict[str, Any]], modules: Sequence[str] = ()) -> None:
+    global _WORKER_COMPONENTS
+    import importlib
+    from .. import components  # noqa: F401  (registers built-ins under spawn)
+    for module in modules:  # under spawn/forkserver, user components register on import
+        importlib.import_module(module)
+    _WORKER_COMPONENTS = instantiate_components(component_specs)
+
+def _featurize_shard(shard: pd.DataFrame, dtype: Any = None) -> pd.DataFrame:
+    return compute_features(shard, _WORKER_COMPONENTS, dtype)
+
+def _get_pool(workers: int, component_specs: List[Dict[str, Any]]) -> ProcessPoolExecutor:
+    key = (workers, json.dumps(component_specs, sort_keys=True, default=str))
+    if key not in _POOLS:
+        _POOLS[key] = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                          initargs=(component_specs, _component_modules(component_specs)))
+    return _POOLS[key]
+
+@atexit.register
+def shutdown_pools() -> None:
+    for pool in _POOLS.values():
+        pool.shutdown(cancel_futures=True)
+    _POOLS.clear()
+
+def compute_feature_frame(
+    df: pd.DataFrame,
+    component_specs: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    components: Optional[Sequence[FeatureComponent]] = None,
+    cache: Optional["FeatureCache"] = None,
+    dtype: Any = None,
+) -> pd.DataFrame:
+    """Raw (unfilled) component features; with several workers, contiguous row shards
+    are featurized on a process pool and concatenated back in the original order.
+    `components` are pre-built instances of `component_specs` for the serial path.
+    With a `cache`, only rows/components missing from the feature store are computed.
+    `dtype` (e.g. np.float32) stores the features as one array of that type.
+    """
+    if components is None:
+        components = instantiate_components(component_specs)
+    if cache is not None and len(df):
+        with span("feature_cache", len(df)):
+            out = cache.features(df, component_specs, components,
+                                 lambda sub, spec, comp: compute_feature_frame(sub, [spec], workers, [comp]))
+        if dtype is None:
+            return out
+        return pd.DataFrame(np.asarray(out.to_numpy(dtype=dtype), order="F"), index=out.index, columns=out.columns, copy=False)
+    n_workers = resolve_workers(workers)
+    n_shards = min(n_workers, len(df) // MIN_SHARD_ROWS)
+    with span("featurize", len(df)):
+        if n_shards <= 1:
+            return compute_features(df, components, dtype)
+        bounds = np.linspace(0, len(df), n_shards + 1).astype(int)
+        shards = [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        parts = list(_get_pool(n_workers, component_specs).map(partial(_featurize_shard, dtype=dtype), shards))
+        return pd.concat(parts)
+
+def featurize(
+    df: pd.DataFrame,
+    component_specs: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    cache: Optional["FeatureCache"] = None,
+    dtype: Any = None,
+) -> pd.DataFrame:
+    return compute_feature_frame(df, component_specs, workers, cache=cache, dtype=dtype).fillna(0.0)
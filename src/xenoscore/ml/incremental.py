@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import warnings
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from ..data.io import iter_chunks
+from ..ml.featurize import featurize
+from ..scoring.linear import LinearModel
+from ..scoring.plan import compile_plan
+
+STATE_FORMAT = "xenoscore-incremental-v1"
+
+@dataclass
+class IncrementalConfig:
+    alpha: float = 1e-4        # L2 regularization strength of the SGD logistic model
+    chunksize: int = 50_000
+    random_state: int = 42
+    workers: Optional[int] = None  # featurization processes; None -> $XENOSCORE_WORKERS or 1
+
+def _file_digest(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _chunk_metrics(pipe: Pipeline, X: pd.DataFrame, y: np.ndarray) -> Dict[str, Any]:
+    """Progressive validation: score a chunk with the model as it was before seeing it."""
+    p = pipe.predict_proba(X)[:, 1]
+    both = len(np.unique(y)) == 2
+    return {
+        "auc": float(roc_auc_score(y, p)) if both else None,
+        "log_loss": float(log_loss(y, p, labels=[0, 1])),
+        "accuracy": float(accuracy_score(y, p >= 0.5)),
+    }
+
+def new_state(component_specs: List[Dict[str, Any]], cfg: IncrementalConfig) -> Dict[str, Any]:
+    pipe = Pipeline([
+        ("scaler", StandardScaler(with_mean=False)),
+        ("clf", SGDClassifier(loss="log_loss", alpha=cfg.alpha, random_state=cfg.random_state)),
+    ])
+    return {"format": STATE_FORMAT, "component_specs": component_specs, "config": asdict(cfg),
+            "pipeline": pipe, "feature_names": None, "n_seen": 0, "history": [], "sources": []}
+
+def load_state(path: str | Path) -> Dict[str, Any]:
+    state = joblib.load(path)
+    if not isinstance(state, dict) or state.get("format") != STATE_FORMAT:
+        raise ValueError(f"Not a {STATE_FORMAT} state file: {path}")
+    return state
+
+def partial_fit_chunk(state: Dict[str, Any], df: pd.DataFrame, target_col: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Fold one labelled frame into `state`; returns its progressive-validation record."""
+    y = df[target_col].astype(int).to_numpy()
+    X = featurize(df.drop(columns=[target_col]), state["component_specs"], workers=workers)
+    if state["feature_names"] is None:
+        state["feature_names"] = list(X.columns)
+    X = X.reindex(columns=state["feature_names"], fill_value=0.0)
+    pipe: Pipeline = state["pipeline"]
+    record: Dict[str, Any] = {"rows": int(len(y)), "n_seen_before": state["n_seen"]}
+    if state["n_seen"]:
+        record.update(_chunk_metrics(pipe, X, y))
+    scaler, clf = pipe.named_steps["scaler"], pipe.named_steps["clf"]
+    # running variance: chunk k is scaled with statistics of chunks 1..k
+    scaler.partial_fit(X)
+    clf.partial_fit(scaler.transform(X), y, classes=np.array([0, 1]))
+    state["n_seen"] += int(len(y))
+    state["history"].append(record)
+    return record
+
+def train_incremental(
+    paths: Sequence[str],
+    target_col: str,
+    component_specs: List[Dict[str, Any]],
+    state_path: str,
+    cfg: Optional[IncrementalConfig] = None,
+    model_out: Optional[str] = None,
+    artifact_out: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Stream CSV/Parquet files chunk by chunk into an SGD logistic model.
+
+    Work resumes from `state_path` when it exists (files already folded in, by content
+    hash, are skipped), so each new contribution costs time proportional to its size.
+    The state is saved after every file; `model_out`/`artifact_out` receive the current
+    pipeline (joblib) and its NumPy-only export, usable by `score --model`.
+    """
+    cfg = cfg or IncrementalConfig()
+    if Path(state_path).exists():
+        state = load_state(state_path)
+        if state["component_specs"] != component_specs:
+            raise ValueError("Component config differs from the one the saved state was trained with.")
+    else:
+        state = new_state(component_specs, cfg)
+    seen = {s["sha256"] for s in state["sources"]}
+    read_columns = compile_plan(component_specs).read_columns
+    columns = None if read_columns is None else [*read_columns, target_col]
+    new_records: List[Dict[str, Any]] = []
+    for path in paths:
+        digest = _file_digest(path)
+        if digest in seen:
+            warnings.warn(f"{path} was already folded into {state_path}; skipping.")
+            continue
+        rows = 0
+        for i, chunk in enumerate(iter_chunks(path, cfg.chunksize, columns)):
+            if not len(chunk):
+                continue
+            record = partial_fit_chunk(state, chunk, target_col, cfg.workers)
+            record.update(source=str(path), chunk=i)
+            new_records.append(record)
+            rows += record["rows"]
+        state["sources"].append({"path": str(path), "sha256": digest, "rows": rows})
+        seen.add(digest)
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(state, state_path)
+    pipe = state["pipeline"]
+    if state["n_seen"] and model_out:
+        joblib.dump(pipe, model_out)
+    if state["n_seen"] and artifact_out:
+        LinearModel.from_pipeline(pipe, state["feature_names"]).save(artifact_out)
+    scored = [r for r in new_records if r.get("auc") is not None]
+    n_scored = sum(r["rows"] for r in scored)
+    return {
+        "feature_names": state["feature_names"],
+        "n_seen": state["n_seen"],
+        "n_new": sum(r["rows"] for r in new_records),
+        "sources": [s["path"] for s in state["sources"]],
+        "chunks": new_records,
+        "progressive_auc": sum(r["auc"] * r["rows"] for r in scored) / n_scored if n_scored else None,
+        "state_path": state_path,
+        "model_path": model_out,
+        "artifact_path": artifact_out,
+    }
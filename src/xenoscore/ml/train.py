@@ -1,13 +1,21 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Any, List, Optional
+import json
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
 import joblib
+import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import cross_val_score, StratifiedKFold
-from ..ml.featurize import featurize
+from ..ml.featurize import featurize, resolve_workers
+from ..ml.feature_cache import FeatureCache
+from ..profiling import span
+from ..scoring.linear import LinearModel
 
 @dataclass
 class TrainConfig:
@@ -15,6 +23,41 @@ class TrainConfig:
     penalty: str = "l2"
     cv_folds: int = 5
     random_state: int = 42
+    class_weight: Optional[str] = None  # None or "balanced"
+    workers: Optional[int] = None  # featurization/CV processes; None -> $XENOSCORE_WORKERS or 1
+    feature_cache: Optional[str] = None  # directory of the on-disk feature store; None -> off
+    bootstrap: int = 0                   # refits on resamples for confidence intervals; 0 -> off
+    ci_level: float = 0.95
+
+# sklearn 1.8 deprecates `penalty` in favour of `l1_ratio` (0 = l2, 1 = l1)
+_L1_RATIO_API = tuple(int(p) for p in sklearn.__version__.split(".")[:2]) >= (1, 8)
+_PENALTIES = ("l1", "l2")
+WARM_START_SOLVERS = {"lbfgs", "newton-cg", "newton-cholesky", "sag", "saga"}
+
+def _penalty_kwargs(penalty: str) -> Dict[str, Any]:
+    if penalty not in _PENALTIES:
+        raise ValueError(f"Unsupported penalty: {penalty} (expected one of {_PENALTIES})")
+    if _L1_RATIO_API:
+        return {"l1_ratio": 1.0 if penalty == "l1" else 0.0}
+    return {"penalty": penalty}
+
+def _pipeline(C: float, penalty: str, solver: str, class_weight: Optional[str], random_state: int, **clf_kwargs: Any) -> Pipeline:
+    return Pipeline([
+        ("scaler", StandardScaler(with_mean=False)),
+        ("clf", LogisticRegression(C=C, solver=solver, class_weight=class_weight, random_state=random_state,
+                                   **_penalty_kwargs(penalty), **clf_kwargs)),
+    ])
+
+def _bootstrap(X: pd.DataFrame, y: np.ndarray, cfg: TrainConfig, bootstrap_out: Optional[str],
+               solver: str = "liblinear", **clf_kwargs: Any) -> Dict[str, Any]:
+    """Refit `cfg` (with the model's solver and estimator options) on `cfg.bootstrap`
+    resamples of the featurized X; OOB AUC interval summary."""
+    from .bootstrap import bootstrap_logistic, summarize
+    ensemble, oob_auc = bootstrap_logistic(X.to_numpy(dtype=float), np.asarray(y), list(X.columns), cfg,
+                                           cfg.bootstrap, cfg.random_state, solver=solver, **clf_kwargs)
+    if bootstrap_out:
+        ensemble.save(bootstrap_out)
+    return {**summarize(oob_auc, cfg.ci_level), "path": bootstrap_out}
 
 def train_logistic(
     df: pd.DataFrame,
@@ -22,23 +65,159 @@ def train_logistic(
     component_specs: List[Dict[str, Any]],
     cfg: Optional[TrainConfig] = None,
     model_out: Optional[str] = None,
+    artifact_out: Optional[str] = None,
+    bootstrap_out: Optional[str] = None,
 ) -> Dict[str, Any]:
+    """Fit scaler + logistic regression on component features.
+    `model_out` receives the joblib pipeline; `artifact_out` (.npz/.json) a NumPy-only
+    LinearModel export for inference without scikit-learn. With `cfg.bootstrap` the
+    pipeline is also refit on that many resamples of the same features; the ensemble
+    goes to `bootstrap_out` (.npz) and the result gains an out-of-bag AUC interval.
+    """
     cfg = cfg or TrainConfig()
     y = df[target_col].astype(int)
-    X = featurize(df.drop(columns=[target_col]), component_specs)
-    pipe = Pipeline([
-        ("scaler", StandardScaler(with_mean=False)),
-        ("clf", LogisticRegression(C=cfg.C, penalty=cfg.penalty, solver="liblinear", random_state=cfg.random_state))
-    ])
+    cache = FeatureCache(cfg.feature_cache) if cfg.feature_cache else None
+    X = featurize(df.drop(columns=[target_col]), component_specs, workers=cfg.workers, cache=cache)
+    pipe = _pipeline(cfg.C, cfg.penalty, "liblinear", cfg.class_weight, cfg.random_state)
     cv = StratifiedKFold(n_splits=cfg.cv_folds, shuffle=True, random_state=cfg.random_state)
-    auc = cross_val_score(pipe, X, y, cv=cv, scoring="roc_auc")
-    pipe.fit(X, y)
-    if model_out:
-        joblib.dump(pipe, model_out)
-    return {
+    with span("cross_validate", len(X) * cfg.cv_folds):
+        auc = cross_val_score(pipe, X, y, cv=cv, scoring="roc_auc", n_jobs=resolve_workers(cfg.workers))
+    with span("fit", len(X)):
+        pipe.fit(X, y)
+    with span("save_model"):
+        if model_out:
+            joblib.dump(pipe, model_out)
+        if artifact_out:
+            LinearModel.from_pipeline(pipe, list(X.columns)).save(artifact_out)
+    res = {
         "feature_names": list(X.columns),
         "cv_auc_mean": float(auc.mean()),
         "cv_auc_std": float(auc.std()),
         "n_samples": int(len(df)),
-        "model_path": model_out
+        "model_path": model_out,
+        "artifact_path": artifact_out,
+    }
+    if cfg.bootstrap:
+        res["bootstrap"] = _bootstrap(X, y.to_numpy(), cfg, bootstrap_out)
+    return res
+
+@dataclass
+class SearchSpace:
+    """Candidates for `search_logistic`: every C x penalty x class weight combination."""
+    C: List[float] = field(default_factory=lambda: [0.01, 0.1, 1.0, 10.0])
+    penalties: List[str] = field(default_factory=lambda: ["l2"])
+    class_weights: List[Optional[str]] = field(default_factory=lambda: [None])
+    solver: str = "auto"  # "auto": lbfgs for l2, saga for l1 (both warm-start along the C path)
+    max_iter: int = 5000
+    tol: float = 1e-4
+
+def _solver(space: SearchSpace, penalty: str) -> str:
+    if space.solver != "auto":
+        return space.solver
+    return "saga" if penalty == "l1" else "lbfgs"
+
+def _fold_path(
+    X: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    Cs: Sequence[float],
+    penalty: str,
+    class_weight: Optional[str],
+    space: SearchSpace,
+    random_state: int,
+) -> List[float]:
+    """Test-fold AUC for each C on one fold, walking the regularization path from
+    strongest to weakest with warm starts (the scaler is fit once per fold).
+    """
+    scaler = StandardScaler(with_mean=False).fit(X[train_idx])
+    X_tr, X_te = scaler.transform(X[train_idx]), scaler.transform(X[test_idx])
+    solver = _solver(space, penalty)
+    clf = LogisticRegression(solver=solver, class_weight=class_weight, max_iter=space.max_iter, tol=space.tol,
+                             random_state=random_state, warm_start=solver in WARM_START_SOLVERS,
+                             **_penalty_kwargs(penalty))
+    aucs = []
+    for C in Cs:
+        clf.set_params(C=C).fit(X_tr, y[train_idx])
+        aucs.append(float(roc_auc_score(y[test_idx], clf.decision_function(X_te))))
+    return aucs
+
+def search_logistic(
+    df: pd.DataFrame,
+    target_col: str,
+    component_specs: List[Dict[str, Any]],
+    space: Optional[SearchSpace] = None,
+    cfg: Optional[TrainConfig] = None,
+    model_out: Optional[str] = None,
+    artifact_out: Optional[str] = None,
+    leaderboard_out: Optional[str] = None,
+    n_jobs: Optional[int] = None,
+    bootstrap_out: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Cross-validated search over `space`, then refit of the best candidate.
+
+    Features are computed once; each (fold, penalty, class weight) path over the C grid
+    is one parallel job (`n_jobs`, default `cfg.workers`). Candidates are ranked by
+    mean CV AUC (ties: lower std, then stronger regularization); the leaderboard is
+    written to `leaderboard_out` as JSON and the refit model saved like `train_logistic`
+    (including the bootstrap of the best candidate when `cfg.bootstrap` is set).
+    """
+    from joblib import Parallel, delayed
+    cfg = cfg or TrainConfig()
+    space = space or SearchSpace()
+    y = df[target_col].astype(int).to_numpy()
+    cache = FeatureCache(cfg.feature_cache) if cfg.feature_cache else None
+    feats = featurize(df.drop(columns=[target_col]), component_specs, workers=cfg.workers, cache=cache)
+    X = feats.to_numpy(dtype=float)
+    Cs = sorted(float(c) for c in space.C)
+    for p in space.penalties:
+        _penalty_kwargs(p)
+    folds = list(StratifiedKFold(n_splits=cfg.cv_folds, shuffle=True, random_state=cfg.random_state).split(X, y))
+    paths = [(p, cw) for p in space.penalties for cw in space.class_weights]
+    jobs = [(p, cw, f) for p, cw in paths for f in range(len(folds))]
+    with span("cross_validate", len(X) * len(paths) * len(folds)):
+        results = Parallel(n_jobs=resolve_workers(cfg.workers if n_jobs is None else n_jobs))(
+            delayed(_fold_path)(X, y, folds[f][0], folds[f][1], Cs, p, cw, space, cfg.random_state) for p, cw, f in jobs
+        )
+    fold_aucs: Dict[tuple, List[List[float]]] = {}
+    for (p, cw, _), aucs in zip(jobs, results):
+        fold_aucs.setdefault((p, cw), []).append(aucs)
+    board = []
+    for (p, cw), per_fold in fold_aucs.items():
+        per_c = np.array(per_fold)  # folds x Cs
+        for j, C in enumerate(Cs):
+            board.append({"C": C, "penalty": p, "class_weight": cw, "cv_auc_mean": float(per_c[:, j].mean()),
+                          "cv_auc_std": float(per_c[:, j].std()), "fold_aucs": per_c[:, j].tolist()})
+    board.sort(key=lambda r: (-r["cv_auc_mean"], r["cv_auc_std"], r["C"]))
+    for rank, row in enumerate(board, start=1):
+        row["rank"] = rank
+    best = board[0]
+    solver = _solver(space, best["penalty"])
+    pipe = _pipeline(best["C"], best["penalty"], solver, best["class_weight"], cfg.random_state,
+                     max_iter=space.max_iter, tol=space.tol)
+    with span("fit", len(feats)):
+        pipe.fit(feats, y)
+    with span("save_model"):
+        if model_out:
+            joblib.dump(pipe, model_out)
+        if artifact_out:
+            LinearModel.from_pipeline(pipe, list(feats.columns)).save(artifact_out)
+    if leaderboard_out:
+        Path(leaderboard_out).parent.mkdir(parents=True, exist_ok=True)
+        Path(leaderboard_out).write_text(json.dumps({"search_space": asdict(space), "cv_folds": cfg.cv_folds,
+                                                     "leaderboard": board}, indent=2))
+    res = {
+        "feature_names": list(feats.columns),
+        "best_params": {k: best[k] for k in ("C", "penalty", "class_weight")},
+        "cv_auc_mean": best["cv_auc_mean"],
+        "cv_auc_std": best["cv_auc_std"],
+        "n_candidates": len(board),
+        "n_samples": int(len(df)),
+        "model_path": model_out,
+        "artifact_path": artifact_out,
+        "leaderboard_path": leaderboard_out,
     }
+    if cfg.bootstrap:
+        best_cfg = replace(cfg, C=best["C"], penalty=best["penalty"], class_weight=best["class_weight"])
+        res["bootstrap"] = _bootstrap(feats, y, best_cfg, bootstrap_out, solver, max_iter=space.max_iter, tol=space.tol)
+    return res
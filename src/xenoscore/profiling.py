@@ -0,0 +1,201 @@
+"""
+Opt-in timing of pipeline stages and feature components.
+
+Instrumented code wraps work in `span(name, rows)`. While no profiler is enabled and
+no hook is registered, `span` returns a shared no-op context manager, so the cost
+of instrumentation is one global lookup per call.
+
+    prof = enable()              # collect counters (e.g. `--profile`)
+    add_hook(agent.observe)      # or stream every span to a metrics agent
+    ...
+    prof.snapshot()              # {"stages": [...], "flamegraph": [...]}
+
+Spans nest per thread; the report keeps flat per-name counters (calls, total, mean,
+rows/sec) and self-time per call stack in collapsed-stack form ("a;b;c <µs>"),
+which flamegraph.pl, speedscope and inferno read directly. Work done in featurization
+worker processes is timed as a whole by the parent, not per component.
+"""
+from __future__ import annotations
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+Hook = Callable[[str, float, Optional[int]], None]  # (span name, seconds, rows or None)
+
+_ACTIVE: Optional["Profiler"] = None
+_HOOKS: Tuple[Hook, ...] = ()
+_LOCAL = threading.local()
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = 0.0
+    rows: int = 0
+
+    def add(self, seconds: float, rows: Optional[int]) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        if rows:
+            self.rows += rows
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_s": self.total,
+            "mean_s": self.total / self.calls if self.calls else 0.0,
+            "min_s": self.min if self.calls else 0.0,
+            "max_s": self.max,
+            "rows": self.rows,
+            "rows_per_sec": self.rows / self.total if self.rows and self.total > 0 else None,
+        }
+
+class Profiler:
+    """Thread-safe accumulator of span timings."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stages: Dict[str, StageStats] = {}
+        self.stacks: Dict[str, float] = {}  # "a;b;c" -> self time in seconds
+        self.started = time.perf_counter()
+
+    def record(self, name: str, stack: str, seconds: float, self_seconds: float, rows: Optional[int]) -> None:
+        with self._lock:
+            self.stages.setdefault(name, StageStats()).add(seconds, rows)
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + self_seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+            self.stacks.clear()
+            self.started = time.perf_counter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = [{"name": k, **v.as_dict()} for k, v in self.stages.items()]
+            stacks = dict(self.stacks)
+            wall = time.perf_counter() - self.started
+        stages.sort(key=lambda s: -s["total_s"])
+        return {
+            "wall_s": wall,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+            "flamegraph": [f"{k} {round(v * 1e6)}" for k, v in sorted(stacks.items())],
+        }
+
+    def save(self, path: str | Path) -> Path:
+        """JSON report at `path`; collapsed stacks also go to `<path>.folded`."""
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        report = self.snapshot()
+        p.write_text(json.dumps(report, indent=2))
+        p.with_suffix(".folded").write_text("\n".join(report["flamegraph"]) + "\n")
+        return p
+
+class _NullSpan:
+    """Shared no-op span; `rows` may be assigned and is ignored."""
+    __slots__ = ("rows",)
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+_NULL = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "rows", "t0", "children", "stack")
+
+    def __init__(self, name: str, rows: Optional[int]) -> None:
+        self.name, self.rows = name, rows
+
+    def __enter__(self) -> "_Span":
+        frames = getattr(_LOCAL, "frames", None)
+        if frames is None:
+            frames = _LOCAL.frames = []
+        self.stack = f"{frames[-1].stack};{self.name}" if frames else self.name
+        self.children = 0.0
+        frames.append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.t0
+        frames = _LOCAL.frames
+        frames.pop()
+        if frames:
+            frames[-1].children += elapsed
+        prof = _ACTIVE
+        if prof is not None:
+            prof.record(self.name, self.stack, elapsed, max(0.0, elapsed - self.children), self.rows)
+        for hook in _HOOKS:
+            hook(self.name, elapsed, self.rows)
+
+def span(name: str, rows: Optional[int] = None) -> ContextManager[Any]:
+    """Time the enclosed block as `name` (processing `rows` rows) when profiling is on.
+    The context value accepts `.rows = n` for counts only known inside the block.
+    """
+    if _ACTIVE is None and not _HOOKS:
+        return _NULL
+    return _Span(name, rows)
+
+def timed_iter(iterable: Iterable[T], name: str) -> Iterator[T]:
+    """Yield from `iterable`, timing each `next` (e.g. reading a chunk) as a `name` span."""
+    it = iter(iterable)
+    while True:
+        with span(name) as s:
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            if hasattr(item, "__len__"):
+                s.rows = len(item)
+        yield item
+
+def enabled() -> bool:
+    return _ACTIVE is not None or bool(_HOOKS)
+
+def enable(profiler: Optional[Profiler] = None) -> Profiler:
+    """Start collecting into `profiler` (a new one by default) and return it."""
+    global _ACTIVE
+    _ACTIVE = profiler or Profiler()
+    return _ACTIVE
+
+def disable() -> Optional[Profiler]:
+    """Stop collecting; returns the profiler that was active."""
+    global _ACTIVE
+    prof, _ACTIVE = _ACTIVE, None
+    return prof
+
+def active() -> Optional[Profiler]:
+    return _ACTIVE
+
+def add_hook(hook: Hook) -> None:
+    """Call `hook(name, seconds, rows)` after every span, e.g. to feed a metrics agent."""
+    global _HOOKS
+    _HOOKS = _HOOKS + (hook,)
+
+def remove_hook(hook: Hook) -> None:
+    global _HOOKS
+    _HOOKS = tuple(h for h in _HOOKS if h is not hook)
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB; None where `resource` is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+def component_span_name(component: Any) -> str:
+    return "component:" + getattr(type(component), "__component_name__", type(component).__name__)
@@ -1,9 +1,16 @@
 from __future__ import annotations
-from typing import Dict, Type
+from typing import Any, Dict, List, Optional
 
 # Global registry for feature components
 COMPONENT_REGISTRY: Dict[str, "FeatureComponent"] = {}
 
+# Third-party packages expose components under this entry-point group, e.g. in pyproject.toml:
+#   [project.entry-points."xenoscore.components"]
+#   Lactate = "my_pkg.components:LactateComponent"
+# Entry points are only listed until a spec names one; then that one alone is imported.
+ENTRY_POINT_GROUP = "xenoscore.components"
+_ENTRY_POINTS: Optional[Dict[str, Any]] = None
+
 def register_component(name: str):
     def _wrap(cls):
         COMPONENT_REGISTRY[name] = cls
@@ -11,7 +18,32 @@ def register_component(name: str):
         return cls
     return _wrap
 
+def _entry_points() -> Dict[str, Any]:
+    global _ENTRY_POINTS
+    if _ENTRY_POINTS is None:
+        from importlib.metadata import entry_points
+        eps = entry_points()
+        selected = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, "select") else eps.get(ENTRY_POINT_GROUP, [])
+        _ENTRY_POINTS = {ep.name: ep for ep in selected}
+    return _ENTRY_POINTS
+
+def refresh_entry_points() -> None:
+    """Forget the cached entry-point listing (e.g. after installing a plugin at runtime)."""
+    global _ENTRY_POINTS
+    _ENTRY_POINTS = None
+
+def available_components() -> List[str]:
+    """Names of built-in, registered and entry-point components, without loading plugins."""
+    from . import components  # noqa: F401  (registers built-ins)
+    return sorted({*COMPONENT_REGISTRY, *_entry_points()})
+
 def get_component(name: str):
     if name not in COMPONENT_REGISTRY:
-        raise KeyError(f"Component not found: {name}. Registered: {list(COMPONENT_REGISTRY)}")
+        from . import components  # noqa: F401  (registers built-ins)
+    if name not in COMPONENT_REGISTRY and name in _entry_points():
+        cls = _entry_points()[name].load()
+        if COMPONENT_REGISTRY.get(name) is not cls:
+            register_component(name)(cls)
+    if name not in COMPONENT_REGISTRY:
+        raise KeyError(f"Component not found: {name}. Available: {available_components()}")
     return COMPONENT_REGISTRY[name]
@@ -0,0 +1,142 @@
+"""
+Incremental re-scoring of a patient census fed by long-format lab draws.
+
+A state directory keeps every draw seen so far (`draws.parquet`), per patient the hash
+of its wide input row and its last predictions (`scores.parquet`), and the engine they
+were computed with (`meta.json`). An update merges the new draws in and re-aggregates,
+re-featurizes and re-scores only patients with new or corrected draws, a changed wide
+row, or no stored score; everyone else keeps the stored predictions. A different
+engine rescores the whole census. Files are replaced atomically, draws last, so an
+interrupted update is redone in full by the next one.
+"""
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..data.longitudinal import WINDOW, LongFormat, merge_labs, normalize_labs, window_aggregates
+from ..data.validation import validate_dataframe
+from .engine import ScoreEngine, predict
+from .model import ModelScoreEngine
+from .weighted import WeightedScoreEngine
+
+DRAWS_FILE = "draws.parquet"
+SCORES_FILE = "scores.parquet"
+META_FILE = "meta.json"
+_ID, _HASH = "_id", "_row_hash"
+
+def _file_key(path: Optional[str]) -> Any:
+    if not path:
+        return None
+    st = Path(path).stat()
+    return [str(Path(path).resolve()), st.st_size, st.st_mtime_ns]
+
+def engine_key(eng: ScoreEngine) -> str:
+    """What the stored predictions depend on besides the rows: components and weights,
+    or the model (and bootstrap ensemble) files."""
+    if isinstance(eng, WeightedScoreEngine):
+        key = {"components": eng.component_specs, "weights": eng.weights,
+               "raw_range": eng.raw_range, "score_minmax": eng.score_minmax}
+    elif isinstance(eng, ModelScoreEngine):
+        key = {"components": eng.component_specs, "model": _file_key(eng.model_path),
+               "intervals": _file_key(eng.intervals), "ci_level": eng.ci_level}
+    else:
+        raise ValueError(f"Incremental scoring needs a single weighted or model engine, got {type(eng).__name__}")
+    return json.dumps(key, sort_keys=True, default=str)
+
+def _replace(path: Path, write: Callable[[Path], None]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+@dataclass
+class CensusUpdate:
+    predictions: pd.DataFrame  # ID column + prediction columns, one row per census patient in input order
+    rescored: List[str]        # IDs whose predictions were recomputed
+    new_draws: int             # draws that were not already in the state
+    errors: list               # validation errors of the rescored rows
+
+class CensusState:
+    """State directory of an incrementally re-scored census."""
+
+    def __init__(self, path: str | Path, fmt: LongFormat = LongFormat(), window: Tuple[float, float] = WINDOW):
+        self.path = Path(path)
+        self.fmt = fmt
+        self.window = window
+
+    def draws(self) -> pd.DataFrame:
+        p = self.path / DRAWS_FILE
+        return pd.read_parquet(p) if p.exists() else normalize_labs(pd.DataFrame(columns=self.fmt.columns), self.fmt)
+
+    def scores(self, key: str) -> Optional[pd.DataFrame]:
+        """Stored predictions if they were computed with the engine `key`."""
+        meta, scores = self.path / META_FILE, self.path / SCORES_FILE
+        if not (meta.exists() and scores.exists()) or json.loads(meta.read_text()).get("engine") != key:
+            return None
+        return pd.read_parquet(scores)
+
+    def update(
+        self,
+        eng: ScoreEngine,
+        patients: pd.DataFrame,
+        labs: pd.DataFrame,
+        id_column: str,
+        validate: Callable[[pd.DataFrame], Tuple[pd.DataFrame, list]] = validate_dataframe,
+    ) -> CensusUpdate:
+        """Merge `labs` (long format) into the state and score the census `patients`
+        (one wide row per patient), recomputing only the patients that need it.
+        """
+        fmt = self.fmt
+        if id_column not in patients.columns:
+            raise ValueError(f"ID column {id_column!r} not found in the patient table")
+        ids = patients[id_column].astype(str)
+        if ids.duplicated().any():
+            raise ValueError(f"Duplicate patient IDs in {id_column!r}: {ids[ids.duplicated()].unique()[:5].tolist()}")
+        key = engine_key(eng)
+
+        old = self.draws()
+        new = normalize_labs(labs, fmt)
+        fresh = new.merge(old, on=fmt.columns, how="left", indicator=True)["_merge"].eq("left_only").to_numpy()
+        new = new[fresh]
+        # a corrected value for the same draw replaces the stored one
+        draws = pd.concat([old, new], ignore_index=True).drop_duplicates(
+            subset=[fmt.id, fmt.analyte, fmt.time], keep="last", ignore_index=True)
+
+        row_hash = pd.util.hash_pandas_object(patients[sorted(patients.columns)], index=False).to_numpy()
+        stored = self.scores(key)
+        affected = np.array(ids.isin(new[fmt.id]))
+        if stored is None or not len(stored):
+            pos = np.full(len(ids), -1)
+            affected[:] = True
+        else:
+            pos = pd.Index(stored[_ID]).get_indexer(ids)
+            affected |= (pos < 0) | (stored[_HASH].to_numpy()[pos] != row_hash)
+
+        parts, errors = [], []
+        if (~affected).any():
+            parts.append(stored.iloc[pos[~affected]])
+        if affected.any():
+            rows = patients[affected]
+            aggs = window_aggregates(draws[draws[fmt.id].isin(ids[affected])], fmt, self.window)
+            rows, errors = validate(merge_labs(rows, aggs, id_column))
+            preds = predict(eng, rows).reset_index(drop=True)
+            preds.insert(0, _HASH, row_hash[affected])
+            preds.insert(0, _ID, ids[affected].to_numpy())
+            parts.append(preds)
+        scores = pd.concat(parts, ignore_index=True).set_index(_ID).reindex(ids).reset_index(names=_ID) \
+            if parts else pd.DataFrame({_ID: [], _HASH: []})
+        if isinstance(eng, WeightedScoreEngine) and eng.raw_range is None and len(scores):
+            # batch min-max scaling: rescale over the whole census, as a full run would
+            scores["risk_score"] = eng.scale(scores["raw_score"]).to_numpy()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        _replace(self.path / SCORES_FILE, lambda p: scores.to_parquet(p, index=False))
+        _replace(self.path / META_FILE, lambda p: p.write_text(json.dumps({"engine": key})))
+        _replace(self.path / DRAWS_FILE, lambda p: draws.to_parquet(p, index=False))
+
+        predictions = scores.drop(columns=[_ID, _HASH])
+        predictions.insert(0, id_column, patients[id_column].to_numpy())
+        return CensusUpdate(predictions, ids[affected].tolist(), int(len(new)), errors)
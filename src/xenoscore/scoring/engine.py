@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import List, Optional, Union
+import pandas as pd
+from ..ml.feature_cache import FeatureCache
+from ..config import ConfigError, load_component_config, load_weights_config, load_raw_score_range, load_profile_manifest
+from .weighted import WeightedScoreEngine
+from .model import ModelScoreEngine
+from .linear import load_model
+from .profiles import ProfileSet
+
+ScoreEngine = Union[WeightedScoreEngine, ModelScoreEngine]
+
+def build_engine(
+    config: str,
+    weights: Optional[str] = None,
+    model: Optional[str] = None,
+    workers: Optional[int] = None,
+    feature_cache: Optional[str] = None,
+    compact: bool = False,
+    intervals: Optional[str] = None,
+    ci_level: float = 0.95,
+) -> ScoreEngine:
+    """Engine from a component YAML plus either a trained model or a weights YAML.
+    `feature_cache` is a directory for the on-disk feature store (off when None);
+    `compact` keeps feature matrices in float32; `intervals` is a bootstrap ensemble
+    adding `ci_level` probability intervals to model predictions.
+    """
+    comp_cfg = load_component_config(config)["components"]
+    cache = FeatureCache(feature_cache) if feature_cache else None
+    if model:
+        return ModelScoreEngine(comp_cfg, model, workers=workers, feature_cache=cache, compact=compact,
+                                intervals=intervals, ci_level=ci_level)
+    if not weights:
+        raise ConfigError("Weights YAML is required when no model is provided.")
+    return WeightedScoreEngine(comp_cfg, load_weights_config(weights), raw_range=load_raw_score_range(weights),
+                               workers=workers, feature_cache=cache, compact=compact)
+
+def build_profiles(
+    manifest: str,
+    workers: Optional[int] = None,
+    feature_cache: Optional[str] = None,
+    compact: bool = False,
+) -> ProfileSet:
+    """`ProfileSet` of every profile in a manifest YAML (see `load_profile_manifest`)."""
+    profiles = {name: build_engine(p["config"], p["weights"], p["model"], workers=workers, compact=compact)
+                for name, p in load_profile_manifest(manifest).items()}
+    return ProfileSet(profiles, workers=workers, feature_cache=FeatureCache(feature_cache) if feature_cache else None,
+                      compact=compact)
+
+def predict(eng: Union[ScoreEngine, ProfileSet], df: pd.DataFrame) -> pd.DataFrame:
+    """Prediction columns for df: features/raw_score/risk_score, model_probability, or one
+    score column per profile of a `ProfileSet`."""
+    return eng.predict_proba(df) if isinstance(eng, ModelScoreEngine) else eng.score_dataframe(df)
+
+def input_columns(eng: Union[ScoreEngine, ProfileSet]) -> Optional[List[str]]:
+    """Columns `predict` reads (for projected reads); None when a component does not declare them."""
+    if isinstance(eng, ProfileSet):
+        return eng.read_columns
+    plan = eng.plan if isinstance(eng, WeightedScoreEngine) else eng.plan_for(load_model(eng.model_path))
+    cols = plan.read_columns
+    return None if cols is None else list(cols)
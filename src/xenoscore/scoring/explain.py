@@ -0,0 +1,73 @@
+"""
+Per-feature contributions behind every score, computed as whole-matrix operations.
+
+Weighted engine: weight x feature; the contributions of a row sum to its raw_score.
+Model engine (linear artifacts and scaler + logistic pipelines): coef / scale x feature
+in log-odds; they sum with the model intercept to the row's decision function.
+"""
+from __future__ import annotations
+from typing import Any, List, Tuple
+import numpy as np
+import pandas as pd
+from ..profiling import span
+from .linear import LinearModel, load_model
+from .model import ModelScoreEngine
+from .weighted import WeightedScoreEngine
+
+CONTRIB_PREFIX = "contrib_"
+
+def as_linear(model: Any, feature_names: List[str]) -> LinearModel:
+    """`model` as a LinearModel; ValueError for models without per-feature coefficients."""
+    if isinstance(model, LinearModel):
+        return model
+    if hasattr(model, "named_steps") and hasattr(model.named_steps.get("clf"), "coef_"):
+        names = getattr(model, "feature_names_in_", None)
+        return LinearModel.from_pipeline(model, [str(n) for n in names] if names is not None else feature_names)
+    raise ValueError(f"Explanations need a linear model (scaler + logistic pipeline or .npz/.json artifact), got {type(model).__name__}")
+
+def contributions(eng: Any, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(predictions, contributions): the engine's usual prediction columns and one
+    `contrib_<feature>` column per feature, both computed from a single featurization.
+    """
+    if isinstance(eng, WeightedScoreEngine):
+        preds = eng.score_dataframe(df)
+        names = [c for c in preds.columns if c not in ("raw_score", "risk_score")]
+        w = np.array([eng.weights.get(k, 0.0) for k in names], dtype=float)
+        X = preds[names].to_numpy(dtype=float)
+        with span("explain", len(df)):
+            C = X * w
+            C[:, w == 0.0] = 0.0  # the weighted sum skips these features, NaN or not
+    elif isinstance(eng, ModelScoreEngine):
+        model = load_model(eng.model_path)
+        feats = eng._featurize(df, eng.plan_for(model))
+        preds = eng.predict_features(feats, model)
+        lm = as_linear(model, [str(c) for c in feats.columns])
+        names = list(lm.feature_names)
+        with span("explain", len(df)):
+            X = feats.fillna(0.0).reindex(columns=names, fill_value=0.0).to_numpy(dtype=float)
+            C = X * (lm.coef / lm.scale)
+    else:
+        raise ValueError(f"Explanations are not supported for {type(eng).__name__}")
+    return preds, pd.DataFrame(C, index=df.index, columns=[CONTRIB_PREFIX + n for n in names], copy=False)
+
+def top_drivers(contrib: pd.DataFrame, k: int = 3) -> pd.DataFrame:
+    """The k largest (most risk-increasing) contributions per row: `driver_<i>` (feature
+    name, categorical) and `driver_<i>_contribution`, i = 1..k. Ties keep feature order.
+    """
+    names = [c[len(CONTRIB_PREFIX):] if c.startswith(CONTRIB_PREFIX) else c for c in contrib.columns]
+    C = contrib.to_numpy(dtype=float)
+    k = max(0, min(k, C.shape[1]))
+    with span("top_drivers", len(C)):
+        ranked = np.where(np.isnan(C), -np.inf, C)
+        order = np.argsort(-ranked, axis=1, kind="stable")[:, :k]
+        values = np.take_along_axis(C, order, axis=1)
+    cols = {}
+    for i in range(k):
+        cols[f"driver_{i + 1}"] = pd.Categorical.from_codes(order[:, i], categories=names)
+        cols[f"driver_{i + 1}_contribution"] = values[:, i]
+    return pd.DataFrame(cols, index=contrib.index)
+
+def explain(eng: Any, df: pd.DataFrame, top_k: int = 3) -> pd.DataFrame:
+    """Prediction columns followed by every contribution and the top-k drivers."""
+    preds, contrib = contributions(eng, df)
+    return pd.concat([preds, contrib, top_drivers(contrib, top_k)], axis=1)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Tuple
+import numpy as np
+import pandas as pd
+from ..profiling import span
+
+ARTIFACT_FORMAT = "xenoscore-linear-v1"
+BOOTSTRAP_FORMAT = "xenoscore-bootstrap-v1"
+BLOCK_ELEMENTS = 20_000_000  # rows x replicates per interval matrix product (~160 MB of float64)
+ARTIFACT_SUFFIXES = {".npz", ".json"}
+
+@dataclass(frozen=True)
+class LinearModel:
+    """Scaler + logistic regression reduced to arrays: p = sigmoid((X / scale) . coef + intercept).
+    Inference needs only NumPy (no scikit-learn / joblib).
+    """
+    feature_names: Tuple[str, ...]
+    scale: np.ndarray
+    coef: np.ndarray
+    intercept: float
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:
+        # same attribute sklearn estimators expose, so callers can treat both alike
+        return np.asarray(self.feature_names, dtype=object)
+
+    def decision_function(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X.reindex(columns=list(self.feature_names), fill_value=0.0).to_numpy(dtype=float)
+        return (X / self.scale) @ self.coef + self.intercept
+
+    def predict_proba(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """Two-column [P(y=0), P(y=1)] array, like sklearn."""
+        with np.errstate(over="ignore"):
+            p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    @classmethod
+    def from_pipeline(cls, pipe: Any, feature_names: List[str]) -> "LinearModel":
+        """Extract arrays from a fitted Pipeline([("scaler", StandardScaler(with_mean=False)), ("clf", LogisticRegression)])."""
+        clf = pipe.named_steps["clf"]
+        scaler = pipe.named_steps.get("scaler")
+        n = len(feature_names)
+        scale = np.asarray(scaler.scale_, dtype=float) if scaler is not None and scaler.scale_ is not None else np.ones(n)
+        return cls(tuple(feature_names), scale, np.asarray(clf.coef_, dtype=float).ravel(), float(np.ravel(clf.intercept_)[0]))
+
+    def save(self, path: str | Path) -> None:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        if p.suffix.lower() == ".json":
+            p.write_text(json.dumps({
+                "format": ARTIFACT_FORMAT,
+                "feature_names": list(self.feature_names),
+                "scale": self.scale.tolist(),
+                "coef": self.coef.tolist(),
+                "intercept": self.intercept,
+            }, indent=2))
+        elif p.suffix.lower() == ".npz":
+            with open(p, "wb") as f:
+                np.savez(f, format=np.array(ARTIFACT_FORMAT), feature_names=np.array(self.feature_names, dtype=str),
+                         scale=self.scale, coef=self.coef, intercept=np.array(self.intercept))
+        else:
+            raise ValueError(f"Unsupported artifact format: {p.suffix} (use .npz or .json)")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "LinearModel":
+        p = Path(path)
+        if p.suffix.lower() == ".json":
+            data = json.loads(p.read_text())
+        else:
+            with np.load(p, allow_pickle=False) as npz:
+                data = {k: npz[k] for k in npz.files}
+                data["format"] = str(data["format"])
+                data["feature_names"] = [str(n) for n in data["feature_names"]]
+        if data.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Not a {ARTIFACT_FORMAT} artifact: {p}")
+        return cls(tuple(data["feature_names"]), np.asarray(data["scale"], dtype=float),
+                   np.asarray(data["coef"], dtype=float), float(data["intercept"]))
+
+@dataclass(frozen=True)
+class BootstrapEnsemble:
+    """Logistic models refit on B bootstrap resamples, reduced to arrays:
+    logit_b = X . coef[b] + intercept[b], with the scaler already folded into `coef`.
+    """
+    feature_names: Tuple[str, ...]
+    coef: np.ndarray       # B x features
+    intercept: np.ndarray  # B
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:
+        return np.asarray(self.feature_names, dtype=object)
+
+    def _matrix(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            return X.reindex(columns=list(self.feature_names), fill_value=0.0).to_numpy(dtype=float)
+        return np.asarray(X, dtype=float)
+
+    def intervals(self, X: pd.DataFrame | np.ndarray, level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row percentile interval of P(y=1) over the B models. Each block of rows is
+        one (rows x features) @ (features x B) product; the percentiles are taken on the
+        log-odds and mapped through the sigmoid, which is monotone.
+        """
+        X = self._matrix(X)
+        q = [(1.0 - level) / 2.0, (1.0 + level) / 2.0]
+        out = np.empty((2, len(X)))
+        block = max(1, BLOCK_ELEMENTS // max(len(self.intercept), 1))
+        for a in range(0, len(X), block):
+            logits = X[a:a + block] @ self.coef.T + self.intercept
+            out[:, a:a + block] = np.quantile(logits, q, axis=1)
+        with np.errstate(over="ignore"):
+            p = 1.0 / (1.0 + np.exp(-out))
+        return p[0], p[1]
+
+    def save(self, path: str | Path) -> None:
+        p = Path(path)
+        if p.suffix.lower() != ".npz":
+            raise ValueError(f"Bootstrap ensembles are saved as .npz (got {p.suffix})")
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, "wb") as f:
+            np.savez(f, format=np.array(BOOTSTRAP_FORMAT), feature_names=np.array(self.feature_names, dtype=str),
+                     coef=self.coef, intercept=self.intercept)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BootstrapEnsemble":
+        with np.load(path, allow_pickle=False) as npz:
+            if str(npz["format"]) != BOOTSTRAP_FORMAT:
+                raise ValueError(f"Not a {BOOTSTRAP_FORMAT} artifact: {path}")
+            return cls(tuple(str(n) for n in npz["feature_names"]), npz["coef"], npz["intercept"])
+
+def _load_artifact(p: Path) -> Any:
+    if p.suffix.lower() == ".npz":
+        with np.load(p, allow_pickle=False) as npz:
+            if "format" in npz.files and str(npz["format"]) == BOOTSTRAP_FORMAT:
+                return BootstrapEnsemble.load(p)
+    return LinearModel.load(p)
+
+# Process-wide LRU of loaded models keyed by (path, mtime, size): a rewritten file is reloaded.
+MODEL_CACHE_SIZE = 8
+_MODEL_CACHE: "OrderedDict[tuple, Any]" = OrderedDict()
+
+def load_model(path: Any) -> Any:
+    """Load a native artifact (.npz/.json; LinearModel or BootstrapEnsemble) or a joblib
+    pipeline, reusing cached instances.
+    File-like objects (e.g. uploads) are loaded with joblib and not cached.
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        import joblib
+        return joblib.load(path)
+    p = Path(path).resolve()
+    st = p.stat()
+    key = (str(p), st.st_mtime_ns, st.st_size)
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        _MODEL_CACHE.move_to_end(key)
+        return model
+    with span("load_model"):
+        if p.suffix.lower() in ARTIFACT_SUFFIXES:
+            model = _load_artifact(p)
+        else:
+            import joblib
+            model = joblib.load(p)
+    for stale in [k for k in _MODEL_CACHE if k[0] == key[0]]:
+        del _MODEL_CACHE[stale]
+    _MODEL_CACHE[key] = model
+    while len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    return model
+
+def clear_model_cache() -> None:
+    _MODEL_CACHE.clear()
@@ -1,38 +1,84 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
-import joblib
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
-from ..registry import get_component
-from ..components.core import FeatureComponent
+from ..ml.featurize import compute_feature_frame
+from ..ml.feature_cache import FeatureCache
+from ..profiling import span
+from .plan import ScoringPlan, compile_plan
+from .linear import LinearModel, load_model
 
 @dataclass
 class ModelScoreEngine:
     """Use ML model to learn weights/probabilities from component outputs."""
     component_specs: List[Dict[str, Any]]
     model_path: str
+    workers: Optional[int] = None  # featurization processes; None -> $XENOSCORE_WORKERS or 1
+    feature_cache: Optional[FeatureCache] = None  # on-disk store of previously computed features
+    compact: bool = False                         # hold features as one float32 matrix
+    intervals: Optional[str] = None               # bootstrap ensemble (.npz) for per-row probability intervals
+    ci_level: float = 0.95
+    _plan: Optional[ScoringPlan] = field(default=None, init=False, repr=False, compare=False)
+    _plan_features: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
 
-    def _instantiate_components(self) -> List[FeatureComponent]:
-        return [get_component(spec["name"])(params=spec.get("params", {})) for spec in self.component_specs]
+    def plan_for(self, model: Any) -> ScoringPlan:
+        """Plan pruned to the features the model was fit on (all components if unknown).
+        ValueError if the components cannot produce every model feature; when some
+        component does not declare its outputs, missing features are zero-filled instead.
+        """
+        names = getattr(model, "feature_names_in_", None)
+        names = [str(n) for n in names] if names is not None else None
+        if self._plan is None or self._plan_features != names:
+            plan = compile_plan(self.component_specs, feature_names=names)
+            if plan.unknown_features and not plan.opaque:
+                raise ValueError(f"The component config does not produce model features: {list(plan.unknown_features)}")
+            self._plan = plan
+            self._plan_features = names
+        return self._plan
 
-    def _featurize(self, df: pd.DataFrame) -> pd.DataFrame:
-        comps = self._instantiate_components()
-        feats = []
-        for _, row in df.iterrows():
-            row_feats = {}
-            for comp in comps:
-                row_feats.update(comp.compute(row.to_dict()))
-            feats.append(row_feats)
-        return pd.DataFrame(feats, index=df.index)
+    def interval_model(self, model: Any) -> Any:
+        """The `intervals` ensemble, checked against `model`: ValueError unless it is a
+        bootstrap ensemble fit on the model's features.
+        """
+        ensemble = load_model(self.intervals)
+        if not hasattr(ensemble, "intervals"):
+            raise ValueError(f"{self.intervals} is not a bootstrap ensemble (see `train --bootstrap`)")
+        names = getattr(model, "feature_names_in_", None)
+        if names is not None and sorted(map(str, names)) != sorted(ensemble.feature_names):
+            raise ValueError(f"Bootstrap ensemble {self.intervals} was fit on features {list(ensemble.feature_names)}, "
+                             f"but the model uses {[str(n) for n in names]}")
+        return ensemble
+
+    def _featurize(self, df: pd.DataFrame, plan: Optional[ScoringPlan] = None) -> pd.DataFrame:
+        dtype = np.float32 if self.compact else None
+        if plan is None:
+            return compute_feature_frame(df, self.component_specs, self.workers, cache=self.feature_cache, dtype=dtype)
+        return compute_feature_frame(df, list(plan.component_specs), self.workers, plan.components, self.feature_cache, dtype)
 
     def predict_proba(self, df: pd.DataFrame) -> pd.DataFrame:
-        model = joblib.load(self.model_path)
-        X = self._featurize(df).fillna(0.0)
-        proba = model.predict_proba(X)[:, 1]
-        return pd.DataFrame({"model_probability": proba}, index=df.index)
+        model = load_model(self.model_path)
+        return self.predict_features(self._featurize(df, self.plan_for(model)), model)
+
+    def predict_features(self, feats: pd.DataFrame, model: Any = None) -> pd.DataFrame:
+        """`predict_proba` on raw features already computed for this engine's plan."""
+        if model is None:
+            model = load_model(self.model_path)
+        self.plan_for(model)
+        X = feats.fillna(0.0)
+        if self._plan_features is not None:
+            # model input order; zeros only for features of opaque components' plans
+            X = X.reindex(columns=self._plan_features, fill_value=0.0)
+        with span("model_predict", len(X)):
+            proba = model.predict_proba(X)[:, 1]
+        out = pd.DataFrame({"model_probability": proba}, index=feats.index)
+        if self.intervals:
+            with span("intervals", len(X)):
+                out["model_probability_lo"], out["model_probability_hi"] = self.interval_model(model).intervals(X, self.ci_level)
+        return out
 
 def learn_weights_from_logistic(model_path: str, feature_names: List[str]) -> Dict[str, float]:
     """Convert a trained logistic regression's coefficients into feature weights."""
-    model = joblib.load(model_path)
-    coef = model.named_steps.get("clf", model).coef_.ravel()
+    model = load_model(model_path)
+    coef = model.coef if isinstance(model, LinearModel) else model.named_steps.get("clf", model).coef_.ravel()
     return {fn: float(w) for fn, w in zip(feature_names, coef)}
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import json
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from ..registry import get_component
+from ..components.core import FeatureComponent
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    """Immutable, pre-resolved scoring recipe.
+
+    `components` are instantiated once; `input_columns` is the union of the columns
+    they read, `feature_names` the features they produce (in output order) and
+    `weights` the weight of each feature (zeros for model plans).
+    """
+    component_specs: Tuple[Dict[str, Any], ...]
+    components: Tuple[FeatureComponent, ...]
+    input_columns: Tuple[str, ...]
+    feature_names: Tuple[str, ...]
+    weights: np.ndarray
+    dropped_components: Tuple[str, ...] = ()
+    unknown_features: Tuple[str, ...] = ()  # weighted/model features no component produces
+    opaque: bool = False                   # some component declares no outputs; nothing can be inferred about it
+
+    @property
+    def weight_map(self) -> Dict[str, float]:
+        return dict(zip(self.feature_names, self.weights.tolist()))
+
+    @property
+    def read_columns(self) -> Optional[Tuple[str, ...]]:
+        """Columns to load for this plan; None when some component does not declare its inputs."""
+        if any(not c.required_columns for c in self.components):
+            return None
+        return self.input_columns
+
+def _key(component_specs: List[Dict[str, Any]], weights: Optional[Dict[str, float]], feature_names: Optional[List[str]]) -> str:
+    return json.dumps([component_specs, weights, feature_names], sort_keys=True, default=str)
+
+_PLAN_CACHE: Dict[str, ScoringPlan] = {}
+_PLAN_CACHE_SIZE = 64
+
+def compile_plan(
+    component_specs: List[Dict[str, Any]],
+    weights: Optional[Dict[str, float]] = None,
+    feature_names: Optional[List[str]] = None,
+) -> ScoringPlan:
+    """Resolve component specs against weights (weighted engine) or a trained model's
+    feature names (model engine). Components whose declared features cannot reach the
+    result (zero/missing weight, not used by the model, or overwritten by a later
+    component) are dropped; components that declare no features are always kept.
+    Plans are memoized on their inputs, so repeated scoring reuses them.
+    """
+    key = _key(component_specs, weights, feature_names)
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = _compile(component_specs, weights, feature_names)
+        if len(_PLAN_CACHE) >= _PLAN_CACHE_SIZE:
+            _PLAN_CACHE.pop(next(iter(_PLAN_CACHE)))
+        _PLAN_CACHE[key] = plan
+    if plan.unknown_features and not plan.opaque and weights is not None:
+        warnings.warn(f"Weights name features no component produces: {list(plan.unknown_features)}", stacklevel=2)
+    return plan
+
+def _compile(
+    component_specs: List[Dict[str, Any]],
+    weights: Optional[Dict[str, float]],
+    feature_names: Optional[List[str]],
+) -> ScoringPlan:
+    specs = [{"name": s["name"], "params": dict(s.get("params", {}))} for s in component_specs]
+    comps = [get_component(s["name"])(params=s["params"]) for s in specs]
+    if weights is not None:
+        used = {k for k, w in weights.items() if w != 0.0}
+    elif feature_names is not None:
+        used = set(feature_names)
+    else:
+        used = None  # nothing to prune against
+
+    # walk backwards: a feature only counts for the last component that writes it
+    keep = [True] * len(comps)
+    claimed: set = set()
+    for i in range(len(comps) - 1, -1, -1):
+        feats = comps[i].output_features
+        if feats and used is not None:
+            keep[i] = any(f in used and f not in claimed for f in feats)
+        claimed.update(feats)
+
+    kept = [(s, c) for s, c, k in zip(specs, comps, keep) if k]
+    names: Dict[str, None] = {}
+    columns: Dict[str, None] = {}
+    for _, comp in kept:
+        names.update(dict.fromkeys(comp.output_features))
+        columns.update(dict.fromkeys(comp.required_columns))
+    opaque = any(not c.output_features for c in comps)
+    if weights is not None:
+        unknown = tuple(k for k in weights if k not in claimed)
+        w = np.array([weights.get(f, 0.0) for f in names], dtype=float)
+    else:
+        unknown = tuple(f for f in (feature_names or []) if f not in claimed)
+        w = np.zeros(len(names))
+    w.setflags(write=False)
+    return ScoringPlan(
+        component_specs=tuple(s for s, _ in kept),
+        components=tuple(c for _, c in kept),
+        input_columns=tuple(columns),
+        feature_names=tuple(names),
+        weights=w,
+        dropped_components=tuple(s["name"] for s, k in zip(specs, keep) if not k),
+        unknown_features=unknown,
+        opaque=opaque,
+    )
@@ -0,0 +1,128 @@
+"""
+Multi-profile scoring: several (components, weights or model) profiles over one input.
+
+The kept components of every profile's plan are deduplicated by spec, so a component
+shared by several profiles runs once per row. Unique components are grouped into as few
+featurization passes as possible (a pass never holds two components writing the same
+feature name); each profile then assembles its own feature frame from those outputs in
+its own component order and is scored exactly as its single-profile engine would.
+"""
+from __future__ import annotations
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from ..components.core import FeatureComponent
+from ..ml.featurize import compute_feature_frame
+from ..ml.feature_cache import FeatureCache
+from .linear import load_model
+from .model import ModelScoreEngine
+from .plan import ScoringPlan
+from .weighted import WeightedScoreEngine
+
+ProfileEngine = Union[WeightedScoreEngine, ModelScoreEngine]
+
+def _spec_key(spec: Dict[str, Any]) -> str:
+    return json.dumps({"name": spec["name"], "params": spec.get("params", {})}, sort_keys=True, default=str)
+
+@dataclass
+class _Pass:
+    """One featurization call: components whose output names do not collide."""
+    specs: List[Dict[str, Any]] = field(default_factory=list)
+    components: List[FeatureComponent] = field(default_factory=list)
+    features: set = field(default_factory=set)
+    opaque: bool = False  # a single component that does not declare its features
+
+@dataclass
+class ProfileSet:
+    """Named scoring profiles sharing one featurization of the input."""
+    profiles: Dict[str, ProfileEngine]
+    workers: Optional[int] = None                 # featurization processes; None -> $XENOSCORE_WORKERS or 1
+    feature_cache: Optional[FeatureCache] = None  # on-disk store of previously computed features
+    compact: bool = False                         # hold features as float32 matrices
+    _pass_list: Optional[List[_Pass]] = field(default=None, init=False, repr=False, compare=False)
+
+    def plan(self, name: str) -> ScoringPlan:
+        eng = self.profiles[name]
+        return eng.plan if isinstance(eng, WeightedScoreEngine) else eng.plan_for(load_model(eng.model_path))
+
+    @property
+    def read_columns(self) -> Optional[List[str]]:
+        """Union of the profiles' input columns; None when some component does not declare them."""
+        cols: Dict[str, None] = {}
+        for name in self.profiles:
+            plan_cols = self.plan(name).read_columns
+            if plan_cols is None:
+                return None
+            cols.update(dict.fromkeys(plan_cols))
+        return list(cols)
+
+    def score_column(self, name: str) -> str:
+        kind = "risk_score" if isinstance(self.profiles[name], WeightedScoreEngine) else "model_probability"
+        return f"{name}_{kind}"
+
+    def _passes(self) -> List[_Pass]:
+        """Unique components of all plans, packed into featurization passes (first fit)."""
+        if self._pass_list is None:
+            passes: List[_Pass] = []
+            seen: Dict[str, None] = {}
+            for name in self.profiles:
+                plan = self.plan(name)
+                for spec, comp in zip(plan.component_specs, plan.components):
+                    key = _spec_key(spec)
+                    if key in seen:
+                        continue
+                    seen[key] = None
+                    feats = set(comp.output_features)
+                    target = None
+                    if feats:
+                        target = next((p for p in passes if not p.opaque and not (p.features & feats)), None)
+                    if target is None:
+                        target = _Pass(opaque=not feats)
+                        passes.append(target)
+                    target.specs.append(spec)
+                    target.components.append(comp)
+                    target.features |= feats
+            self._pass_list = passes
+        return self._pass_list
+
+    def component_runs(self) -> int:
+        """Components executed per row (each unique spec across all profiles once)."""
+        return sum(len(p.specs) for p in self._passes())
+
+    def features(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Raw feature frame of every profile, computing each unique component once."""
+        dtype = np.float32 if self.compact else None
+        outputs: Dict[str, Dict[str, pd.Series]] = {}  # component spec key -> its feature columns
+        for p in self._passes():
+            frame = compute_feature_frame(df, p.specs, self.workers, p.components, self.feature_cache, dtype)
+            for spec, comp in zip(p.specs, p.components):
+                names = frame.columns if p.opaque else [f for f in comp.output_features if f in frame.columns]
+                outputs[_spec_key(spec)] = {c: frame[c] for c in names}
+        result: Dict[str, pd.DataFrame] = {}
+        for name in self.profiles:
+            cols: Dict[str, pd.Series] = {}
+            for spec in self.plan(name).component_specs:
+                cols.update(outputs[_spec_key(spec)])  # first position, last value, as in compute_features
+            result[name] = pd.DataFrame(cols, index=df.index)
+        return result
+
+    def raw_scores(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Unscaled weighted sum of every weighted profile, one column per profile name."""
+        feats = self.features(df)
+        return pd.DataFrame({name: eng.add_raw_score(feats[name])["raw_score"]
+                             for name, eng in self.profiles.items() if isinstance(eng, WeightedScoreEngine)},
+                            index=df.index)
+
+    def score_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """One score column per profile: `<name>_risk_score` or `<name>_model_probability`."""
+        feats = self.features(df)
+        out: Dict[str, Any] = {}
+        for name, eng in self.profiles.items():
+            if isinstance(eng, WeightedScoreEngine):
+                raw = eng.add_raw_score(feats[name])["raw_score"]
+                out[self.score_column(name)] = eng.scale(raw).to_numpy() if len(raw) else np.array([], dtype=float)
+            else:
+                out[self.score_column(name)] = eng.predict_features(feats[name])["model_probability"].to_numpy()
+        return pd.DataFrame(out, index=df.index)
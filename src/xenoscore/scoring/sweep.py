@@ -0,0 +1,180 @@
+"""
+Weight sweeps: featurize once, then score many weight vectors as matrix products.
+"""
+from __future__ import annotations
+import itertools
+import warnings
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from ..config import load_weights_config
+from ..ml.featurize import compute_feature_frame
+if TYPE_CHECKING:
+    from ..ml.feature_cache import FeatureCache
+
+BLOCK_ELEMENTS = 20_000_000  # rows x vectors scored per matrix product (~160 MB of float64)
+TIE_DECIMALS = 12            # raw scores equal after rounding count as ties
+
+@dataclass
+class FeatureMatrix:
+    """Dense component features (rows x features) shared by every vector of a sweep."""
+    X: np.ndarray
+    feature_names: List[str]
+    index: pd.Index
+
+def feature_matrix(
+    df: pd.DataFrame,
+    component_specs: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    cache: Optional["FeatureCache"] = None,
+) -> FeatureMatrix:
+    """Every component's features (none pruned, since sweeps may weight any of them)."""
+    feats = compute_feature_frame(df, component_specs, workers, cache=cache)
+    return FeatureMatrix(feats.to_numpy(dtype=float), [str(c) for c in feats.columns], df.index)
+
+def weight_matrix(vectors: Sequence[Dict[str, float]], feature_names: Sequence[str]) -> np.ndarray:
+    """Stack weight dicts into a (vectors x features) array in `feature_names` order."""
+    unknown = sorted({k for v in vectors for k in v} - set(feature_names))
+    if unknown:
+        warnings.warn(f"Weights name features no component produces: {unknown}", stacklevel=2)
+    return np.array([[v.get(f, 0.0) for f in feature_names] for v in vectors], dtype=float).reshape(len(vectors), len(feature_names))
+
+def grid_vectors(base: Dict[str, float], grid: Dict[str, Sequence[float]]) -> List[Tuple[str, Dict[str, float]]]:
+    """Cartesian product of the listed values per feature, other weights kept at `base`."""
+    names = list(grid)
+    out = []
+    for values in itertools.product(*(grid[n] for n in names)):
+        label = ",".join(f"{n}={v:g}" for n, v in zip(names, values))
+        out.append((label, {**base, **dict(zip(names, map(float, values)))}))
+    return out
+
+def perturbed_vectors(base: Dict[str, float], n: int, scale: float = 0.2, seed: int = 0) -> List[Tuple[str, Dict[str, float]]]:
+    """`n` copies of `base` with every weight multiplied by U(1 - scale, 1 + scale)."""
+    rng = np.random.default_rng(seed)
+    names = list(base)
+    factors = rng.uniform(1.0 - scale, 1.0 + scale, size=(n, len(names)))
+    return [(f"perturb-{i}", {k: base[k] * float(f) for k, f in zip(names, row)}) for i, row in enumerate(factors)]
+
+def yaml_vectors(paths: Iterable[str]) -> List[Tuple[str, Dict[str, float]]]:
+    return [(str(p), load_weights_config(p)) for p in paths]
+
+def average_ranks(scores: np.ndarray) -> np.ndarray:
+    """Column-wise descending ranks (1 = highest score); ties share their average rank."""
+    n = scores.shape[0]
+    order = np.argsort(-scores, axis=0, kind="stable")
+    s = np.take_along_axis(scores, order, axis=0)
+    pos = np.arange(n)[:, None]
+    starts = np.ones(s.shape, dtype=bool)
+    starts[1:] = s[1:] != s[:-1]
+    ends = np.ones(s.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    first = np.maximum.accumulate(np.where(starts, pos, 0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, pos, n - 1)[::-1], axis=0)[::-1]
+    ranks = np.empty(s.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2.0 + 1.0, axis=0)
+    return ranks
+
+def _auc_from_ranks(ranks: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """ROC AUC per column via Mann-Whitney U (ties count half, as in sklearn)."""
+    pos = y == 1
+    n1, n0 = int(pos.sum()), int((~pos).sum())
+    if n1 == 0 or n0 == 0:
+        return np.full(ranks.shape[1], np.nan)
+    ascending = ranks.shape[0] + 1.0 - ranks[pos]
+    return (ascending.sum(axis=0) - n1 * (n1 + 1) / 2.0) / (n1 * n0)
+
+def _spearman(ranks: np.ndarray, base: np.ndarray) -> np.ndarray:
+    rc = ranks - ranks.mean(axis=0)
+    bc = base - base.mean()
+    denom = np.sqrt((rc ** 2).sum(axis=0) * (bc ** 2).sum())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denom > 0, (bc @ rc) / np.where(denom > 0, denom, 1.0), np.nan)
+
+def _ranks(fm: FeatureMatrix, W: np.ndarray) -> np.ndarray:
+    return average_ranks(np.round(fm.X @ W.T, TIE_DECIMALS))
+
+def evaluate(
+    fm: FeatureMatrix,
+    W: np.ndarray,
+    base: np.ndarray,
+    y: Optional[np.ndarray] = None,
+    top_k: Optional[int] = None,
+) -> pd.DataFrame:
+    """Rank-stability metrics of each weight vector (rows of W) against `base`.
+
+    Vectors are scored in blocks, each one matrix product. Columns: spearman (rank
+    correlation with the base ranking), mean/max absolute rank change, top_k_overlap
+    (share of the base top-k still in the top-k) and auc when `y` is given.
+    """
+    n = len(fm.X)
+    top_k = top_k or max(1, n // 10)
+    base_ranks = _ranks(fm, base[None, :])[:, 0]
+    base_top = base_ranks <= top_k
+    labelled = None if y is None else ~pd.isna(y)
+    block = max(1, BLOCK_ELEMENTS // max(n, 1))
+    parts = []
+    for a in range(0, len(W), block):
+        ranks = _ranks(fm, W[a:a + block])
+        change = np.abs(ranks - base_ranks[:, None])
+        part = {
+            "spearman": _spearman(ranks, base_ranks),
+            "mean_abs_rank_change": change.mean(axis=0) if n else np.zeros(ranks.shape[1]),
+            "max_rank_change": change.max(axis=0) if n else np.zeros(ranks.shape[1]),
+            "top_k_overlap": (ranks[base_top] <= top_k).sum(axis=0) / max(int(base_top.sum()), 1),
+        }
+        if y is not None:
+            # rank only the labelled rows so AUC matches sklearn on that subset
+            sub = ranks if labelled.all() else _ranks(FeatureMatrix(fm.X[labelled], fm.feature_names, fm.index[labelled]), W[a:a + block])
+            part["auc"] = _auc_from_ranks(sub, np.asarray(y[labelled], dtype=int))
+        parts.append(pd.DataFrame(part))
+    cols = ["spearman", "mean_abs_rank_change", "max_rank_change", "top_k_overlap"] + (["auc"] if y is not None else [])
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=cols)
+
+def sensitivity(fm: FeatureMatrix, base: np.ndarray, delta: float = 0.1) -> pd.DataFrame:
+    """One-at-a-time sensitivity: each weight moved by +/- delta (relative; absolute when 0).
+    Features are ordered by how much the ranking moves (mean absolute rank change).
+    """
+    F = len(fm.feature_names)
+    step = np.where(base != 0.0, np.abs(base) * delta, delta)
+    W = np.repeat(base[None, :], 2 * F, axis=0)
+    W[np.arange(F), np.arange(F)] += step
+    W[F + np.arange(F), np.arange(F)] -= step
+    res = evaluate(fm, W, base)
+    out = pd.DataFrame({
+        "feature": fm.feature_names,
+        "weight": base,
+        "mean_abs_rank_change": (res["mean_abs_rank_change"].to_numpy()[:F] + res["mean_abs_rank_change"].to_numpy()[F:]) / 2,
+        "min_spearman": np.fmin(res["spearman"].to_numpy()[:F], res["spearman"].to_numpy()[F:]),
+        # spread of the feature's contribution to raw_score across patients
+        "contribution_std": (fm.X * base).std(axis=0) if len(fm.X) else np.zeros(F),
+    })
+    return out.sort_values("mean_abs_rank_change", ascending=False, kind="stable").reset_index(drop=True)
+
+def run_sweep(
+    fm: FeatureMatrix,
+    base_weights: Dict[str, float],
+    vectors: Sequence[Tuple[str, Dict[str, float]]],
+    y: Optional[np.ndarray] = None,
+    top_k: Optional[int] = None,
+    delta: float = 0.1,
+) -> Dict[str, Any]:
+    """Evaluate labelled weight vectors against `base_weights`; JSON-ready report."""
+    base = weight_matrix([base_weights], fm.feature_names)[0]
+    W = weight_matrix([v for _, v in vectors], fm.feature_names)
+    res = evaluate(fm, W, base, y, top_k)
+    res.insert(0, "label", [label for label, _ in vectors])
+    report: Dict[str, Any] = {
+        "n_samples": int(len(fm.X)),
+        "n_vectors": int(len(vectors)),
+        "top_k": int(top_k or max(1, len(fm.X) // 10)),
+        "feature_names": fm.feature_names,
+    }
+    if y is not None:
+        report["baseline_auc"] = float(evaluate(fm, base[None, :], base, y)["auc"].iloc[0])
+    report["vectors"] = [
+        {**{k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}, "weights": dict(zip(fm.feature_names, w.tolist()))}
+        for row, w in zip(res.to_dict(orient="records"), W)
+    ]
+    report["sensitivity"] = sensitivity(fm, base, delta).to_dict(orient="records")
+    return report
@@ -1,48 +1,78 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Any, List
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
-from ..registry import get_component
 from ..components.core import FeatureComponent
+from ..ml.featurize import compute_feature_frame
+from ..ml.feature_cache import FeatureCache
+from ..profiling import span
+from .plan import ScoringPlan, compile_plan
 
 @dataclass
 class WeightedScoreEngine:
     component_specs: List[Dict[str, Any]]  # [{"name": "...", "params": {...}}, ...]
     weights: Dict[str, float]             # {"infection_risk": 1.0, "genetic_protection": -1.5, ...}
     score_minmax: tuple[float, float] = (0.0, 100.0)
+    raw_range: Optional[tuple[float, float]] = None  # fixed raw_score range; None -> min-max over each batch
+    workers: Optional[int] = None                    # featurization processes; None -> $XENOSCORE_WORKERS or 1
+    feature_cache: Optional[FeatureCache] = None     # on-disk store of previously computed features
+    compact: bool = False                            # hold features as one float32 matrix
+    _plan: Optional[ScoringPlan] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def plan(self) -> ScoringPlan:
+        """Compiled once per engine: components whose features carry no weight are pruned."""
+        if self._plan is None:
+            self._plan = compile_plan(self.component_specs, self.weights)
+        return self._plan
 
     def _instantiate_components(self) -> List[FeatureComponent]:
-        comps: List[FeatureComponent] = []
-        for spec in self.component_specs:
-            cls = get_component(spec["name"])
-            comps.append(cls(params=spec.get("params", {})))
-        return comps
+        return list(self.plan.components)
 
-    def _compute_feature_row(self, row: Dict[str, Any], components: List[FeatureComponent]) -> Dict[str, float]:
-        feats: Dict[str, float] = {}
-        for comp in components:
-            feats.update(comp.compute(row))
-        return feats
+    def raw_scores(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feature columns plus the unscaled weighted sum `raw_score`."""
+        plan = self.plan
+        out = compute_feature_frame(df, list(plan.component_specs), self.workers, plan.components, self.feature_cache,
+                                    dtype=np.float32 if self.compact else None)
+        return self.add_raw_score(out)
 
-    def score_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        comps = self._instantiate_components()
-        rows = []
-        for _, row in df.iterrows():
-            feats = self._compute_feature_row(row.to_dict(), comps)
-            raw = 0.0
-            for k, v in feats.items():
+    def add_raw_score(self, out: pd.DataFrame) -> pd.DataFrame:
+        """Append `raw_score` to a frame of this plan's features and return it."""
+        with span("weighted_sum", len(out)):
+            # accumulate column by column, in feature order, like the row-wise sum
+            raw = np.zeros(len(out))
+            for k in out.columns:
                 w = self.weights.get(k, 0.0)
-                raw += w * v
-            rows.append({**feats, "raw_score": raw})
-        out = pd.DataFrame(rows, index=df.index)
-        # scale raw_score to [min,max] via min-max over batch for display
+                if w != 0.0:
+                    raw = raw + w * out[k].to_numpy(dtype=float)
+            out["raw_score"] = raw
+        return out
+
+    def scale(self, rs: pd.Series) -> pd.Series:
+        """Map raw_score onto `score_minmax` using `raw_range`, or the batch min/max when unset."""
+        values = rs.to_numpy(dtype=float)
+        if self.raw_range is not None:
+            lo, hi = self.raw_range
+        elif np.isnan(values).all():
+            lo = hi = np.nan  # nothing to scale against: every row gets the midpoint
+        else:
+            # NaN rows are skipped, as pandas min()/max() did
+            lo, hi = np.nanmin(values), np.nanmax(values)
+        smin, smax = self.score_minmax
+        if hi > lo:
+            scaled = smin + (values - lo) * (smax - smin) / (hi - lo)
+            if self.raw_range is not None:
+                scaled = np.clip(scaled, smin, smax)
+        else:
+            scaled = np.full(len(values), smin + 0.5 * (smax - smin))
+        return pd.Series(scaled, index=rs.index, name="risk_score")
+
+    def score_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        out = self.raw_scores(df)
+        # scale raw_score to [min,max] via min-max over batch (or the fixed raw_range) for display
         if len(out) > 0:
-            rs = out["raw_score"]
-            lo, hi = rs.min(), rs.max()
-            if hi > lo:
-                out["risk_score"] = self.score_minmax[0] + (rs - lo) * (self.score_minmax[1] - self.score_minmax[0]) / (hi - lo)
-            else:
-                out["risk_score"] = self.score_minmax[0] + 0.5 * (self.score_minmax[1] - self.score_minmax[0])
+            out["risk_score"] = self.scale(out["raw_score"])
         else:
             out["risk_score"] = []
         return out
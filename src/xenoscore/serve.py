@@ -0,0 +1,301 @@
+"""
+Local HTTP/JSON scoring service with warm engines and request micro-batching.
+"""
+from __future__ import annotations
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .components.core import FeatureComponent
+from .data.validation import validate_dataframe, validate_record, VALIDATION_MODES
+from .scoring.engine import ScoreEngine, predict
+from .scoring.linear import load_model
+from .scoring.model import ModelScoreEngine
+from .scoring.weighted import WeightedScoreEngine
+
+class LatencyStats:
+    """Thread-safe request counters plus a rolling window of latencies (seconds)."""
+    def __init__(self, window: int = 4096):
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self.count += 1
+            self.errors += 0 if ok else 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = np.array(self._latencies) * 1000.0
+            count, errors = self.count, self.errors
+        out: Dict[str, Any] = {"count": count, "errors": errors}
+        if len(lat):
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            out.update(mean_ms=float(lat.mean()), p50_ms=float(p50), p95_ms=float(p95), p99_ms=float(p99), max_ms=float(lat.max()))
+        return out
+
+class MicroBatcher:
+    """Collects concurrently submitted items and hands them to `fn` as one list.
+
+    A single background thread takes everything already queued (up to `max_batch`),
+    optionally waiting `max_wait` seconds for more, so a lone request is never held
+    back while bursts are scored together.
+    """
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch: int = 256, max_wait: float = 0.0):
+        self._fn = fn
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.max_size = 0
+        self._thread = threading.Thread(target=self._run, name="xenoscore-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"batches": self.batches, "mean_size": self.items / self.batches if self.batches else 0.0, "max_size": self.max_size}
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self._max_wait
+            while len(batch) < self._max_batch:
+                try:
+                    timeout = deadline - time.perf_counter()
+                    nxt = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.put(None)
+                    break
+                batch.append(nxt)
+            items, futures = [b[0] for b in batch], [b[1] for b in batch]
+            self.batches += 1
+            self.items += len(batch)
+            self.max_size = max(self.max_size, len(batch))
+            try:
+                results = self._fn(items)
+            except Exception as e:  # propagate to every waiting request
+                for fut in futures:
+                    fut.set_exception(e)
+            else:
+                for fut, res in zip(futures, results):
+                    fut.set_result(res)
+
+FAST_PATH_ROWS = 8  # batches up to this size are scored record by record, without a DataFrame
+
+def _json_value(value: float) -> Optional[float]:
+    # JSON has no NaN/Infinity: non-finite scores go out as null
+    return value if np.isfinite(value) else None
+
+class ScoringService:
+    """Holds a warm engine; scores records (dicts keyed by Sample fields) singly or in batches.
+
+    Small batches (typically one request) skip the DataFrame pipeline: each record is
+    validated as a dict and featurized with the components' row-wise `compute`, which
+    gives the same values as the vectorized path at a fraction of its fixed cost.
+    """
+    def __init__(self, engine: ScoreEngine, validation: str = "lenient", max_batch: int = 256, max_wait_ms: float = 0.0):
+        if validation not in VALIDATION_MODES:
+            raise ValueError(f"Unknown validation mode: {validation}")
+        self.engine = engine
+        self.validation = validation
+        self.metrics: Dict[str, LatencyStats] = {}
+        self._metrics_lock = threading.Lock()
+        self._columns = self._warm_up()
+        self._batcher = MicroBatcher(self._score_single_batch, max_batch=max_batch, max_wait=max_wait_ms / 1000.0)
+
+    def _warm_up(self) -> Tuple[str, ...]:
+        """Load model/plan once; weighted engines need a fixed scaling range so results never depend on batch mates."""
+        eng = self.engine
+        if isinstance(eng, ModelScoreEngine):
+            plan = eng.plan_for(load_model(eng.model_path))
+        else:
+            plan = eng.plan
+            if eng.raw_range is None:
+                # batch min-max would tie a sample's risk_score to its batch mates and differ from `score`
+                raise ValueError("serve needs raw_score_range: [lo, hi] in the weights YAML so risk_score "
+                                 "is batch-independent and matches `xenoscore score`.")
+        columns = plan.input_columns
+        # row-wise scoring needs `compute` on every component and float64, validated rows
+        row_wise = self.validation != "off" and not eng.compact and \
+            all(type(c).compute is not FeatureComponent.compute for c in plan.components)
+        self._row_components = plan.components if row_wise else None
+        self._empty_row = dict.fromkeys(columns)
+        predict(eng, self._frame([{}], columns))
+        return columns
+
+    @staticmethod
+    def _frame(records: List[Dict[str, Any]], columns: Tuple[str, ...]) -> pd.DataFrame:
+        # object columns keep None as "missing" without per-batch type inference,
+        # and every input column is present, so a row scores the same in any batch
+        names = list(dict.fromkeys([*columns, *(k for r in records for k in r)]))
+        data = {}
+        for name in names:
+            col = np.empty(len(records), dtype=object)
+            col[:] = [r.get(name) for r in records]
+            data[name] = col
+        return pd.DataFrame(data, index=pd.RangeIndex(len(records)))
+
+    def score_records(self, records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], list]:
+        """Score a batch; returns per-record prediction dicts and (position, message) errors."""
+        if self._row_components is not None and len(records) <= FAST_PATH_ROWS:
+            return self._score_rows(records)
+        df = self._frame(records, self._columns)
+        df, errors = validate_dataframe(df, mode="lenient" if self.validation == "strict" else self.validation)
+        preds = predict(self.engine, df)
+        preds = preds.astype(object).where(np.isfinite(preds.to_numpy(dtype=float)), None)
+        return preds.to_dict(orient="records"), errors
+
+    def _score_rows(self, records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], list]:
+        """`score_records` for a few records: dict validation and row-wise `compute`."""
+        features, errors = [], []
+        for i, record in enumerate(records):
+            # every input column is present, as in `_frame`
+            row, error = validate_record({**self._empty_row, **record})
+            if error:
+                errors.append((i, error))
+            feats: Dict[str, float] = {}
+            for comp in self._row_components:
+                feats.update(comp.compute(row))
+            features.append(feats)
+        eng = self.engine
+        if isinstance(eng, ModelScoreEngine):
+            preds = eng.predict_features(pd.DataFrame(features, index=pd.RangeIndex(len(features))))
+            return [{k: _json_value(float(v)) for k, v in p.items()} for p in preds.to_dict(orient="records")], errors
+        raws = []
+        for feats in features:
+            # same order and arithmetic as WeightedScoreEngine.add_raw_score
+            raw = 0.0
+            for k, v in feats.items():
+                w = eng.weights.get(k, 0.0)
+                if w != 0.0:
+                    raw = raw + w * float(v)
+            raws.append(raw)
+        scaled = eng.scale(pd.Series(raws, dtype=float)).tolist()
+        out = [{**{k: _json_value(float(v)) for k, v in feats.items()}, "raw_score": _json_value(raw), "risk_score": _json_value(risk)}
+               for feats, raw, risk in zip(features, raws, scaled)]
+        return out, errors
+
+    def _score_single_batch(self, records: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[str]]]:
+        preds, errors = self.score_records(records)
+        by_row: Dict[int, List[str]] = {}
+        for pos, msg in errors:
+            by_row.setdefault(int(pos), []).append(msg)
+        return [(p, by_row.get(i, [])) for i, p in enumerate(preds)]
+
+    def score_one(self, record: Dict[str, Any], timeout: Optional[float] = 30.0) -> Tuple[Dict[str, Any], List[str]]:
+        """Score one record through the micro-batcher (concurrent callers share a batch)."""
+        return self._batcher.submit(record).result(timeout=timeout)
+
+    def stats(self, endpoint: str) -> LatencyStats:
+        with self._metrics_lock:
+            return self.metrics.setdefault(endpoint, LatencyStats())
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            endpoints = dict(self.metrics)
+        return {
+            "endpoints": {k: v.snapshot() for k, v in endpoints.items()},
+            "micro_batches": self._batcher.snapshot(),
+        }
+
+    def close(self) -> None:
+        self._batcher.close()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: no TCP set-up per request
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls
+    service: ScoringService
+
+    def log_message(self, format: str, *args: Any) -> None:  # quiet; latency goes to /metrics
+        pass
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        start = time.perf_counter()
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send(200, self.service.metrics_snapshot())
+        else:
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        self.service.stats(f"GET {self.path}").record(time.perf_counter() - start)
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        if self.path != "/score":
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        status = 200
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            if isinstance(payload, dict) and isinstance(payload.get("samples"), list):
+                payload = payload["samples"]
+            if isinstance(payload, dict):
+                status, body = self._score_one(payload)
+            elif isinstance(payload, list) and all(isinstance(r, dict) for r in payload):
+                status, body = self._score_batch(payload)
+            else:
+                status, body = 400, {"error": "Expected a sample object, a list of samples or {\"samples\": [...]}"}
+        except json.JSONDecodeError as e:
+            status, body = 400, {"error": f"Invalid JSON: {e}"}
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+        self._send(status, body)
+        self.service.stats("POST /score").record(time.perf_counter() - start, ok=status == 200)
+
+    def _score_one(self, record: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        pred, errors = self.service.score_one(record)
+        if errors and self.service.validation == "strict":
+            return 422, {"error": "Validation failed", "validation_errors": errors}
+        body: Dict[str, Any] = {"prediction": pred}
+        if errors:
+            body["validation_errors"] = errors
+        return 200, body
+
+    def _score_batch(self, records: List[Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+        preds, errors = self.service.score_records(records)
+        errs = [{"index": int(i), "message": m} for i, m in errors]
+        if errs and self.service.validation == "strict":
+            return 422, {"error": "Validation failed", "validation_errors": errs}
+        body: Dict[str, Any] = {"predictions": preds}
+        if errs:
+            body["validation_errors"] = errs
+        return 200, body
+
+def make_server(service: ScoringService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server bound to `service`; call `serve_forever()` to run it."""
+    handler = type("XenoScoreHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,282 @@
+"""
+Watched-directory batch scoring with warm engines.
+
+An asyncio loop polls an inbox for CSV/Parquet files. A file is claimed by moving it
+into `<inbox>/.processing`, read and written on an I/O thread pool and scored on a
+worker pool whose workers build the engine once. At most `max_in_flight` files are
+claimed at a time; the rest stay in the inbox. Finished inputs are moved into the done
+(or failed) directory next to a `<name>.json` sidecar with row counts, validation
+errors and timings; predictions go to the output directory.
+
+Restarts: files left in `.processing` are picked up again, and the content digests of
+all done sidecars form a ledger, so a file already scored (including one whose sidecar
+was written just before an interruption) is moved to done without being rescored.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+import pandas as pd
+
+INPUT_SUFFIXES = (".csv", ".parquet")
+PROCESSING_DIR = ".processing"
+SIDECAR_SUFFIX = ".json"
+
+# --- scoring workers: one warm engine per worker process (or the single scoring thread)
+
+_ENGINE: Any = None
+_VALIDATION = "lenient"
+
+def _init_worker(config: str, weights: Optional[str], model: Optional[str], validation: str) -> None:
+    global _ENGINE, _VALIDATION
+    from .scoring.engine import build_engine
+    from .scoring.linear import load_model
+    from .scoring.model import ModelScoreEngine
+    _ENGINE = build_engine(config, weights, model)
+    _VALIDATION = validation
+    # compile the plan / load the model now rather than on the first file
+    _ENGINE.plan_for(load_model(_ENGINE.model_path)) if isinstance(_ENGINE, ModelScoreEngine) else _ENGINE.plan
+
+def _ready() -> bool:
+    return _ENGINE is not None
+
+def _score(df: pd.DataFrame, keys: Sequence[str]) -> Tuple[pd.DataFrame, pd.DataFrame, list, int]:
+    """(input or key columns, predictions, first validation errors, error count)."""
+    from .data.validation import SchemaValidationError, validate_dataframe
+    from .scoring.engine import predict
+    try:
+        df, errors = validate_dataframe(df, mode=_VALIDATION)
+    except SchemaValidationError as e:  # re-raised as a plain error so it crosses process boundaries
+        raise ValueError(f"Validation failed for {len(e.errors)} rows (strict mode); first: {e.errors[0][1]}")
+    return (df[list(keys)] if keys else df), predict(_ENGINE, df), errors[:5], len(errors)
+
+# --- file handling (I/O threads)
+
+def _digest(path: Path, block: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _read_input(path: Path) -> pd.DataFrame:
+    from .data.io import read_any
+    return read_any(path)
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_text(json.dumps(payload, indent=2, default=str))
+    os.replace(tmp, path)
+
+def _write_output(path: Path, *parts: pd.DataFrame) -> None:
+    from .data.io import TableWriter
+    with TableWriter(path) as writer:
+        writer.write(*parts)
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+@dataclass
+class WatchDirs:
+    inbox: Path
+    done: Path
+    failed: Path
+    out: Path
+
+    @classmethod
+    def under(cls, inbox: str | Path, done: Optional[str] = None, failed: Optional[str] = None,
+              out: Optional[str] = None) -> "WatchDirs":
+        """Defaults: `done/`, `failed/` and `scored/` inside the inbox (not watched themselves)."""
+        root = Path(inbox)
+        return cls(root, Path(done) if done else root / "done", Path(failed) if failed else root / "failed",
+                   Path(out) if out else root / "scored")
+
+    @property
+    def processing(self) -> Path:
+        return self.inbox / PROCESSING_DIR
+
+@dataclass
+class Watcher:
+    """Scores files dropped into `dirs.inbox` until stopped (or once, with `run(once=True)`)."""
+    dirs: WatchDirs
+    engine_args: Tuple[str, Optional[str], Optional[str]]  # (component config, weights, model)
+    validation: str = "lenient"
+    workers: int = 1                   # scoring processes; 1 scores on a thread of this process
+    max_in_flight: int = 4             # files claimed from the inbox at once
+    io_threads: int = 4
+    poll: float = 1.0                  # seconds between inbox scans
+    settle: float = 2.0                # a file is picked up once unmodified for this long
+    out_format: Optional[str] = None   # output extension (e.g. ".parquet"); None keeps the input's
+    id_columns: Sequence[str] = ()     # write only these columns plus the predictions
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    counts: Dict[str, int] = field(default_factory=lambda: {"done": 0, "failed": 0, "duplicate": 0, "rows": 0})
+    _ledger: Dict[str, Dict[str, Any]] = field(default_factory=dict, init=False, repr=False)
+    _active: Set[str] = field(default_factory=set, init=False, repr=False)
+    _io: Optional[Executor] = field(default=None, init=False, repr=False)
+    _pool: Optional[Executor] = field(default=None, init=False, repr=False)
+
+    def start(self) -> None:
+        """Create the directories, load the ledger and warm the scoring workers."""
+        d = self.dirs
+        for p in (d.inbox, d.done, d.failed, d.out, d.processing):
+            p.mkdir(parents=True, exist_ok=True)
+        for sidecar in d.done.glob("*" + SIDECAR_SUFFIX):
+            try:
+                record = json.loads(sidecar.read_text())
+            except (OSError, ValueError):
+                continue
+            if record.get("digest"):
+                self._ledger.setdefault(record["digest"], record)
+        init = (_init_worker, (*self.engine_args, self.validation))
+        self._io = ThreadPoolExecutor(self.io_threads, thread_name_prefix="xenoscore-io")
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=init[0], initargs=init[1])
+        else:
+            self._pool = ThreadPoolExecutor(1, thread_name_prefix="xenoscore-score", initializer=init[0], initargs=init[1])
+        # a broken config or model fails here rather than on the first file
+        self._pool.submit(_ready).result()
+
+    def close(self) -> None:
+        for ex in (self._pool, self._io):
+            if ex is not None:
+                ex.shutdown(wait=True)
+        self._pool = self._io = None
+
+    def _candidates(self, settle: float) -> List[Path]:
+        """Leftovers of an interrupted run first, then settled inbox files, oldest first."""
+        d = self.dirs
+        leftovers = sorted(p for p in d.processing.iterdir() if p.name not in self._active and self._is_input(p))
+        now = time.time()
+        ready = []
+        for p in d.inbox.iterdir():
+            if not self._is_input(p) or p.name in self._active:
+                continue
+            try:
+                mtime = p.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - mtime >= settle:
+                ready.append((mtime, p))
+        return leftovers + [p for _, p in sorted(ready)]
+
+    @staticmethod
+    def _is_input(p: Path) -> bool:
+        return p.is_file() and not p.name.startswith(".") and p.suffix.lower() in INPUT_SUFFIXES
+
+    def _claim(self, path: Path) -> Optional[Path]:
+        if path.parent == self.dirs.processing:
+            return path
+        target = self.dirs.processing / path.name
+        if target.exists():  # a file of the same name is still in flight
+            return None
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            return None
+        return target
+
+    def _stored_name(self, name: str, digest: str) -> str:
+        """`name`, or `<stem>-<digest>` when done/failed already hold a file of that name."""
+        d = self.dirs
+        if not any((p / name).exists() or (p / (name + SIDECAR_SUFFIX)).exists() for p in (d.done, d.failed)):
+            return name
+        stem, suffix = os.path.splitext(name)
+        return f"{stem}-{digest[:8]}{suffix}"
+
+    def _finish(self, path: Path, record: Dict[str, Any]) -> None:
+        dest = self.dirs.failed if record["status"] == "failed" else self.dirs.done
+        # sidecar first: once it exists the ledger knows the file, even if the move is interrupted
+        _write_json(dest / (record["stored_as"] + SIDECAR_SUFFIX), record)
+        os.replace(path, dest / record["stored_as"])
+
+    async def _process(self, path: Path) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        record: Dict[str, Any] = {"file": path.name, "started": _now()}
+        timing: Dict[str, float] = {}
+        try:
+            record["digest"] = digest = await loop.run_in_executor(self._io, _digest, path)
+            previous = self._ledger.get(digest)
+            if previous is not None:
+                if previous["file"] == path.name and not (self.dirs.done / previous["stored_as"]).exists():
+                    # interrupted after its sidecar was written: only the move is left
+                    await loop.run_in_executor(self._io, os.replace, path, self.dirs.done / previous["stored_as"])
+                    return previous
+                record.update(status="duplicate", duplicate_of=previous["stored_as"], rows=previous.get("rows"))
+                record["stored_as"] = self._stored_name(path.name, digest)
+            else:
+                record["stored_as"] = self._stored_name(path.name, digest)
+                df = await loop.run_in_executor(self._io, _read_input, path)
+                timing["read_s"] = time.perf_counter() - start
+                t = time.perf_counter()
+                keys, preds, errors, n_errors = await loop.run_in_executor(self._pool, _score, df, tuple(self.id_columns))
+                timing["score_s"] = time.perf_counter() - t
+                stem, suffix = os.path.splitext(record["stored_as"])
+                out = self.dirs.out / f"{stem}.predictions{self.out_format or suffix}"
+                t = time.perf_counter()
+                await loop.run_in_executor(self._io, _write_output, out, keys, preds)
+                timing["write_s"] = time.perf_counter() - t
+                record.update(status="done", rows=len(preds), validation_errors=n_errors,
+                              validation_examples=[[str(i), m] for i, m in errors], output=str(out))
+        except Exception as e:
+            record.update(status="failed", error=f"{type(e).__name__}: {e}")
+            record.setdefault("stored_as", self._stored_name(path.name, record.get("digest") or uuid.uuid4().hex))
+        timing["total_s"] = time.perf_counter() - start
+        record.update(finished=_now(), timing={k: round(v, 6) for k, v in timing.items()})
+        try:
+            await loop.run_in_executor(self._io, self._finish, path, record)
+        except OSError as e:  # left in .processing; retried on the next start
+            record.update(status="failed", error=f"{type(e).__name__}: {e}")
+            return record
+        if record["status"] == "done":
+            self._ledger[record["digest"]] = record
+            self.counts["rows"] += record["rows"]
+        self.counts[record["status"]] += 1
+        return record
+
+    async def run(self, once: bool = False, stop: Optional[asyncio.Event] = None) -> Dict[str, int]:
+        """Score files as they arrive until `stop` is set; with `once`, score what is
+        there now (settled or not) and return. Returns the per-status file counts."""
+        stop = stop or asyncio.Event()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks: Set[asyncio.Task] = set()
+
+        def done(task: asyncio.Task, name: str) -> None:
+            tasks.discard(task)
+            self._active.discard(name)
+            slots.release()
+            if self.on_result is not None and not task.cancelled() and task.exception() is None:
+                self.on_result(task.result())
+
+        while not stop.is_set():
+            found = await asyncio.get_running_loop().run_in_executor(self._io, self._candidates, 0.0 if once else self.settle)
+            for path in found:
+                await slots.acquire()
+                if stop.is_set():
+                    slots.release()
+                    break
+                claimed = self._claim(path)
+                if claimed is None:
+                    slots.release()
+                    continue
+                self._active.add(claimed.name)
+                task = asyncio.ensure_future(self._process(claimed))
+                tasks.add(task)
+                task.add_done_callback(lambda t, n=claimed.name: done(t, n))
+            if once and not found and not tasks:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), 0.05 if once else self.poll)
+            except asyncio.TimeoutError:
+                pass
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return dict(self.counts)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from xenoscore.data.longitudinal import LAB_FIELDS, merge_labs, window_aggregates
+from xenoscore.data.validation import validate_dataframe
+from xenoscore.scoring.census import CensusState
+from xenoscore.scoring.engine import build_engine, predict
+
+CONFIG = "configs/default_components.yaml"
+WEIGHTS = "configs/weights.example.yaml"
+
+def _census(n=40):
+    base = pd.read_csv("examples/example_dataset.csv").drop(columns="outcome")
+    df = pd.concat([base] * (n // len(base)), ignore_index=True)
+    df.insert(0, "patient_id", [f"P{i}" for i in range(len(df))])
+    return df
+
+def _draws(ids, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = [pd.DataFrame({"patient_id": ids, "analyte": a, "pod": pod, "value": rng.uniform(5, 300, len(ids))})
+              for a in LAB_FIELDS for pod in (-2, 0, 0.5, 1, 2, 3, 4)]
+    return pd.concat(frames, ignore_index=True).sample(frac=0.7, random_state=seed)
+
+def test_window_aggregates_match_per_patient_loops():
+    labs = _draws([f"P{i}" for i in range(30)])
+    aggs = window_aggregates(labs)
+    for (pid, analyte), g in labs.groupby(["patient_id", "analyte"]):
+        g = g.sort_values("pod", kind="stable")
+        pre, post = g[g.pod <= 0], g[(g.pod > 0) & (g.pod <= 3)]
+        row = aggs.loc[pid]
+        base = pre.value.iloc[-1] if len(pre) else np.nan
+        np.testing.assert_equal(row[f"{analyte}_baseline"], base)
+        np.testing.assert_equal(row[f"{analyte}_peak"], post.value.max() if len(post) else np.nan)
+        np.testing.assert_equal(row[f"{analyte}_nadir"], post.value.min() if len(post) else np.nan)
+        np.testing.assert_equal(row[f"{analyte}_first"], post.value.iloc[0] if len(post) else np.nan)
+        rise = max(post.value.max() - base, 0.0) if len(post) and len(pre) else np.nan
+        np.testing.assert_allclose(row[f"{analyte}_rise"], rise)
+    # the immunology fields are filled from the windows; other wide values are kept
+    df = _census()
+    merged = merge_labs(df, aggs, "patient_id")
+    p0 = aggs.loc["P0"]
+    assert merged.loc[0, "pod3_IgG"] == p0["IgG_peak"] and merged.loc[0, "pod3_C3"] == p0["C3_nadir"]
+    assert merged.loc[35, "sC5b9"] == df.loc[35, "sC5b9"]  # no draws for P35
+
+def test_census_update_rescores_only_affected_patients(tmp_path):
+    df = _census()
+    eng = build_engine(CONFIG, WEIGHTS)
+    labs = _draws(df.patient_id.iloc[:30].tolist())
+    first = CensusState(tmp_path).update(eng, df, labs, "patient_id")
+    assert len(first.rescored) == len(df) and first.new_draws == len(labs)
+
+    new = pd.DataFrame({"patient_id": ["P3", "P3", "P31"], "analyte": ["IgG", "C3", "sC5b9"],
+                        "pod": [2.5, 1, 2], "value": [900.0, 1.0, 800.0]})
+    df.loc[7, "egfr"] = 12
+    again = pd.concat([labs.head(10), new])  # already seen draws are ignored
+    update = CensusState(tmp_path).update(eng, df, again, "patient_id")
+    assert sorted(update.rescored) == ["P3", "P31", "P7"] and update.new_draws == 3
+
+    full, _ = validate_dataframe(merge_labs(df, window_aggregates(pd.concat([labs, new])), "patient_id"))
+    expected = predict(eng, full)
+    pd.testing.assert_frame_equal(update.predictions.drop(columns="patient_id"), expected.reset_index(drop=True),
+                                  check_dtype=False)
+
+    # nothing new -> nothing recomputed; another engine -> everything
+    assert CensusState(tmp_path).update(eng, df, new, "patient_id").rescored == []
+    other = build_engine(CONFIG, WEIGHTS)
+    other.weights = {**other.weights, "infection_risk": 3.0}
+    assert len(CensusState(tmp_path).update(other, df, new.head(0), "patient_id").rescored) == len(df)
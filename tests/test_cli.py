@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+def test_help_and_version_do_not_import_the_ml_stack():
+    code = (
+        "import sys\n"
+        "from xenoscore.cli import app\n"
+        "for args in (['--version'], ['--help'], ['score', '--help']):\n"
+        "    try:\n"
+        "        app(args)\n"
+        "    except SystemExit as e:\n"
+        "        assert not e.code, e.code\n"
+        "heavy = [m for m in ('pandas', 'sklearn', 'scipy', 'joblib', 'pydantic') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert out.startswith("xenoscore ")
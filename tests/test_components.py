@@ -0,0 +1,108 @@
+import sys
+import numpy as np
+import pandas as pd
+import xenoscore.components  # noqa: F401  (registers built-ins)
+from xenoscore.registry import COMPONENT_REGISTRY
+from xenoscore.components.core import FeatureComponent, compute_features, piecewise_linear, piecewise_linear_array
+
+def _messy_frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv("examples/example_dataset.csv").sample(n, replace=True, random_state=seed).reset_index(drop=True)
+    for col in df.columns:
+        if df[col].dtype.kind in "if":
+            df[col] = df[col] * rng.uniform(0, 2, n)
+        mask = rng.random(n) < 0.15
+        df[col] = df[col].astype(object)
+        df.loc[mask, col] = rng.choice([None, np.nan], mask.sum())
+    df.loc[rng.random(n) < 0.1, "pod3_C3"] = 0
+    df.loc[rng.random(n) < 0.1, "infection_status"] = "Recent"
+    return df.drop(columns=["lvef", "donor_weight_kg"])
+
+def test_compute_batch_matches_rowwise_compute():
+    df = _messy_frame()
+    rows = df.to_dict(orient="records")
+    for name, cls in COMPONENT_REGISTRY.items():
+        comp = cls()
+        expected = pd.DataFrame([comp.compute(r) for r in rows], index=df.index)
+        got = comp.compute_batch(df)
+        pd.testing.assert_frame_equal(got, expected, check_exact=True, obj=name)
+
+def test_piecewise_linear_array_matches_scalar():
+    pts = [(50, 0.0), (30, 0.2), (80, 0.2), (120, 0.6)]
+    x = np.concatenate([np.linspace(0, 150, 301), [np.nan, 30, 50, 80, 120]])
+    expected = np.array([piecewise_linear(v, pts) for v in x])
+    np.testing.assert_array_equal(piecewise_linear_array(x, pts), expected)
+
+def test_compute_features_falls_back_to_rowwise_compute():
+    class Custom(FeatureComponent):
+        def compute(self, row):
+            return {"custom": float(row["egfr"]) * 2}
+
+    df = pd.DataFrame({"egfr": [10.0, 20.0]}, index=[5, 7])
+    out = compute_features(df, [Custom()])
+    assert list(out.index) == [5, 7]
+    assert out["custom"].tolist() == [20.0, 40.0]
+
+def test_featurize_with_workers_matches_serial(monkeypatch):
+    from xenoscore.ml import featurize as fz
+    monkeypatch.setattr(fz, "MIN_SHARD_ROWS", 50)
+    df = _messy_frame(n=300, seed=1)
+    specs = [{"name": n} for n in COMPONENT_REGISTRY]
+    serial = fz.featurize(df, specs, workers=1)
+    parallel = fz.featurize(df, specs, workers=3)
+    pd.testing.assert_frame_equal(parallel, serial, check_exact=True)
+
+def test_entry_point_components_load_on_first_use(tmp_path, monkeypatch):
+    from xenoscore import registry
+    (tmp_path / "xs_plugin.py").write_text(
+        "from xenoscore.components.core import FeatureComponent\n"
+        "class Lactate(FeatureComponent):\n"
+        "    columns = ('lactate',)\n"
+        "    features = ('lactate_risk',)\n"
+        "    def compute(self, row):\n"
+        "        return {'lactate_risk': min(1.0, (row.get('lactate') or 0.0) / 4.0)}\n")
+    dist = tmp_path / "xs_plugin-1.0.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text("Metadata-Version: 2.1\nName: xs-plugin\nVersion: 1.0\n")
+    (dist / "entry_points.txt").write_text("[xenoscore.components]\nLactate = xs_plugin:Lactate\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry.refresh_entry_points()
+    try:
+        assert "Lactate" in registry.available_components() and "xs_plugin" not in sys.modules
+        cls = registry.get_component("Lactate")
+        assert cls.__component_name__ == "Lactate" and COMPONENT_REGISTRY["Lactate"] is cls
+        out = compute_features(pd.DataFrame({"lactate": [2.0, 8.0]}), [cls()])
+        assert out["lactate_risk"].tolist() == [0.5, 1.0]
+    finally:
+        COMPONENT_REGISTRY.pop("Lactate", None)
+        sys.modules.pop("xs_plugin", None)
+        registry.refresh_entry_points()
+
+def test_spawned_workers_import_user_registered_components(tmp_path, monkeypatch):
+    import functools
+    import multiprocessing
+    import pytest
+    from xenoscore.ml import featurize as fz
+    (tmp_path / "xs_user_components.py").write_text(
+        "from xenoscore.components.core import FeatureComponent\n"
+        "from xenoscore.registry import register_component\n"
+        "@register_component('DoubleEgfr')\n"
+        "class DoubleEgfr(FeatureComponent):\n"
+        "    def compute(self, row):\n"
+        "        return {'double_egfr': 2.0 * (row.get('egfr') or 0.0)}\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(fz, "MIN_SHARD_ROWS", 10)
+    monkeypatch.setattr(fz, "ProcessPoolExecutor",
+                        functools.partial(fz.ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")))
+    import xs_user_components  # noqa: F401
+    try:
+        df = pd.DataFrame({"egfr": np.arange(40.0)})
+        out = fz.compute_feature_frame(df, [{"name": "DoubleEgfr"}], workers=2)
+        assert out["double_egfr"].tolist() == (2.0 * np.arange(40.0)).tolist()
+        monkeypatch.setenv(fz.WORKERS_ENV, "two")
+        with pytest.raises(ValueError, match="XENOSCORE_WORKERS must be an integer"):
+            fz.resolve_workers()
+    finally:
+        fz.shutdown_pools()
+        COMPONENT_REGISTRY.pop("DoubleEgfr", None)
+        sys.modules.pop("xs_user_components", None)
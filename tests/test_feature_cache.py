@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import xenoscore.components  # noqa: F401  (registers built-ins)
+from xenoscore.components.core import FeatureComponent
+from xenoscore.ml.feature_cache import FeatureCache
+from xenoscore.ml.featurize import compute_feature_frame
+from xenoscore.registry import COMPONENT_REGISTRY
+from test_components import _messy_frame
+
+class Counting(FeatureComponent):
+    columns = ("egfr",)
+    features = ("egfr_x2",)
+    calls = 0
+
+    def compute(self, row):
+        Counting.calls += 1
+        return {"egfr_x2": float(row.get("egfr") or 0.0) * 2}
+
+def test_cached_features_match_uncached_and_are_reused(tmp_path):
+    df = _messy_frame(n=200, seed=2)
+    specs = [{"name": n} for n in COMPONENT_REGISTRY]
+    expected = compute_feature_frame(df, specs)
+    cache = FeatureCache(tmp_path)
+    pd.testing.assert_frame_equal(compute_feature_frame(df, specs, cache=cache), expected, check_exact=True)
+    # a fresh instance reads the Parquet store back
+    cache = FeatureCache(tmp_path)
+    pd.testing.assert_frame_equal(compute_feature_frame(df, specs, cache=cache), expected, check_exact=True)
+    assert cache.misses == 0 and cache.hits == len(df) * len(specs)
+
+def test_only_changed_rows_are_recomputed(tmp_path):
+    df = pd.DataFrame({"egfr": np.arange(10.0), "lvef": 50.0})
+    spec, comp = {"name": "Counting"}, Counting()
+    cache = FeatureCache(tmp_path)
+    Counting.calls = 0
+    compute_feature_frame(df, [spec], components=[comp], cache=cache)
+    assert Counting.calls == 10
+    changed = df.assign(lvef=60.0)  # not an input of Counting
+    changed.loc[[2, 5], "egfr"] = 100.0  # two rows with identical new inputs
+    out = compute_feature_frame(changed, [spec], components=[comp], cache=cache)
+    assert Counting.calls == 11
+    assert out["egfr_x2"].tolist() == (changed["egfr"] * 2).tolist()
+    other = compute_feature_frame(df, [{"name": "Counting", "params": {"k": 1}}], components=[comp], cache=cache)
+    assert Counting.calls == 21 and other["egfr_x2"].tolist() == (df["egfr"] * 2).tolist()
+
+def test_least_recently_used_segments_are_evicted(tmp_path):
+    spec, comp = {"name": "Counting"}, Counting()
+    cache = FeatureCache(tmp_path, max_bytes=1)
+    compute_feature_frame(pd.DataFrame({"egfr": [1.0, 2.0]}), [spec], components=[comp], cache=cache)
+    assert cache.size_bytes() == 0
+    cache.max_bytes = 10**9
+    for i in range(3):
+        compute_feature_frame(pd.DataFrame({"egfr": [float(i)]}), [spec], components=[comp], cache=cache)
+    sizes = sorted(p.stat().st_size for p in tmp_path.glob("*/*.parquet"))
+    cache.max_bytes = sum(sizes) - 1
+    cache.evict()
+    assert len(list(tmp_path.glob("*/*.parquet"))) == 2
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xenoscore.data.io import TableWriter, output_format
+from xenoscore.data.validation import validate_dataframe
+
+def _read(path):
+    fmt = output_format(path)
+    if fmt.startswith("csv"):
+        return pd.read_csv(path)
+    return pd.read_parquet(path) if fmt == "parquet" else pd.read_feather(path)
+
+@pytest.mark.parametrize("name", ["o.csv", "o.csv.gz", "o.csv.bz2", "o.parquet", "o.feather"])
+def test_table_writer_round_trips_chunks(tmp_path, name):
+    df = pd.DataFrame({"mrn": np.arange(10), "egfr": np.linspace(10, 90, 10).astype(object),
+                       "infection_status": ["none", "active"] * 5, "dialysis": [True, False] * 5})
+    df.loc[3, "egfr"] = "abc"
+    df, errors = validate_dataframe(df)
+    assert len(errors) == 1
+    preds = pd.DataFrame({"risk_score": np.arange(10) / 10}, index=df.index)
+    with TableWriter(tmp_path / name) as w:
+        for a in range(0, 10, 4):
+            w.write(df.iloc[a:a + 4], preds.iloc[a:a + 4])
+    assert not list(tmp_path.glob("*.part"))
+    back = _read(tmp_path / name)
+    assert list(back.columns) == ["mrn", "egfr", "infection_status", "dialysis", "risk_score"]
+    np.testing.assert_allclose(back["risk_score"], preds["risk_score"])
+    assert list(back["infection_status"].astype(str)) == ["none", "active"] * 5
+    # CSV keeps the raw invalid cell; columnar formats hold a typed column with a null there
+    assert (str(back["egfr"][3]) == "abc") if name.startswith("o.csv") else pd.isna(back["egfr"][3])
+
+def test_table_writer_discards_partial_output_and_rejects_unknown_formats(tmp_path):
+    with pytest.raises(RuntimeError):
+        with TableWriter(tmp_path / "o.parquet") as w:
+            w.write(pd.DataFrame({"a": [1.0]}))
+            raise RuntimeError("scoring failed")
+    assert not list(tmp_path.iterdir())
+    with pytest.raises(ValueError):
+        output_format("o.xlsx")
+
+def test_compact_plan_reads_narrow_dtypes_and_scores_like_float64(tmp_path):
+    from xenoscore.components.core import compute_feature_matrix
+    from xenoscore.config import load_component_config, load_weights_config
+    from xenoscore.data.io import read_any
+    from xenoscore.scoring.weighted import WeightedScoreEngine
+    df = pd.read_csv("examples/example_dataset.csv")
+    df.to_parquet(tmp_path / "d.parquet")
+    for path in ("examples/example_dataset.csv", tmp_path / "d.parquet"):
+        small, _ = validate_dataframe(read_any(path, compact=True), compact=True)
+        assert small["egfr"].dtype == np.float32 and small["dialysis"].dtype == "boolean"
+        assert isinstance(small["infection_status"].dtype, pd.CategoricalDtype)
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    weights = load_weights_config("configs/weights.example.yaml")
+    full = WeightedScoreEngine(comp_cfg, weights).score_dataframe(validate_dataframe(df)[0])
+    compact = WeightedScoreEngine(comp_cfg, weights, compact=True)
+    X, names = compute_feature_matrix(small, compact._instantiate_components())
+    assert X.dtype == np.float32 and X.flags.f_contiguous and names == [c for c in full.columns if c not in ("raw_score", "risk_score")]
+    out = compact.score_dataframe(small)
+    assert list(out.columns) == list(full.columns)
+    np.testing.assert_allclose(out["risk_score"], full["risk_score"], rtol=1e-5, atol=1e-6)
+
+def test_chunked_score_keeps_drifting_id_column_stable(tmp_path):
+    from typer.testing import CliRunner
+    from xenoscore.cli import app
+    df = pd.read_csv("examples/example_dataset.csv").sample(12, replace=True, random_state=0).reset_index(drop=True)
+    df.insert(0, "mrn", [str(i) for i in range(11)] + ["A4"])  # numeric in the first chunks only
+    df.to_csv(tmp_path / "in.csv", index=False)
+    for name in ("o.parquet", "o.feather"):
+        res = CliRunner().invoke(app, ["score", "-i", str(tmp_path / "in.csv"), "-c", "configs/default_components.yaml",
+                                       "-w", "configs/weights.example.yaml", "-o", str(tmp_path / name),
+                                       "--chunksize", "5"], env={"COLUMNS": "300"})
+        assert res.exit_code == 0, res.output
+        assert _read(tmp_path / name)["mrn"].tolist() == df["mrn"].tolist()
+
+def test_typed_csv_reads_score_blank_flags_like_inferred_reads(tmp_path):
+    from xenoscore.config import load_component_config, load_weights_config
+    from xenoscore.data.io import iter_chunks, read_any
+    from xenoscore.scoring.weighted import WeightedScoreEngine
+    df = pd.read_csv("examples/example_dataset.csv").sample(12, replace=True, random_state=1).reset_index(drop=True)
+    for i, col in enumerate(["dialysis", "dsa_present", "donor_pcmv", "flow_cxm_positive", "hCD46"]):
+        df[col] = df[col].astype(object)
+        df.loc[[i, i + 5], col] = None  # blank cells
+    df.to_csv(tmp_path / "b.csv", index=False)
+    eng = WeightedScoreEngine(load_component_config("configs/default_components.yaml")["components"],
+                              load_weights_config("configs/weights.example.yaml"), raw_range=(-2.0, 12.0))
+    inferred = pd.read_csv(tmp_path / "b.csv")  # the original reader: object columns holding NaN
+    assert str(read_any(tmp_path / "b.csv")["dialysis"].dtype) == "boolean"
+    expected = eng.score_dataframe(inferred)
+    for mode in ("lenient", "off"):
+        for frame in (read_any(tmp_path / "b.csv"), pd.concat(iter_chunks(tmp_path / "b.csv", 5))):
+            pd.testing.assert_frame_equal(eng.score_dataframe(validate_dataframe(frame, mode)[0]), expected)
+
+def test_csv_chunks_keep_rows_aligned_across_multiline_fields_and_bad_cells(tmp_path):
+    from xenoscore.data.io import iter_chunks, read_any
+    df = pd.read_csv("examples/example_dataset.csv")
+    df = pd.concat([df] * 4, ignore_index=True)
+    df.insert(0, "note", [f"line {i}\nsecond line" for i in range(len(df))])  # quoted, spans two lines
+    df["egfr"] = df["egfr"].astype(object)
+    df.loc[4, "egfr"] = "abc"  # fails the typed parse of the second chunk
+    df.to_csv(tmp_path / "m.csv", index=False)
+    chunks = list(iter_chunks(tmp_path / "m.csv", 3))
+    assert str(chunks[0]["dialysis"].dtype) == "boolean"
+    got = pd.concat(chunks)
+    assert list(got.index) == list(range(len(df))) and list(got["note"]) == list(df["note"])
+    want = read_any(tmp_path / "m.csv")
+    pd.testing.assert_frame_equal(validate_dataframe(got)[0], validate_dataframe(want)[0], check_dtype=False)
@@ -0,0 +1,170 @@
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+from xenoscore.config import load_component_config
+from xenoscore.ml.train import train_logistic, TrainConfig
+from xenoscore.scoring.model import ModelScoreEngine, learn_weights_from_logistic
+from xenoscore.scoring.linear import LinearModel, load_model
+
+def _cohort(n=60, seed=0):
+    df = pd.read_csv("examples/example_dataset.csv").sample(n, replace=True, random_state=seed).reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    for col in ["egfr", "lvef", "sC5b9", "flow_cxm_mfi", "baseline_anti_pig_IgG"]:
+        df[col] = df[col] * rng.uniform(0.5, 1.5, n)
+    df["outcome"] = (rng.random(n) < 0.3 + 0.4 * df["outcome"]).astype(int)
+    return df
+
+def test_native_artifact_matches_joblib_pipeline(tmp_path):
+    df = _cohort()
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    res = train_logistic(df, "outcome", comp_cfg, TrainConfig(cv_folds=2), str(tmp_path / "m.joblib"), str(tmp_path / "m.npz"))
+    assert res["artifact_path"].endswith("m.npz")
+    pj = ModelScoreEngine(comp_cfg, str(tmp_path / "m.joblib")).predict_proba(df)["model_probability"]
+    pn = ModelScoreEngine(comp_cfg, str(tmp_path / "m.npz")).predict_proba(df)["model_probability"]
+    np.testing.assert_allclose(pn, pj, rtol=1e-12, atol=1e-12)
+    LinearModel.load(tmp_path / "m.npz").save(tmp_path / "m.json")
+    np.testing.assert_allclose(load_model(str(tmp_path / "m.json")).coef, load_model(str(tmp_path / "m.npz")).coef)
+    assert learn_weights_from_logistic(str(tmp_path / "m.npz"), res["feature_names"]) == \
+        learn_weights_from_logistic(str(tmp_path / "m.joblib"), res["feature_names"])
+
+def test_load_model_caches_until_file_changes(tmp_path):
+    path = tmp_path / "m.json"
+    LinearModel(("a",), np.ones(1), np.array([1.0]), 0.0).save(path)
+    first = load_model(str(path))
+    assert load_model(str(path)) is first
+    LinearModel(("a", "b"), np.ones(2), np.array([1.0, 2.0]), 0.5).save(path)
+    assert load_model(str(path)).feature_names == ("a", "b")
+
+def test_artifact_inference_does_not_import_sklearn(tmp_path):
+    LinearModel(("renal_risk",), np.ones(1), np.array([1.0]), 0.0).save(tmp_path / "m.npz")
+    code = (
+        "import sys, pandas as pd\n"
+        "from xenoscore.scoring.model import ModelScoreEngine\n"
+        f"ModelScoreEngine([{{'name': 'RenalFunction'}}], r'{tmp_path / 'm.npz'}').predict_proba(pd.DataFrame({{'egfr': [20.0]}}))\n"
+        "assert 'sklearn' not in sys.modules and 'joblib' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_search_ranks_every_candidate_and_refits_the_best(tmp_path):
+    import json
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.preprocessing import StandardScaler
+    from xenoscore.ml.featurize import featurize
+    from xenoscore.ml.train import SearchSpace, search_logistic
+    df = _cohort(n=120, seed=3)
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    space = SearchSpace(C=[1.0, 0.05, 0.3], penalties=["l1", "l2"], class_weights=[None, "balanced"], tol=1e-8)
+    cfg = TrainConfig(cv_folds=3)
+    res = search_logistic(df, "outcome", comp_cfg, space, cfg, str(tmp_path / "m.joblib"), str(tmp_path / "m.npz"),
+                          str(tmp_path / "board.json"), n_jobs=2)
+    board = json.loads((tmp_path / "board.json").read_text())["leaderboard"]
+    assert len(board) == res["n_candidates"] == 12
+    assert [r["rank"] for r in board] == list(range(1, 13))
+    assert board[0]["cv_auc_mean"] == max(r["cv_auc_mean"] for r in board) == res["cv_auc_mean"]
+    assert res["best_params"] == {k: board[0][k] for k in ("C", "penalty", "class_weight")}
+    # warm-started path scores match a cold fit of the same candidate
+    row = next(r for r in board if (r["C"], r["penalty"], r["class_weight"]) == (0.3, "l2", None))
+    X, y = featurize(df.drop(columns=["outcome"]), comp_cfg).to_numpy(), df["outcome"].to_numpy()
+    tr, te = next(StratifiedKFold(n_splits=3, shuffle=True, random_state=cfg.random_state).split(X, y))
+    sc = StandardScaler(with_mean=False).fit(X[tr])
+    clf = LogisticRegression(C=0.3, tol=1e-8, max_iter=5000).fit(sc.transform(X[tr]), y[tr])
+    assert abs(roc_auc_score(y[te], clf.decision_function(sc.transform(X[te]))) - row["fold_aucs"][0]) < 1e-6
+    assert isinstance(load_model(str(tmp_path / "m.npz")), LinearModel)
+
+def test_incremental_training_resumes_and_skips_known_files(tmp_path):
+    import pytest
+    from xenoscore.ml.incremental import IncrementalConfig, load_state, train_incremental
+    df = _cohort(n=150, seed=4)
+    df.iloc[:90].to_csv(tmp_path / "a.csv", index=False)
+    df.iloc[90:].to_parquet(tmp_path / "b.parquet")
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    cfg = IncrementalConfig(chunksize=40)
+    files = [str(tmp_path / "a.csv"), str(tmp_path / "b.parquet")]
+    once = train_incremental(files, "outcome", comp_cfg, str(tmp_path / "once.state"), cfg)
+    assert [c["rows"] for c in once["chunks"]] == [40, 40, 10, 40, 20]
+    assert once["chunks"][0].get("auc") is None and "log_loss" in once["chunks"][1]
+    train_incremental(files[:1], "outcome", comp_cfg, str(tmp_path / "split.state"), cfg)
+    with pytest.warns(UserWarning, match="already folded"):
+        res = train_incremental(files, "outcome", comp_cfg, str(tmp_path / "split.state"), cfg,
+                                str(tmp_path / "m.joblib"), str(tmp_path / "m.npz"))
+    assert res["n_new"] == 60 and res["n_seen"] == 150
+    a = load_state(tmp_path / "once.state")["pipeline"].named_steps["clf"].coef_
+    b = load_state(tmp_path / "split.state")["pipeline"].named_steps["clf"].coef_
+    np.testing.assert_allclose(a, b)
+    pj = ModelScoreEngine(comp_cfg, str(tmp_path / "m.joblib")).predict_proba(df)["model_probability"]
+    pn = ModelScoreEngine(comp_cfg, str(tmp_path / "m.npz")).predict_proba(df)["model_probability"]
+    np.testing.assert_allclose(pn, pj, rtol=1e-12)
+
+def test_bootstrap_intervals_are_reproducible_and_batched(tmp_path):
+    from xenoscore.ml.bootstrap import bootstrap_logistic
+    from xenoscore.ml.featurize import featurize
+    df = _cohort(120, seed=3)
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    cfg = TrainConfig(cv_folds=2, bootstrap=30)
+    res = train_logistic(df, "outcome", comp_cfg, cfg, str(tmp_path / "m.joblib"), None, str(tmp_path / "m.boot.npz"))
+    boot = res["bootstrap"]
+    assert boot["n_boot"] == 30 and boot["oob_auc_ci"][0] <= boot["oob_auc_mean"] <= boot["oob_auc_ci"][1]
+    X = featurize(df.drop(columns=["outcome"]), comp_cfg)
+    serial, oob = bootstrap_logistic(X.to_numpy(), df["outcome"].to_numpy(), list(X.columns), cfg, 30, cfg.random_state, n_jobs=1)
+    pooled, _ = bootstrap_logistic(X.to_numpy(), df["outcome"].to_numpy(), list(X.columns), cfg, 30, cfg.random_state, n_jobs=2)
+    np.testing.assert_array_equal(serial.coef, pooled.coef)
+    ens = load_model(str(tmp_path / "m.boot.npz"))
+    np.testing.assert_allclose(ens.coef, serial.coef)
+    out = ModelScoreEngine(comp_cfg, str(tmp_path / "m.joblib"), intervals=str(tmp_path / "m.boot.npz"), ci_level=0.9).predict_proba(df)
+    # reference: one logistic model at a time
+    logits = np.stack([X.to_numpy() @ c + b for c, b in zip(ens.coef, ens.intercept)], axis=1)
+    lo, hi = 1 / (1 + np.exp(-np.quantile(logits, [0.05, 0.95], axis=1)))
+    np.testing.assert_allclose(out["model_probability_lo"], lo, rtol=1e-10)
+    np.testing.assert_allclose(out["model_probability_hi"], hi, rtol=1e-10)
+    assert (out["model_probability_lo"] <= out["model_probability_hi"]).all()
+
+def test_config_missing_a_model_component_fails(tmp_path):
+    import pytest
+    from typer.testing import CliRunner
+    from xenoscore.cli import app
+    LinearModel(("renal_risk", "cardio_risk"), np.ones(2), np.array([1.0, 2.0]), 0.0).save(tmp_path / "m.npz")
+    (tmp_path / "c.yaml").write_text("components:\n  - name: RenalFunction\n")
+    eng = ModelScoreEngine(load_component_config(str(tmp_path / "c.yaml"))["components"], str(tmp_path / "m.npz"))
+    with pytest.raises(ValueError, match="cardio_risk"):
+        eng.predict_proba(pd.read_csv("examples/example_dataset.csv"))
+    res = CliRunner().invoke(app, ["score", "-i", "examples/example_dataset.csv", "-c", str(tmp_path / "c.yaml"),
+                                   "-m", str(tmp_path / "m.npz"), "-o", str(tmp_path / "out.csv")], env={"COLUMNS": "300"})
+    assert res.exit_code == 2 and "cardio_risk" in res.output and not (tmp_path / "out.csv").exists()
+
+def test_search_bootstrap_refits_with_the_winning_solver(tmp_path):
+    from xenoscore.ml.bootstrap import _resample
+    from xenoscore.ml.featurize import featurize
+    from xenoscore.ml.train import SearchSpace, _pipeline, search_logistic
+    from xenoscore.scoring.linear import BootstrapEnsemble
+    df = _cohort(n=80, seed=5)
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    space = SearchSpace(C=[0.5], penalties=["l2"], max_iter=300, tol=1e-6)  # auto -> lbfgs
+    cfg = TrainConfig(cv_folds=2, bootstrap=3, workers=1)
+    search_logistic(df, "outcome", comp_cfg, space, cfg, bootstrap_out=str(tmp_path / "b.npz"))
+    ens = BootstrapEnsemble.load(tmp_path / "b.npz")
+    X, y = featurize(df.drop(columns=["outcome"]), comp_cfg).to_numpy(dtype=float), df["outcome"].to_numpy()
+    idx = _resample(y, np.random.default_rng(np.random.SeedSequence(cfg.random_state).spawn(3)[0]))
+    pipe = _pipeline(0.5, "l2", "lbfgs", None, cfg.random_state, max_iter=300, tol=1e-6).fit(X[idx], y[idx])
+    lm = LinearModel.from_pipeline(pipe, [str(j) for j in range(X.shape[1])])
+    np.testing.assert_allclose(ens.coef[0], lm.coef / lm.scale, rtol=1e-10, atol=1e-12)
+
+def test_intervals_ensemble_must_match_the_model_features(tmp_path):
+    import pytest
+    from typer.testing import CliRunner
+    from xenoscore.cli import app
+    from xenoscore.scoring.linear import BootstrapEnsemble
+    LinearModel(("renal_risk", "cardio_risk"), np.ones(2), np.array([1.0, 2.0]), 0.0).save(tmp_path / "m.npz")
+    BootstrapEnsemble(("renal_risk", "infection_risk"), np.ones((3, 2)), np.zeros(3)).save(tmp_path / "b.npz")
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    eng = ModelScoreEngine(comp_cfg, str(tmp_path / "m.npz"), intervals=str(tmp_path / "b.npz"))
+    with pytest.raises(ValueError, match="infection_risk"):
+        eng.predict_proba(pd.read_csv("examples/example_dataset.csv"))
+    with pytest.raises(ValueError, match="not a bootstrap ensemble"):
+        ModelScoreEngine(comp_cfg, str(tmp_path / "m.npz"), intervals=str(tmp_path / "m.npz")).interval_model(load_model(str(tmp_path / "m.npz")))
+    res = CliRunner().invoke(app, ["score", "-i", "examples/example_dataset.csv", "-c", "configs/default_components.yaml",
+                                   "-m", str(tmp_path / "m.npz"), "--intervals", str(tmp_path / "b.npz"),
+                                   "-o", str(tmp_path / "out.csv")], env={"COLUMNS": "300"})
+    assert res.exit_code == 2 and "infection_risk" in res.output and not (tmp_path / "out.csv").exists()
@@ -0,0 +1,38 @@
+import pandas as pd
+from xenoscore import profiling
+from xenoscore.config import load_component_config, load_weights_config
+from xenoscore.scoring.weighted import WeightedScoreEngine
+
+def _score():
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    df = pd.read_csv("examples/example_dataset.csv")
+    return WeightedScoreEngine(comp_cfg, load_weights_config("configs/weights.example.yaml")).score_dataframe(df), len(df)
+
+def test_profiler_counts_components_and_nests_stacks(tmp_path):
+    prof = profiling.enable()
+    try:
+        with profiling.span("score"):
+            _score()
+            _, n = _score()
+    finally:
+        assert profiling.disable() is prof
+    stages = {s["name"]: s for s in prof.snapshot()["stages"]}
+    assert stages["score"]["calls"] == 1
+    assert stages["featurize"]["calls"] == 2 and stages["featurize"]["rows"] == 2 * n
+    comp = stages["component:InfectionStatus"]
+    assert comp["calls"] == 2 and comp["rows_per_sec"] > 0 and comp["mean_s"] <= comp["total_s"]
+    folded = prof.save(tmp_path / "p.json").with_suffix(".folded").read_text().splitlines()
+    assert any(line.startswith("score;featurize;component:InfectionStatus ") for line in folded)
+    # off: spans are a shared no-op and nothing is recorded
+    assert not profiling.enabled() and profiling.span("x") is profiling.span("y")
+
+def test_hooks_receive_spans_without_a_profiler():
+    events = []
+    hook = lambda name, seconds, rows: events.append((name, rows))
+    profiling.add_hook(hook)
+    try:
+        _, n = _score()
+    finally:
+        profiling.remove_hook(hook)
+    assert ("featurize", n) in events and ("weighted_sum", n) in events
+    assert profiling.active() is None and not profiling.enabled()
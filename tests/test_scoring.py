@@ -9,3 +9,99 @@ def test_weighted_scoring_runs():
     eng = WeightedScoreEngine(comp_cfg, w)
     out = eng.score_dataframe(df)
     assert "risk_score" in out.columns
+
+def test_fixed_raw_range_makes_scaling_batch_independent():
+    df = pd.read_csv("examples/example_dataset.csv").sample(20, replace=True, random_state=0).reset_index(drop=True)
+    df["egfr"] = range(10, 30)
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    w = load_weights_config("configs/weights.example.yaml")
+    whole = WeightedScoreEngine(comp_cfg, w).score_dataframe(df)
+    eng = WeightedScoreEngine(comp_cfg, w, raw_range=(whole["raw_score"].min(), whole["raw_score"].max()))
+    chunked = pd.concat([eng.score_dataframe(df.iloc[:7]), eng.score_dataframe(df.iloc[7:])])
+    pd.testing.assert_frame_equal(chunked, whole, check_exact=True)
+
+def test_batch_scaling_skips_nan_raw_scores():
+    import numpy as np
+    import warnings
+    eng = WeightedScoreEngine([], {})
+    got = eng.scale(pd.Series([1.0, np.nan, 3.0, 2.0]))
+    np.testing.assert_array_equal(got.to_numpy(), [0.0, np.nan, 100.0, 50.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert (eng.scale(pd.Series([np.nan, np.nan])) == 50.0).all()
+
+def test_plan_prunes_unweighted_components_and_warns_on_unknown_weights():
+    import pytest
+    from xenoscore.scoring.plan import compile_plan
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    w = {**load_weights_config("configs/weights.example.yaml"), "dsa_risk": 0.0}
+    del w["renal_risk"]
+    plan = compile_plan(comp_cfg, w)
+    assert set(plan.dropped_components) == {"DSA", "RenalFunction"}
+    assert "dsa_present" not in plan.input_columns and "egfr" not in plan.input_columns
+    assert plan.weight_map["genetic_protection"] == -1.4
+    with pytest.warns(UserWarning, match="lactate_risk"):
+        compile_plan(comp_cfg, {**w, "lactate_risk": 1.0})
+    out = WeightedScoreEngine(comp_cfg, w).score_dataframe(pd.read_csv("examples/example_dataset.csv"))
+    assert "dsa_risk" not in out.columns and "risk_score" in out.columns
+
+def test_profile_set_runs_shared_components_once_and_matches_single_profiles(tmp_path):
+    import shutil
+    import numpy as np
+    import yaml
+    from xenoscore import profiling
+    from xenoscore.scoring.engine import build_engine, build_profiles, predict
+    from xenoscore.scoring.linear import LinearModel
+    df = pd.read_csv("examples/example_dataset.csv")
+    heart = {"components": [{"name": "CardiovascularFunction"}, {"name": "InfectionStatus"}, {"name": "DonorAgeSize"}]}
+    (tmp_path / "heart.yaml").write_text(yaml.safe_dump(heart))
+    (tmp_path / "heart_w.yaml").write_text(yaml.safe_dump({"weights": {"cardio_risk": 2.0, "infection_risk": 0.5, "donor_age_size_risk": 1.0}}))
+    LinearModel(("renal_risk", "cardio_risk"), np.ones(2), np.array([1.0, -0.5]), 0.1).save(tmp_path / "m.npz")
+    shutil.copy("configs/default_components.yaml", tmp_path)
+    shutil.copy("configs/weights.example.yaml", tmp_path)
+    # relative paths resolve against the manifest's folder
+    profiles = {
+        "kidney": {"config": "default_components.yaml", "weights": "weights.example.yaml"},
+        "heart": {"config": "heart.yaml", "weights": "heart_w.yaml"},
+        "ml": {"config": "default_components.yaml", "model": "m.npz"},
+    }
+    (tmp_path / "manifest.yaml").write_text(yaml.safe_dump({"profiles": profiles}, sort_keys=False))
+    ps = build_profiles(str(tmp_path / "manifest.yaml"))
+    events = []
+    hook = lambda name, seconds, rows: events.append(name)
+    profiling.add_hook(hook)
+    try:
+        out = predict(ps, df)
+    finally:
+        profiling.remove_hook(hook)
+    assert list(out.columns) == ["kidney_risk_score", "heart_risk_score", "ml_model_probability"]
+    runs = [e for e in events if e.startswith("component:")]
+    assert len(runs) == len(set(runs)) == ps.component_runs() == 13
+    for name, p in profiles.items():
+        paths = {k: str(tmp_path / v) for k, v in p.items()}
+        single = predict(build_engine(paths["config"], paths.get("weights"), paths.get("model")), df)
+        col = "risk_score" if "weights" in p else "model_probability"
+        np.testing.assert_allclose(out[ps.score_column(name)], single[col], rtol=1e-12)
+
+def test_explain_contributions_add_up_to_scores_and_rank_drivers(tmp_path):
+    import numpy as np
+    from xenoscore.scoring.explain import contributions, explain, top_drivers
+    from xenoscore.scoring.linear import LinearModel
+    from xenoscore.scoring.model import ModelScoreEngine
+    df = pd.read_csv("examples/example_dataset.csv")
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    eng = WeightedScoreEngine(comp_cfg, load_weights_config("configs/weights.example.yaml"))
+    out = explain(eng, df, top_k=2)
+    contrib = out.filter(like="contrib_")
+    np.testing.assert_allclose(contrib.sum(axis=1), out["raw_score"], rtol=1e-12, atol=1e-12)
+    top = contrib.to_numpy().max(axis=1)
+    np.testing.assert_array_equal(out["driver_1_contribution"], top)
+    assert all(out.loc[i, f"contrib_{out.loc[i, 'driver_1']}"] == top[i] for i in range(len(df)))
+    assert (out["driver_1_contribution"] >= out["driver_2_contribution"]).all()
+    # logistic artifact: scaled coefficient x feature in log-odds, plus the intercept
+    lm = LinearModel(("renal_risk", "cardio_risk", "dsa_risk"), np.array([0.5, 2.0, 1.0]), np.array([1.0, -0.5, 2.0]), 0.3)
+    lm.save(tmp_path / "m.npz")
+    preds, contrib = contributions(ModelScoreEngine(comp_cfg, str(tmp_path / "m.npz")), df)
+    logit = np.log(preds["model_probability"] / (1 - preds["model_probability"]))
+    np.testing.assert_allclose(contrib.sum(axis=1) + lm.intercept, logit, rtol=1e-9)
+    assert list(top_drivers(contrib, k=5).columns)[-1] == "driver_3_contribution"
@@ -0,0 +1,111 @@
+import http.client
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from xenoscore.config import load_component_config, load_weights_config
+from xenoscore.scoring.weighted import WeightedScoreEngine
+from xenoscore.serve import ScoringService, make_server
+
+def _engine(raw_range=(-2.0, 12.0)):
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    return WeightedScoreEngine(comp_cfg, load_weights_config("configs/weights.example.yaml"), raw_range=raw_range)
+
+def _records():
+    df = pd.read_csv("examples/example_dataset.csv")
+    return df, df.replace({np.nan: None}).to_dict(orient="records")
+
+def test_service_scores_match_engine_with_fixed_range():
+    df, records = _records()
+    service = ScoringService(_engine())
+    try:
+        expected = WeightedScoreEngine(service.engine.component_specs, service.engine.weights,
+                                       raw_range=service.engine.raw_range).score_dataframe(df)
+        preds, errors = service.score_records(records)
+        assert errors == []
+        np.testing.assert_allclose([p["risk_score"] for p in preds], expected["risk_score"], rtol=1e-12)
+        # a single request scores the same as inside a batch
+        single, _ = service.score_one(records[1])
+        assert single["risk_score"] == preds[1]["risk_score"]
+    finally:
+        service.close()
+
+def test_service_requires_raw_score_range():
+    with pytest.raises(ValueError, match="raw_score_range"):
+        ScoringService(_engine(raw_range=None))
+
+def _post(port, payload):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("POST", "/score", json.dumps(payload), {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read(), parse_constant=lambda c: pytest.fail(f"non-JSON constant {c}"))
+
+def test_http_round_trip_and_strict_validation():
+    _, records = _records()
+    for validation in ("lenient", "strict"):
+        service = ScoringService(_engine(), validation=validation)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+        try:
+            status, body = _post(port, records[0])
+            assert status == 200 and "risk_score" in body["prediction"]
+            status, body = _post(port, {"samples": records})
+            assert status == 200 and len(body["predictions"]) == len(records)
+            status, body = _post(port, {**records[0], "egfr": "abc"})
+            if validation == "strict":
+                assert status == 422 and "egfr" in body["validation_errors"][0]
+            else:
+                assert status == 200 and body["validation_errors"]
+            # latency is recorded after the response is written
+            deadline = time.monotonic() + 5
+            while service.metrics_snapshot()["endpoints"]["POST /score"]["count"] < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert service.metrics_snapshot()["endpoints"]["POST /score"]["count"] == 3
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+@pytest.mark.parametrize("fast_rows", [8, 0])
+def test_non_finite_scores_are_sent_as_null(monkeypatch, fast_rows):
+    from xenoscore import serve
+    from xenoscore.components.core import FeatureComponent
+    from xenoscore.registry import COMPONENT_REGISTRY, register_component
+
+    @register_component("NanRisk")
+    class NanRisk(FeatureComponent):
+        columns, features = ("egfr",), ("nan_risk",)
+        def compute(self, row):
+            return {"nan_risk": float("nan")}
+
+    monkeypatch.setattr(serve, "FAST_PATH_ROWS", fast_rows)  # row-wise and DataFrame paths
+    _, records = _records()
+    service = ScoringService(WeightedScoreEngine([{"name": "NanRisk"}], {"nan_risk": 1.0}, raw_range=(0.0, 1.0)))
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        status, body = _post(server.server_port, records[0])
+        assert status == 200 and body["prediction"] == {"nan_risk": None, "raw_score": None, "risk_score": None}
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+        COMPONENT_REGISTRY.pop("NanRisk", None)
+
+def test_row_wise_fast_path_matches_dataframe_path(monkeypatch):
+    from xenoscore import serve
+    _, records = _records()
+    messy = [dict(records[0], egfr="n/a", dialysis=None, infection_status="Active"),
+             {k: v for k, v in records[1].items() if k not in ("lvef", "dsa_present")},
+             dict(records[1], donor_pcmv="yes", flow_cxm_mfi="1200", mrn="A4")]
+    service = ScoringService(_engine())
+    try:
+        fast = [service.score_records([r]) for r in messy] + [service.score_records(messy)]
+        monkeypatch.setattr(serve, "FAST_PATH_ROWS", 0)
+        slow = [service.score_records([r]) for r in messy] + [service.score_records(messy)]
+        assert fast == slow and fast[0][1] and "egfr" in fast[0][1][0][1]
+    finally:
+        service.close()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from xenoscore.config import load_component_config, load_weights_config
+from xenoscore.scoring.sweep import FeatureMatrix, average_ranks, evaluate, feature_matrix, grid_vectors, run_sweep, weight_matrix
+from xenoscore.scoring.weighted import WeightedScoreEngine
+
+def test_ranks_and_auc_match_reference_with_ties():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 5, size=(200, 3)).astype(float)
+    ranks = average_ranks(scores)
+    for j in range(3):
+        np.testing.assert_array_equal(ranks[:, j], pd.Series(-scores[:, j]).rank(method="average").to_numpy())
+    fm_X = scores[:, :2]
+    y = (rng.random(200) < 0.4).astype(float)
+    y[:5] = np.nan  # unlabelled rows are left out of the AUC
+    fm = FeatureMatrix(fm_X, ["a", "b"], pd.RangeIndex(200))
+    W = np.array([[1.0, 0.0], [0.3, 1.0]])
+    res = evaluate(fm, W, W[0], y)
+    for i, w in enumerate(W):
+        assert res["auc"][i] == pytest.approx(roc_auc_score(y[5:], fm_X[5:] @ w), abs=1e-12)
+    assert res["spearman"][0] == 1.0 and res["max_rank_change"][0] == 0.0
+
+def test_sweep_scores_match_weighted_engine():
+    df = pd.read_csv("examples/example_dataset.csv")
+    comp_cfg = load_component_config("configs/default_components.yaml")["components"]
+    base = load_weights_config("configs/weights.example.yaml")
+    fm = feature_matrix(df, comp_cfg)
+    raw = fm.X @ weight_matrix([base], fm.feature_names)[0]
+    expected = WeightedScoreEngine(comp_cfg, base).raw_scores(df)["raw_score"]
+    np.testing.assert_allclose(raw, expected, rtol=1e-12, atol=1e-12)
+    vectors = grid_vectors(base, {"renal_risk": [0.0, 1.0, 2.0], "dsa_risk": [0.5, 1.2]})
+    report = run_sweep(fm, base, vectors, df["outcome"].to_numpy())
+    assert report["n_vectors"] == 6
+    same = next(v for v in report["vectors"] if v["label"] == "renal_risk=1,dsa_risk=1.2")
+    assert same["spearman"] == 1.0 and same["auc"] == report["baseline_auc"]
+    assert {r["feature"] for r in report["sensitivity"]} == set(fm.feature_names)
@@ -0,0 +1,30 @@
+import pandas as pd
+from xenoscore.bench import compare, run_benchmarks
+from xenoscore.data.io import read_any
+from xenoscore.data.synthetic import generate_cohort, iter_cohort, write_cohort
+from xenoscore.data.validation import FIELD_KINDS, validate_dataframe
+
+def test_synthetic_cohort_follows_schema_and_is_reproducible(tmp_path):
+    df = generate_cohort(2000, seed=7)
+    assert list(df.columns) == list(FIELD_KINDS)
+    _, errors = validate_dataframe(df, mode="strict")
+    assert errors == []
+    pd.testing.assert_frame_equal(generate_cohort(2000, seed=7), df)
+    assert 0.05 < df["outcome"].mean() < 0.5
+    assert 0.1 < df["pod3_IgG"].isna().mean() < 0.4
+    # correlated immunology markers
+    assert df["baseline_anti_pig_IgG"].corr(df["flow_cxm_mfi"], method="spearman") > 0.4
+    chunks = list(iter_cohort(2500, seed=1, chunksize=1000))
+    assert [len(c) for c in chunks] == [1000, 1000, 500] and chunks[-1].index[0] == 2000
+    write_cohort(tmp_path / "c.csv", 2500, seed=1, chunksize=1000)
+    back = read_any(tmp_path / "c.csv")
+    assert len(back) == 2500 and back["egfr"].equals(pd.concat(chunks)["egfr"].reset_index(drop=True))
+
+def test_benchmark_report_covers_every_stage(tmp_path):
+    report = run_benchmarks(sizes=[300], formats=["csv", "parquet"], workdir=str(tmp_path))
+    stages = {(r["stage"], r["format"]) for r in report["results"]}
+    assert len(stages) == 16
+    assert all(r["seconds"] > 0 and (r["peak_mb"] if r["stage"] != "serve_request" else r["p99_ms"]) > 0
+               for r in report["results"])
+    slower = {"results": [dict(r, seconds=r["seconds"] * 2) for r in report["results"]]}
+    assert len(compare(report, slower)) == 16 and compare(report, report) == []
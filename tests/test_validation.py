@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from xenoscore.data.validation import validate_dataframe, SchemaValidationError
+
+def _bad_frame():
+    df = pd.read_csv("examples/example_dataset.csv").astype(object)
+    df.loc[0, "dialysis"] = "maybe"
+    df.loc[1, "infection_status"] = "Active"
+    df.loc[1, "egfr"] = "n/a"
+    return df
+
+def test_validation_coerces_columns():
+    df, errors = validate_dataframe(pd.read_csv("examples/example_dataset.csv").astype(object))
+    assert errors == []
+    assert df["egfr"].dtype == "float64"
+    assert df["dialysis"].dtype == "boolean"
+    assert list(df["infection_status"].cat.categories) == ["active", "recent", "none"]
+
+def test_validation_reports_row_errors_and_keeps_raw_values():
+    df, errors = validate_dataframe(_bad_frame())
+    assert [idx for idx, _ in errors] == [0, 1]
+    assert "dialysis" in errors[0][1]
+    assert "infection_status" in errors[1][1] and "egfr" in errors[1][1]
+    assert df.loc[1, "infection_status"] == "Active"
+
+def test_validation_modes():
+    with pytest.raises(SchemaValidationError) as exc:
+        validate_dataframe(_bad_frame(), mode="strict")
+    assert len(exc.value.errors) == 2
+    raw = _bad_frame()
+    df, errors = validate_dataframe(raw, mode="off")
+    assert df is raw and errors == []
+
+def test_projected_typed_reads(tmp_path):
+    from xenoscore.config import load_component_config
+    from xenoscore.data.io import iter_chunks, read_any
+    from xenoscore.scoring.plan import compile_plan
+    df = pd.concat([pd.read_csv("examples/example_dataset.csv")] * 3, ignore_index=True)
+    wide = pd.concat([pd.DataFrame({"mrn": range(len(df)), "ward": "icu", "note": "x"}), df], axis=1)
+    wide.to_csv(tmp_path / "w.csv", index=False)
+    wide.to_parquet(tmp_path / "w.parquet")
+    cols = compile_plan(load_component_config("configs/default_components.yaml")["components"]).read_columns
+    assert "ward" not in cols and "dialysis" in cols
+    for name in ("w.csv", "w.parquet"):
+        got = read_any(tmp_path / name, cols, ["mrn"])
+        assert set(got.columns) == set(cols) | {"mrn"} and list(got.columns)[0] == "mrn"
+        with pytest.raises(ValueError):
+            read_any(tmp_path / name, cols, ["missing_id"])
+    got = read_any(tmp_path / "w.csv", cols)
+    assert str(got["dialysis"].dtype) == "boolean" and got["egfr"].dtype == "float64"
+    # a cell that does not fit the Sample dtype falls back to inference; validation reports it
+    wide["egfr"] = wide["egfr"].astype(object)
+    wide.loc[len(wide) - 1, "egfr"] = "abc"
+    wide.to_csv(tmp_path / "bad.csv", index=False)
+    bad = read_any(tmp_path / "bad.csv", cols)
+    assert validate_dataframe(bad)[1][0][0] == len(wide) - 1
+    chunks = list(iter_chunks(tmp_path / "bad.csv", 2, cols))
+    pd.testing.assert_frame_equal(validate_dataframe(pd.concat(chunks))[0], validate_dataframe(bad)[0], check_dtype=False)
+
+def test_missing_flags_score_as_present_and_absent_fields_use_component_defaults():
+    import numpy as np
+    from xenoscore.components.core import compute_features
+    from xenoscore.registry import get_component
+    raw = pd.read_csv("examples/example_dataset.csv").drop(columns=["lvef", "map_mmHg"])
+    raw[["dialysis", "dsa_present", "donor_pcmv", "flow_cxm_positive"]] = np.nan  # blank CSV cells
+    validated, errors = validate_dataframe(raw)
+    assert errors == [] and validated["dialysis"].isna().all() and "lvef" not in validated.columns
+    comps = [get_component(n)() for n in ("PreXenoClinicalContext", "DSA", "DonorPCMV", "FlowCrossmatch", "CardiovascularFunction")]
+    # like `bool(nan)` row-wise: an unknown risk flag counts as present; `is True` checks do not
+    rowwise = pd.DataFrame([{k: v for c in comps for k, v in c.compute(r).items()} for r in raw.to_dict(orient="records")])
+    for frame in (raw, validated):
+        out = compute_features(frame, comps)
+        pd.testing.assert_frame_equal(out, rowwise, check_dtype=False)
+    assert (rowwise["dsa_risk"] == 1.0).all() and (rowwise["donor_pcmv_risk"] == 1.0).all()
+    # absent lvef/MAP take the component defaults (60 %, 75 mmHg), not the 0.0 of a None cell
+    np.testing.assert_allclose(rowwise["cardio_risk"], 0.6 * 0.1 + 0.4 * 0.2)
@@ -0,0 +1,52 @@
+import asyncio
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from xenoscore.scoring.engine import build_engine, predict
+from xenoscore.data.validation import validate_dataframe
+from xenoscore.watch import WatchDirs, Watcher
+
+CONFIG = "configs/default_components.yaml"
+WEIGHTS = "configs/weights.example.yaml"
+
+def _run(inbox, **kw):
+    watcher = Watcher(WatchDirs.under(inbox), (CONFIG, WEIGHTS, None), **kw)
+    watcher.start()
+    try:
+        return asyncio.run(watcher.run(once=True))
+    finally:
+        watcher.close()
+
+def test_watch_scores_inbox_and_survives_restart(tmp_path):
+    inbox = tmp_path / "in"
+    inbox.mkdir()
+    df = pd.read_csv("examples/example_dataset.csv")
+    df.to_csv(inbox / "site_a.csv", index=False)
+    pd.concat([df, df], ignore_index=True).to_parquet(inbox / "site_b.parquet")
+    (inbox / "broken.csv").write_text("")
+    (inbox / "notes.txt").write_text("not a data file")
+
+    counts = _run(inbox, max_in_flight=2)
+    assert counts == {"done": 2, "failed": 1, "duplicate": 0, "rows": 6}
+    assert sorted(p.name for p in inbox.iterdir() if p.is_file()) == ["notes.txt"]
+
+    out = pd.read_csv(inbox / "scored" / "site_a.predictions.csv")
+    expected = predict(build_engine(CONFIG, WEIGHTS), validate_dataframe(df)[0])
+    np.testing.assert_allclose(out["risk_score"], expected["risk_score"])
+    sidecar = json.loads((inbox / "done" / "site_a.csv.json").read_text())
+    assert sidecar["status"] == "done" and sidecar["rows"] == 2 and sidecar["validation_errors"] == 0
+    assert {"read_s", "score_s", "write_s", "total_s"} <= set(sidecar["timing"])
+    assert json.loads((inbox / "failed" / "broken.csv.json").read_text())["status"] == "failed"
+
+    # restart: a re-sent file and one left in .processing after its sidecar was written
+    # are recognised by content and not rescored
+    shutil.copy(inbox / "done" / "site_b.parquet", inbox / "resent.parquet")
+    shutil.move(inbox / "done" / "site_a.csv", inbox / ".processing" / "site_a.csv")
+    before = (inbox / "scored" / "site_a.predictions.csv").stat().st_mtime_ns
+    counts = _run(inbox)
+    assert counts == {"done": 0, "failed": 0, "duplicate": 1, "rows": 0}
+    assert (inbox / "done" / "site_a.csv").exists() and (inbox / "done" / "resent.parquet").exists()
+    assert json.loads((inbox / "done" / "resent.parquet.json").read_text())["duplicate_of"] == "site_b.parquet"
+    assert (inbox / "scored" / "site_a.predictions.csv").stat().st_mtime_ns == before
+    assert not any((inbox / ".processing").iterdir())